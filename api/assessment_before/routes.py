@@ -4,6 +4,8 @@ import logging
 
 from ..base.base_schemas import BaseResponse
 from shared.session_manager import get_or_create_session
+from shared.json_provider import json_response
+from shared.compression import spliced_json_response
 from shared.async_utils import run_async
 from .usecases import assessment_questions, process_assessment_submission
 from . import assessment_before_bp
@@ -11,6 +13,7 @@ from . import assessment_before_bp
 from .schemas import (
     SubmitTestAnswersRequest,
     GetAssessmentModel,
+    AssessmentQuestionList,
     SubmitAnswersAssessment
 )
 
@@ -24,7 +27,7 @@ def get_test_questions():
         
         if manager.context["current_phase"] not in ["package_selected", "testing"]:
             response = BaseResponse.error(message="Please complete profiling first")
-            return jsonify(response.model_dump()), 400
+            return json_response(response), 400
 
         questions = assessment_questions(manager)
 
@@ -32,12 +35,14 @@ def get_test_questions():
             response = BaseResponse.error(
                 message=f"No questions found for package: {manager.context.get('selected_package')}"
             )
-            return jsonify(response.model_dump()), 404
+            return json_response(response), 404
         
+        # Same list for every session: sent as a precompressed fragment
+        questions_json = AssessmentQuestionList.dump_json(AssessmentQuestionList.validate_python(questions))
         data = GetAssessmentModel(
             session_id=manager.session_id,
             package=manager.context.get("selected_package", ""),
-            questions=questions,
+            questions=[],
             questions_count=len(questions),
             current_phase=manager.context["current_phase"],
             instruction="Please respond with numbers 1-4 for each question (Likert scale)"
@@ -47,14 +52,14 @@ def get_test_questions():
             data=data,
             message="Test questions retrieved successfully"
         )
-        return jsonify(response.model_dump()), 200
+        return spliced_json_response(response, "questions", questions_json), 200
         
     except Exception as e:
         response = BaseResponse.error(
             message="Failed to get test questions",
             errors={"detail": str(e)}
         )
-        return jsonify(response.model_dump()), 500
+        return json_response(response), 500
 
 @assessment_before_bp.route('/submit_test_answers', methods=['POST'])
 def submit_test_answers():
@@ -63,8 +68,8 @@ def submit_test_answers():
         manager = get_or_create_session()
         
         if not request.is_json:
-            return jsonify(
-                BaseResponse.error(message="Request must be JSON").model_dump()
+            return json_response(
+                BaseResponse.error(message="Request must be JSON")
             ), 400
         
         data = request.get_json()
@@ -72,8 +77,8 @@ def submit_test_answers():
         try:
             result = process_assessment_submission(manager, data)
         except ValueError as e:
-            return jsonify(
-                BaseResponse.error(message=str(e)).model_dump()
+            return json_response(
+                BaseResponse.error(message=str(e))
             ), 400
         
         response_data = SubmitAnswersAssessment(
@@ -85,18 +90,18 @@ def submit_test_answers():
             total_score=result["total_score"]
         )
         
-        return jsonify(
+        return json_response(
             BaseResponse.success(
                 data=response_data,
                 message="Answers submitted successfully"
-            ).model_dump()
+            )
         ), 200
         
     except Exception as e:
         logger.error(f"Error in submit_test_answers: {e}", exc_info=True)
-        return jsonify(
+        return json_response(
             BaseResponse.error(
                 message="Failed to submit answers",
                 errors=str(e)
-            ).model_dump()
+            )
         ), 500
\ No newline at end of file
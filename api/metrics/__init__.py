@@ -0,0 +1,6 @@
+from flask import Blueprint
+
+metrics_bp = Blueprint('metrics', __name__)
+
+from . import collectors  # noqa: E402,F401
+from . import routes  # noqa: E402,F401
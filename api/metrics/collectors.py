@@ -0,0 +1,99 @@
+"""
+Scrape-time collectors for stats kept by the services themselves
+
+Each collector reads the counters a component already maintains (job queue,
+email outbox, LLM admission controllers and circuit breakers, sessions) and
+renders them as metric families; nothing here sits on a request path.
+"""
+from typing import Iterable
+
+from shared.metrics import registry, family, histogram_family
+from shared.job_queue import job_queue
+from shared.session_manager import session_managers
+from services.llm_service import llm_service
+from services.email_outbox import email_outbox
+
+# Circuit breaker states as gauge values
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+@registry.collector
+def collect_sessions() -> Iterable[str]:
+    yield from family("sessions_active", "gauge", "Sessions held in memory", [({}, len(session_managers))])
+
+
+@registry.collector
+def collect_job_queue() -> Iterable[str]:
+    stats = job_queue.stats()
+    yield from family("jobs", "gauge", "Stored background jobs by state", [
+        ({"state": "queued"}, stats["queued"]),
+        ({"state": "running"}, stats["running"]),
+        ({"state": "stored"}, stats["stored"]),
+    ])
+    yield from family("jobs_total", "counter", "Background job submissions and outcomes", [
+        ({"event": event}, stats[event]) for event in ("submitted", "reused", "succeeded", "failed")
+    ])
+
+
+@registry.collector
+def collect_email_outbox() -> Iterable[str]:
+    stats = email_outbox.stats()
+    yield from family("email_outbox_messages", "gauge", "Outbox messages by status", [
+        ({"status": status}, count) for status, count in sorted(stats["queue"].items())
+    ])
+    yield from family("email_outbox_events_total", "counter", "Outbox events since start", [
+        ({"event": event}, stats[event])
+        for event in ("enqueued", "duplicates", "sent", "failed_attempts", "dead", "batches")
+    ])
+    yield from histogram_family(
+        "email_delivery_latency_seconds",
+        "Time from enqueue to accepted by the transport",
+        [({"transport": stats["transport"]}, stats["delivery_latency"])]
+    )
+    yield from histogram_family(
+        "email_send_duration_seconds",
+        "Duration of one transport send call",
+        [({"transport": stats["transport"]}, stats["send_time"])]
+    )
+
+
+@registry.collector
+def collect_llm() -> Iterable[str]:
+    admission = llm_service.get_admission_stats()
+    yield from family("llm_admission_active", "gauge", "LLM calls in progress per backend", [
+        ({"backend": name}, snap["active"]) for name, snap in admission.items()
+    ])
+    yield from family("llm_admission_queued", "gauge", "LLM calls waiting for a slot per backend", [
+        ({"backend": name}, snap["queued"]) for name, snap in admission.items()
+    ])
+    yield from family("llm_admission_limit", "gauge", "Concurrent LLM call limit per backend", [
+        ({"backend": name}, snap["max_concurrent"]) for name, snap in admission.items()
+    ])
+    yield from family("llm_admission_total", "counter", "Admission decisions per backend", [
+        ({"backend": name, "decision": decision}, snap[decision])
+        for name, snap in admission.items()
+        for decision in ("admitted", "rejected")
+    ])
+    yield from histogram_family(
+        "llm_admission_queue_seconds",
+        "Time spent waiting for an LLM slot per backend",
+        [({"backend": name}, limiter.queue_time.snapshot()) for name, limiter in llm_service.limiters.items()]
+    )
+
+    health = llm_service.get_backend_health()
+    yield from family("llm_circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)", [
+        ({"backend": name}, BREAKER_STATES.get(snap["state"], -1)) for name, snap in health.items()
+    ])
+    yield from family("llm_circuit_error_rate", "gauge", "Error rate in the breaker window per backend", [
+        ({"backend": name}, snap["error_rate"]) for name, snap in health.items()
+    ])
+
+    yield from family("llm_hedges_total", "counter", "Hedged requests fired and won by the backup", [
+        ({"event": "fired"}, llm_service.hedges_fired),
+        ({"event": "won"}, llm_service.hedges_won),
+    ])
+    if llm_service.single_flight is not None:
+        yield from family("llm_single_flight_total", "counter", "Coalesced LLM calls by role", [
+            ({"role": "leader"}, llm_service.single_flight.leaders),
+            ({"role": "follower"}, llm_service.single_flight.followers),
+        ])
@@ -0,0 +1,24 @@
+from flask import Response, jsonify, request
+import hmac
+
+from config import settings
+from shared.metrics import registry
+from . import metrics_bp
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint (outside JWT; optionally bearer-token protected)"""
+    if not settings.METRICS_ENABLED:
+        return jsonify({"error": "Endpoint not found"}), 404
+
+    if settings.METRICS_TOKEN:
+        auth_header = request.headers.get('Authorization', '')
+        token = auth_header.split(' ', 1)[1].strip() if auth_header.lower().startswith('bearer ') else ''
+        if not hmac.compare_digest(token, settings.METRICS_TOKEN):
+            return jsonify({"error": "Invalid metrics token"}), 401
+
+    return Response(registry.render(), mimetype=None, content_type=CONTENT_TYPE)
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+profiling_bp = Blueprint('profiling', __name__)
+
+from . import routes  # noqa: E402,F401
@@ -0,0 +1,23 @@
+from flask import jsonify, send_file
+
+from shared.profiling import profile_store, is_profiling_admin
+from . import profiling_bp
+
+
+@profiling_bp.route('', methods=['GET'])
+def list_profiles():
+    """Stored profiles: the slowest sampled requests and recent on-demand ones"""
+    if not is_profiling_admin():
+        return jsonify({"error": "Profiling is restricted to admins"}), 403
+    return jsonify(profile_store.list())
+
+
+@profiling_bp.route('/<name>', methods=['GET'])
+def get_profile(name: str):
+    """One stored profile as a speedscope file"""
+    if not is_profiling_admin():
+        return jsonify({"error": "Profiling is restricted to admins"}), 403
+    path = profile_store.path(name)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(path, mimetype="application/json", as_attachment=True, download_name=name)
@@ -3,6 +3,9 @@ from bson import ObjectId
 from flask import Flask, jsonify
 from pymongo import MongoClient
 from bson import ObjectId  # Import ObjectId to handle serialization
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class searchKeterangan:
@@ -21,17 +24,17 @@ class searchKeterangan:
             questions = await db_service.get_questions_by_package(package, limit)
             
             if not questions:
-                print(f"No questions found for package: {package}, trying default")
+                logger.warning(f"No questions found for package: {package}, trying default")
                 questions = await db_service.get_questions_by_package("basic", limit)
             
             if not questions:
-                print("No questions found even for basic package")
+                logger.warning("No questions found even for basic package")
                 return []
             
             return questions[:limit]  # Limit to top 15 questions
             
         except Exception as e:
-            print(f"Error getting questions by package: {str(e)}")
+            logger.error(f"Error getting questions by package: {e}")
             return []
         
     async def find_best_package(profile_description: str) -> str:
@@ -39,11 +42,11 @@ class searchKeterangan:
         global faiss_index, package_mappings
         
         if faiss_index is None:
-            print("FAISS index not initialized, initializing now...")
+            logger.info("FAISS index not initialized, initializing now...")
             await initialize_faiss_index()
         
         if faiss_index is None:
-            print("Failed to initialize FAISS index, returning default package '0'")
+            logger.warning("Failed to initialize FAISS index, returning default package '0'")
             return '0'  # Return '0' as the default package
         
         try:
@@ -66,14 +69,14 @@ class searchKeterangan:
                 # Map the index to the corresponding package ID
                 best_package = str(best_match_idx)  # Package IDs are stored as string in the database
                 
-                print(f"Best matching package: {best_package} (similarity: {similarity_score:.4f})")
+                logger.info(f"Best matching package: {best_package} (similarity: {similarity_score:.4f})")
                 return best_package
             else:
-                print("No matches found, returning default package '0'")
+                logger.info("No matches found, returning default package '0'")
                 return '0'  # If no match, return '0' as default
                 
         except Exception as e:
-            print(f"Error in similarity search: {str(e)}")
+            logger.error(f"Error in similarity search: {e}")
             return '0'  # Return '0' in case of error
         
     async def initialize_faiss_index():
@@ -86,10 +89,10 @@ class searchKeterangan:
             keterangan_docs = await db_service.get_all_keterangan()
             
             if not keterangan_docs:
-                print("No keterangan documents found in database")
+                logger.warning("No keterangan documents found in database")
                 return False
             
-            print(f"Found {len(keterangan_docs)} keterangan documents")
+            logger.info(f"Found {len(keterangan_docs)} keterangan documents")
             
             # Create embeddings for all descriptions
             descriptions = []
@@ -104,10 +107,10 @@ class searchKeterangan:
                     packages.append(package)
             
             if not descriptions:
-                print("No valid descriptions found")
+                logger.warning("No valid descriptions found")
                 return False
             
-            print(f"Creating embeddings for {len(descriptions)} descriptions...")
+            logger.info(f"Creating embeddings for {len(descriptions)} descriptions...")
             embeddings = []
             for desc in descriptions:
                 embedding = create_embedding(desc)
@@ -126,11 +129,11 @@ class searchKeterangan:
             # Create package mappings
             package_mappings = {i: packages[i] for i in range(len(packages))}
             
-            print(f"FAISS index initialized with {faiss_index.ntotal} vectors")
+            logger.info(f"FAISS index initialized with {faiss_index.ntotal} vectors")
             return True
             
         except Exception as e:
-            print(f"Error initializing FAISS index: {str(e)}")
+            logger.error(f"Error initializing FAISS index: {e}")
             return False
         
     
@@ -140,7 +143,7 @@ class searchKeterangan:
             embedding = embedding_model.encode([text])
             return embedding[0]
         except Exception as e:
-            print(f"Error creating embedding: {str(e)}")
+            logger.error(f"Error creating embedding: {e}")
             # Return zero vector as fallback
             return np.zeros(384)  # all-MiniLM-L6-v2 has 384 dimensions
         
@@ -172,5 +175,5 @@ class searchKeterangan:
             description = await llm_service.generate_response(prompt, [])
             return description.strip()
         except Exception as e:
-            print(f"Error generating profile description: {str(e)}")
+            logger.error(f"Error generating profile description: {e}")
             return f"Organisasi dengan {qa_pairs.get('question3', 'ukuran tidak diketahui')} karyawan dan struktur {qa_pairs.get('question6', 'tidak diketahui')}"
\ No newline at end of file
@@ -1,5 +1,7 @@
 from flask import request, jsonify
+import logging
 from shared.session_manager import get_or_create_session, async_route
+from shared.json_provider import json_response
 from datetime import datetime
 
 from .usecases import evaluate_with_llm, send_email
@@ -11,6 +13,8 @@ from email_template import generate_email_template
 
 from . import result
 
+logger = logging.getLogger(__name__)
+
 @result.route('/submit_email', methods=['POST'])
 def submit_email():
     """Submit user email for notifications"""
@@ -38,7 +42,7 @@ def submit_email():
             data=data,
             message="Email submitted successfully"
         )
-        return jsonify(response.model_dump()), 200
+        return json_response(response), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -53,10 +57,10 @@ async def get_results():
         manager = get_or_create_session()
         
         current_phase = manager.context.get('current_phase')
-        print(f"Current phase: {current_phase}")
+        logger.debug(f"Current phase: {current_phase}")
         
         if current_phase == "evaluation":
-            print("Performing LLM evaluation...")
+            logger.info("Performing LLM evaluation...")
             evaluation = await evaluate_with_llm(manager)
             
             manager.context["final_evaluation"] = evaluation
@@ -79,13 +83,12 @@ async def get_results():
                 email_subject = "Digital Forensic Readiness (DFR) Test Results"
                 email_body = generate_email_template(manager)
                 try:
-                    print(f"Sending email to: {user_email}")
-                    send_email(user_email, email_subject, email_body)
-                    print("Email sent successfully")
+                    logger.info(f"Queueing result email for session {manager.session_id}")
+                    send_email(user_email, email_subject, email_body, idempotency_key=f"v1-results:{manager.session_id}")
                 except Exception as e:
-                    print(f"Failed to send email: {str(e)}")
+                    logger.error(f"Failed to queue email: {e}", exc_info=True)
             else:
-                print("Email not provided.")
+                logger.info("Email not provided.")
                 return jsonify({
                     "error": "Email not provided. Please submit your email to receive results."
                 })
@@ -155,11 +158,9 @@ async def get_results():
             )
 
         else:
-            print("Test answers not submitted.")
+            logger.info("Test answers not submitted.")
             return jsonify({"error": "Please submit test answers first"}), 400
         
     except Exception as e:
-        print(f"Error in get_results: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.error(f"Error in get_results: {e}", exc_info=True)
         return jsonify({"error in get_results": str(e)}), 500
\ No newline at end of file
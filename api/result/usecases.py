@@ -1,33 +1,27 @@
-import resend
 from config import settings
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from shared.session_manager import SessionManager
 from services.llm_service import llm_service
+from services.email_outbox import email_outbox
 import random
-from prompts import AssessmentPrompts
+from prompts import AssessmentPrompts, EVALUATION_OUTPUT
 import json
+from shared.logging_config import truncated
+import logging
 
-resend.api_key = settings.MAIL_RESEND_API_KEY
+logger = logging.getLogger(__name__)
 
-def send_email(to: str, subject: str, body: str):
-    """Send email notification using Resend"""
-    try:
-        params = {
-            "from": "noreply@stelarea.com",
-            "to": [to],
-            "subject": subject,
-            "html": body,
-        }
-        
-        email = resend.Emails.send(params)
-        
-        print(f"Email sent successfully to {to}")
-        print(f"Email ID: {email.get('id')}")
-        return email
-        
-    except Exception as e:
-        print(f"Failed to send email to {to}: {str(e)}")
-        raise e
+def send_email(to: str, subject: str, body: str, idempotency_key: Optional[str] = None) -> str:
+    """
+    Queue an email notification for background delivery
+
+    Returns right away; the outbox sender delivers (and retries) it.
+    Passing the same ``idempotency_key`` again does not send a second email.
+
+    Returns:
+        The message's idempotency key
+    """
+    return email_outbox.enqueue(to, subject, body, idempotency_key)
     
 async def evaluate_with_llm(manager: SessionManager) -> Dict[str, Any]:
     """Perform comprehensive evaluation using LLM"""
@@ -40,7 +34,7 @@ async def evaluate_with_llm(manager: SessionManager) -> Dict[str, Any]:
         
         # Ensure user_profile is a dictionary
         if not isinstance(user_profile, dict):
-            print("Error: user_profile is not a dictionary. Fallback to empty dictionary.")
+            logger.warning("user_profile is not a dictionary. Fallback to empty dictionary.")
             user_profile = ""  # Fallback to an empty dictionary
         
         # Proceed if it's a valid dictionary
@@ -60,7 +54,7 @@ async def evaluate_with_llm(manager: SessionManager) -> Dict[str, Any]:
             user_profile, selected_package, qa_pairs, questions, answers, avg_score
         )
         
-        ai_response = await llm_service.generate_response(prompt, [])
+        ai_response = await llm_service.generate_response(prompt, [], response_schema=EVALUATION_OUTPUT)
         
         # Ensure the response is not empty and contains JSON
         if ai_response and ai_response.strip().startswith("{") and ai_response.strip().endswith("}"):
@@ -68,10 +62,10 @@ async def evaluate_with_llm(manager: SessionManager) -> Dict[str, Any]:
                 # Try parsing the JSON response
                 evaluation = json.loads(ai_response)
             except json.JSONDecodeError as e:
-                print(f"Error parsing JSON response: {str(e)}")
+                logger.error(f"Error parsing JSON response: {e}")
                 return {"error": "Failed to parse evaluation response"}
         else:
-            print(f"Invalid or empty response from LLM: {ai_response}")
+            logger.warning("Invalid or empty response from LLM: %s", truncated(ai_response))
             return {"error": "No valid JSON response from LLM"}
             
         
@@ -82,5 +76,5 @@ async def evaluate_with_llm(manager: SessionManager) -> Dict[str, Any]:
         return ai_response
 
     except Exception as e:
-        print(f"Error during evaluation: {str(e)}")
+        logger.error(f"Error during evaluation: {e}", exc_info=True)
         return {"error di main": str(e)}
\ No newline at end of file
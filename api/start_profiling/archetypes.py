@@ -0,0 +1,187 @@
+# api/start_profiling/archetypes.py
+"""
+Precomputed profile-description archetypes
+
+The 11 profiling questions have ~1.8M answer combinations, far too many to
+pre-generate. They are clustered into archetypes instead: the four size
+questions (employees, revenue, assets, tax) collapse into one scale level,
+tenure and experience into one seniority level, and education into three
+bands, leaving 972 archetypes. ``build_archetypes.py`` generates one
+description per archetype offline; at request time a hit is a dict lookup
+and a miss (e.g. a free-text "Lainnya" answer) falls back to the LLM.
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from lib.profiling_question import PROFILING_QUESTIONS
+from shared.metrics import register_cache
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION = 1
+
+# Question positions (0-based) grouped per archetype dimension
+SCALE_QUESTIONS = (2, 3, 6, 7)       # employees, revenue, assets, tax
+SENIORITY_QUESTIONS = (8, 10)        # tenure, work experience
+EDUCATION_QUESTION = 9
+
+# Label -> option index per question; free-text options are not clustered
+_OPTION_INDEX: List[Dict[str, int]] = [
+    {option["label"]: idx for idx, option in enumerate(q["options"]) if not option.get("is_field")}
+    for q in PROFILING_QUESTIONS
+]
+
+# Coarse levels: representative option indices used to describe each level
+SCALE_LEVELS = {"small": (0, 1), "medium": (1, 2), "large": (2, 3)}
+SENIORITY_LEVELS = {"junior": (0, 1), "mid": (1, 2), "senior": (2, 3)}
+EDUCATION_LEVELS = {"diploma": (0, 1), "bachelor": (2,), "postgraduate": (3, 4)}
+
+# Archetype dimensions in key order: name -> possible values
+DIMENSIONS: List[Tuple[str, Tuple[Any, ...]]] = [
+    ("umkm", (0, 1)),
+    ("bumn", (0, 1)),
+    ("scale", tuple(SCALE_LEVELS)),
+    ("funding", (0, 1, 2)),
+    ("structure", (0, 1, 2)),
+    ("seniority", tuple(SENIORITY_LEVELS)),
+    ("education", tuple(EDUCATION_LEVELS)),
+]
+
+
+def answer_indices(qa_pairs: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+    """
+    Option index per profiling question
+
+    Returns:
+        Tuple of 11 indices, or None if any answer is free text or unknown
+    """
+    indices = []
+    for i, options in enumerate(_OPTION_INDEX):
+        answer = qa_pairs.get(f"question{i + 1}")
+        idx = options.get(str(answer).strip()) if answer is not None else None
+        if idx is None:
+            return None
+        indices.append(idx)
+    return tuple(indices)
+
+
+def archetype_key(indices: Tuple[int, ...]) -> str:
+    """Cluster an answer tuple into its archetype key"""
+    scale = sum(indices[i] for i in SCALE_QUESTIONS)         # 0..12
+    seniority = sum(indices[i] for i in SENIORITY_QUESTIONS)  # 0..6
+    education = indices[EDUCATION_QUESTION]
+
+    values = {
+        "umkm": indices[0],
+        "bumn": indices[1],
+        "scale": "small" if scale <= 3 else "medium" if scale <= 8 else "large",
+        "funding": indices[4],
+        "structure": indices[5],
+        "seniority": "junior" if seniority <= 1 else "mid" if seniority <= 4 else "senior",
+        "education": "diploma" if education <= 1 else "bachelor" if education == 2 else "postgraduate",
+    }
+    return key_for(values)
+
+
+def iter_archetypes() -> Iterator[Dict[str, Any]]:
+    """All archetypes as dimension -> value dicts"""
+    names = [name for name, _ in DIMENSIONS]
+    for combo in itertools.product(*(values for _, values in DIMENSIONS)):
+        yield dict(zip(names, combo))
+
+
+def key_for(archetype: Dict[str, Any]) -> str:
+    """Key of an archetype given as a dimension -> value dict"""
+    return "|".join(f"{name}={archetype[name]}" for name, _ in DIMENSIONS)
+
+
+def representative_answers(archetype: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Answers describing an archetype, in the ``qa_pairs`` format
+
+    Clustered questions are answered with the range of labels the archetype
+    covers (e.g. "<10 atau 10-50"), so the generated description does not
+    claim figures a matching user never gave.
+    """
+    ranges: Dict[int, Tuple[int, ...]] = {
+        0: (archetype["umkm"],),
+        1: (archetype["bumn"],),
+        4: (archetype["funding"],),
+        5: (archetype["structure"],),
+        EDUCATION_QUESTION: EDUCATION_LEVELS[archetype["education"]],
+    }
+    for i in SCALE_QUESTIONS:
+        ranges[i] = SCALE_LEVELS[archetype["scale"]]
+    for i in SENIORITY_QUESTIONS:
+        ranges[i] = SENIORITY_LEVELS[archetype["seniority"]]
+
+    return {
+        f"question{i + 1}": " atau ".join(PROFILING_QUESTIONS[i]["options"][idx]["label"] for idx in ranges[i])
+        for i in range(len(PROFILING_QUESTIONS))
+    }
+
+
+class ArchetypeTable:
+    """Lazily loaded archetype key -> description lookup table"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._descriptions: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, qa_pairs: Dict[str, Any]) -> Optional[str]:
+        """Precomputed description for the answers, or None on a miss"""
+        indices = answer_indices(qa_pairs)
+        description = self._load().get(archetype_key(indices)) if indices is not None else None
+        if description is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return description
+
+    def _load(self) -> Dict[str, str]:
+        if self._descriptions is None:
+            with self._lock:
+                if self._descriptions is None:
+                    self._descriptions = load_table(self.path)
+        return self._descriptions
+
+
+def load_table(path: str) -> Dict[str, str]:
+    """Read an archetype table; a missing or outdated file yields an empty table"""
+    if not os.path.exists(path):
+        logger.info(f"No profile archetype table at {path}, descriptions come from the LLM")
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Failed to read profile archetype table {path}: {e}")
+        return {}
+
+    if table.get("version") != TABLE_VERSION:
+        logger.warning(f"Ignoring profile archetype table {path}: version {table.get('version')} != {TABLE_VERSION}")
+        return {}
+    descriptions = table.get("descriptions", {})
+    logger.info(f"Loaded {len(descriptions)} profile archetypes from {path}")
+    return descriptions
+
+
+def table_path() -> str:
+    """Configured table path; relative paths are resolved from the project root"""
+    path = settings.PROFILE_ARCHETYPES_PATH
+    if os.path.isabs(path):
+        return path
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+    return os.path.join(project_root, path)
+
+
+archetype_table = ArchetypeTable(table_path())
+register_cache("profile_archetypes", lambda: (archetype_table.hits, archetype_table.misses))
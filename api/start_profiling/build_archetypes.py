@@ -0,0 +1,132 @@
+"""
+Offline job: pre-generate profile descriptions for every archetype
+
+Writes the lookup table read by ``archetypes.ArchetypeTable``. Existing
+entries are kept, so an interrupted run resumes where it stopped; use
+--force to regenerate everything (e.g. after changing the prompt).
+
+Usage:
+    python api/start_profiling/build_archetypes.py [--output PATH] [--concurrency 4] [--limit N] [--force]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, project_root)
+
+from services.llm_service import llm_service
+from shared.admission import PRIORITY_BATCH
+from lib.profiling_question import PROFILING_QUESTIONS
+from api.start_profiling.archetypes import (
+    TABLE_VERSION,
+    iter_archetypes,
+    key_for,
+    representative_answers,
+    table_path
+)
+from api.start_profiling.prompts import build_profile_description_messages, PROFILE_DESCRIPTION_BUDGET
+from api.start_profiling.utils import format_profile_text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Answers like this mean every backend failed; never store them
+UNAVAILABLE_MARKERS = ("sistem AI sedang tidak tersedia", "Primary LLM tidak dikonfigurasi")
+
+
+def load_existing(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get("version") != TABLE_VERSION:
+        logger.warning(f"Existing table has version {table.get('version')}, starting over")
+        return {}
+    return table.get("descriptions", {})
+
+
+def save_table(path: str, descriptions: dict) -> None:
+    """Write the table atomically so the app never reads a half-written file"""
+    table = {
+        "version": TABLE_VERSION,
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "model": llm_service.model,
+        "total": len(descriptions),
+        "descriptions": dict(sorted(descriptions.items()))
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+async def generate_description(archetype: dict) -> str:
+    qa_pairs = representative_answers(archetype)
+    profile_text = format_profile_text(qa_pairs, PROFILING_QUESTIONS)
+    messages = build_profile_description_messages(profile_text)
+    description = await llm_service.call_llm(
+        messages,
+        max_tokens=PROFILE_DESCRIPTION_BUDGET.max_tokens,
+        priority=PRIORITY_BATCH
+    )
+    if any(marker in description for marker in UNAVAILABLE_MARKERS):
+        raise RuntimeError(description)
+    return description.strip()
+
+
+async def build(output: str, concurrency: int, limit: int, force: bool) -> None:
+    descriptions = {} if force else load_existing(output)
+    pending = [a for a in iter_archetypes() if key_for(a) not in descriptions]
+    if limit:
+        pending = pending[:limit]
+    logger.info(f"{len(descriptions)} archetypes already generated, {len(pending)} to go")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    failed = 0
+    start_time = time.time()
+
+    async def run(archetype: dict) -> None:
+        nonlocal done, failed
+        key = key_for(archetype)
+        async with semaphore:
+            try:
+                descriptions[key] = await generate_description(archetype)
+                done += 1
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed {key}: {e}")
+                return
+        # Checkpoint regularly so a crash loses little work
+        if done % 25 == 0:
+            save_table(output, descriptions)
+            logger.info(f"Progress: {done}/{len(pending)} ({time.time() - start_time:.0f}s)")
+
+    await asyncio.gather(*(run(a) for a in pending))
+    save_table(output, descriptions)
+
+    logger.info(f"\n{'='*60}")
+    logger.info(f"Generated: {done}, failed: {failed}, table size: {len(descriptions)}")
+    logger.info(f"Time taken: {time.time() - start_time:.2f} seconds")
+    logger.info(f"Saved to {output}")
+    logger.info(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default=table_path(), help="Table path (default: PROFILE_ARCHETYPES_PATH)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent LLM requests")
+    parser.add_argument("--limit", type=int, default=0, help="Generate at most N archetypes (0 = all)")
+    parser.add_argument("--force", action="store_true", help="Regenerate existing entries")
+    args = parser.parse_args()
+
+    asyncio.run(build(args.output, args.concurrency, args.limit, args.force))
+
+
+if __name__ == "__main__":
+    main()
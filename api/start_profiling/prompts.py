@@ -1,6 +1,7 @@
 """
 Prompts for profiling feature
 """
+from shared.token_budget import EndpointBudget, PromptSection, fit_sections
 
 PROFILE_DESCRIPTION_SYSTEM = """
 Anda adalah AI ahli dalam analisis profil organisasi dan digital forensics readiness assessment.
@@ -26,8 +27,22 @@ Buatlah deskripsi 1 paragraf yang komprehensif dan dapat digunakan untuk similar
 """
 
 
+# Output: one descriptive paragraph
+PROFILE_DESCRIPTION_BUDGET = EndpointBudget(
+    name="profile_description",
+    max_prompt_tokens=3000,
+    output_schema=500
+)
+
+
 def build_profile_description_messages(profile_text: str) -> list:
     """Build LLM messages for profile description generation"""
+    fields = fit_sections(
+        PROFILE_DESCRIPTION_BUDGET,
+        PROFILE_DESCRIPTION_SYSTEM,
+        PROFILE_DESCRIPTION_USER,
+        [PromptSection("profile_text", profile_text, value=0)]
+    )
     return [
         {
             "role": "system",
@@ -35,8 +50,6 @@ def build_profile_description_messages(profile_text: str) -> list:
         },
         {
             "role": "user",
-            "content": PROFILE_DESCRIPTION_USER.format(
-                profile_text=profile_text
-            )
+            "content": PROFILE_DESCRIPTION_USER.format(**fields)
         }
     ]
\ No newline at end of file
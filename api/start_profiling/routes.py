@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
 from shared.session_manager import get_or_create_session, async_route
+from shared.json_provider import json_response
 from ..base.base_schemas import BaseResponse
 from .schemas import (
     SubmitAnswersRequest,
@@ -66,14 +67,14 @@ def get_profiling_questions():
             message="Profiling questions retrieved successfully"
         )
         
-        return jsonify(response.model_dump(exclude_none=True))
+        return json_response(response, exclude_none=True)
 
     except Exception as e:
         response = BaseResponse.error(
             message="Failed to retrieve profiling questions",
             errors=str(e)
         )
-        return jsonify(response.model_dump(exclude_none=True)), 500
+        return json_response(response, exclude_none=True), 500
 
 
 @start_profiling_bp.route('/submit_answers', methods=['POST'])
@@ -127,7 +128,7 @@ async def submit_answers():
             message="Validation error",
             errors=e
         )
-        return jsonify(response.model_dump(exclude_none=True)), 400
+        return json_response(response, exclude_none=True), 400
         
     try:
         manager = get_or_create_session()
@@ -143,7 +144,7 @@ async def submit_answers():
                 message="AI system is currently unavailable",
                 errors="Maaf, sistem AI sedang tidak tersedia. Silakan coba lagi nanti."
             )
-            return jsonify(response.model_dump(exclude_none=True)), 500
+            return json_response(response, exclude_none=True), 500
 
         # Build response data
         response_data = SubmitAnswersData(
@@ -159,11 +160,11 @@ async def submit_answers():
             message="Answers submitted successfully"
         )
             
-        return jsonify(response.model_dump(exclude_none=True))
+        return json_response(response, exclude_none=True)
 
     except Exception as e:
         response = BaseResponse.error(
             message="Failed to submit answers",
             errors=str(e)
         )
-        return jsonify(response.model_dump(exclude_none=True)), 500
\ No newline at end of file
+        return json_response(response, exclude_none=True), 500
\ No newline at end of file
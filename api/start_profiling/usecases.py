@@ -1,13 +1,14 @@
 # api/profiling/usecases.py
-from services.llm_service import LLMService
+from services.llm_service import llm_service
+from config import settings
 from typing import List, Dict, Any
 import logging
 
-from .prompts import build_profile_description_messages
+from .prompts import build_profile_description_messages, PROFILE_DESCRIPTION_BUDGET
+from .archetypes import archetype_table
 from .utils import format_profile_text, parse_answers_from_request, update_profile_from_qa, update_manager_phase_profiling
 
 logger = logging.getLogger("debug_logger")
-llm_service = LLMService()
 
 async def generate_profile_description(
     manager: Any,
@@ -30,9 +31,14 @@ async def generate_profile_description(
         update_profile_from_qa(manager, qa_pairs)
 
         profile_text = format_profile_text(qa_pairs, questions)
-        messages = build_profile_description_messages(profile_text)
 
-        description = await llm_service.call_llm(messages)
+        # Precomputed archetype description: no LLM round trip on a hit
+        description = archetype_table.lookup(qa_pairs) if settings.PROFILE_ARCHETYPES_ENABLED else None
+        if description is None:
+            messages = build_profile_description_messages(profile_text)
+            description = await llm_service.call_llm(messages, max_tokens=PROFILE_DESCRIPTION_BUDGET.max_tokens)
+        else:
+            logger.info("Profile description served from archetype table")
         manager = update_manager_phase_profiling(manager, description, qa_pairs)
         
         return description.strip()
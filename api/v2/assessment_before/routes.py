@@ -4,6 +4,9 @@ import logging
 
 from ..base.base_schemas import BaseResponse
 from shared.session_manager import get_or_create_session
+from shared.json_provider import json_response
+from shared.compression import spliced_json_response
+from shared.logging_config import truncated
 from shared.async_utils import run_async
 from .usecases import assessment_questions, process_assessment_submission
 from . import assessment_before_bp_v2
@@ -11,6 +14,7 @@ from . import assessment_before_bp_v2
 from .schemas import (
     SubmitTestAnswersRequest,
     GetAssessmentModel,
+    AssessmentQuestionList,
     SubmitAnswersAssessment
 )
 
@@ -33,12 +37,14 @@ def get_quick_test_questions():
             response = BaseResponse.error(
                 message=f"No questions found for package: {manager.context.get('selected_package')}"
             )
-            return jsonify(response.model_dump()), 404
+            return json_response(response), 404
         
+        # Same list for every session: sent as a precompressed fragment
+        questions_json = AssessmentQuestionList.dump_json(AssessmentQuestionList.validate_python(questions))
         data = GetAssessmentModel(
             session_id=manager.session_id,
             package=manager.context.get("selected_package", ""),
-            questions=questions,
+            questions=[],
             questions_count=len(questions),
             current_phase=manager.context["current_phase"],
             instruction="Please respond with numbers 1-4 for each question (Likert scale)"
@@ -48,42 +54,39 @@ def get_quick_test_questions():
             data=data,
             message="Test questions retrieved successfully"
         )
-        return jsonify(response.model_dump()), 200
+        return spliced_json_response(response, "questions", questions_json), 200
         
     except Exception as e:
         response = BaseResponse.error(
             message="Failed to get test questions",
             errors={"detail": str(e)}
         )
-        return jsonify(response.model_dump()), 500
+        return json_response(response), 500
 
 @assessment_before_bp_v2.route('/submit_test_answers', methods=['POST'])
 def submit_test_answers():
     """Submit assessment answers and calculate scores"""
-    logger.debug("=== submit_test_answers called ===")
     try:
-        logger.debug("Getting or creating session...")
         manager = get_or_create_session()
-        logger.debug(f"Session ID: {manager.session_id}")
-        logger.debug(f"Current context: {manager.context}")
+        logger.debug("submit_test_answers: phase=%s context keys=%s",
+                     manager.context.get("current_phase"), truncated(list(manager.context)))
         
         if not request.is_json:
             logger.debug("Request is not JSON, returning 400")
-            return jsonify(
-                BaseResponse.error(message="Request must be JSON").model_dump()
+            return json_response(
+                BaseResponse.error(message="Request must be JSON")
             ), 400
         
         data = request.get_json()
-        logger.debug(f"Received request data: {data}")
+        logger.debug("Received request data: %s", truncated(data))
         
         try:
-            logger.debug("Processing assessment submission...")
             result = process_assessment_submission(manager, data)
-            logger.debug(f"Assessment result: {result}")
+            logger.debug("Assessment result: %s", truncated(result))
         except ValueError as e:
-            logger.debug(f"ValueError in process_assessment_submission: {e}")
-            return jsonify(
-                BaseResponse.error(message=str(e)).model_dump()
+            logger.debug("ValueError in process_assessment_submission: %s", e)
+            return json_response(
+                BaseResponse.error(message=str(e))
             ), 400
         
         response_data = SubmitAnswersAssessment(
@@ -92,21 +95,18 @@ def submit_test_answers():
             enablers_score=result["enablers_score"],
             maturity_level=result["maturity_level"]
         )
-        logger.debug(f"Response data: {response_data}")
-        
-        logger.debug("=== submit_test_answers completed successfully ===")
-        return jsonify(
+        return json_response(
             BaseResponse.success(
                 data=response_data,
                 message="Answers submitted successfully"
-            ).model_dump()
+            )
         ), 200
         
     except Exception as e:
         logger.error(f"Error in submit_test_answers: {e}", exc_info=True)
-        return jsonify(
+        return json_response(
             BaseResponse.error(
                 message="Failed to submit answers",
                 errors=str(e)
-            ).model_dump()
+            )
         ), 500
\ No newline at end of file
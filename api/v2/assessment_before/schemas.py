@@ -1,6 +1,6 @@
 # features/assessment_before/schemas.py
 from typing import List, Dict, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 # REQUEST SCHEMAS
 class SubmitTestAnswersRequest(BaseModel):
@@ -25,6 +25,10 @@ class GetAssessmentModel(BaseModel):
     session_id: str
     questions: List[AssessmentQuestion]
 
+# The question list is serialized on its own and spliced into the response
+# (see shared.compression.spliced_json_response)
+AssessmentQuestionList = TypeAdapter(List[AssessmentQuestion])
+
 class SubmitAnswersAssessment(BaseModel):
     """Response data for POST /submit_test_answers"""
     session_id: str
@@ -1,4 +1,5 @@
 from typing import List, Dict, Any
+import logging
 
 from flask import jsonify
 from api.v2.assessment_before.utils import format_questions, update_manager_phase_assessment_question, update_manager_phase_assessment_submission, validate_answers, format_questions, calculate_score, check_maturity_level
@@ -7,6 +8,10 @@ from ..base.base_schemas import BaseResponse
 from services.database import v2
 from shared.session_manager import SessionManager
 from shared.async_utils import run_async
+from config import settings
+from ..result.usecases import submit_results_job
+
+logger = logging.getLogger(__name__)
 
 def assessment_questions(manager: SessionManager) -> List[dict]:
     selected_package = manager.context.get("selected_package")
@@ -60,6 +65,14 @@ def process_assessment_submission(
 
     maturity_level = check_maturity_level(enablers_score)
     manager.context["maturity_level"] = maturity_level
+
+    # Every input of the summary analysis is known now: generate it while
+    # the user is still on the score page so get_results is a cache read
+    if settings.JOB_PRESTART_RESULTS:
+        try:
+            submit_results_job(manager, replace=True)
+        except Exception as e:
+            logger.warning(f"Could not pre-start results job: {e}")
     
     # Return results
     return {
@@ -0,0 +1,294 @@
+"""
+Question bank build pipeline
+
+Builds the v2 question bank in three cached stages:
+
+1. journal  - OCR of the journal PDF (cached by PDF hash), or a .txt as-is
+2. generate - questions per enabler, cached by a hash of every input of the
+              LLM call (journal text, prompt template, enabler, model and
+              generation parameters); only enablers whose inputs changed
+              are sent to the LLM, and an interrupted run resumes from the
+              answers already cached
+3. assemble - parse the cached answers, carry scoring (contribution_max)
+              over from the previous bank for known indicators and write an
+              immutable bank-<version>.json; the version is a hash of the
+              bank content, so an unchanged build yields the same version
+
+database/question_bank/manifest.json points at the current version, which
+database/clean-and-import.py imports.
+
+Usage:
+    python api/v2/create_question/build_bank.py [--journal PATH] [--scoring-from PATH]
+        [--concurrency 7] [--max-attempts 3] [--dry-run]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from shared.singleflight import canonical_key
+from lib.generating_question import JOURNAL_TXT, GENERATE_QUESTION_V2_TEMPLATE, build_generate_question_v2_prompt
+from create_question import (
+    GENERATION_PARAMS,
+    enabler_list,
+    generate_enabler,
+    indicator_count,
+    is_unavailable,
+    llm_service,
+    structure_all_enablers
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BANK_DIR = os.path.join(project_root, "database", "question_bank")
+CACHE_DIR = os.path.join(BANK_DIR, "cache")
+MANIFEST = os.path.join(BANK_DIR, "manifest.json")
+# Bank imported before the pipeline existed; scoring source for the first build
+LEGACY_BANK = os.path.join(project_root, "database", "generated_questions_08122025_0138.json")
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_json_atomic(path: str, data) -> None:
+    """Write via a temp file and rename so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# ---- stage 1: journal ----
+
+def load_journal(path: str) -> str:
+    """Journal text; PDFs are OCR'd once per distinct file content"""
+    if not path.lower().endswith(".pdf"):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    with open(path, 'rb') as f:
+        pdf_hash = sha256_bytes(f.read())
+    cached = os.path.join(CACHE_DIR, "ocr", f"{pdf_hash}.txt")
+    if os.path.exists(cached):
+        logger.info(f"OCR cache hit for {os.path.basename(path)}")
+        with open(cached, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    from ocr import ocr_pdf  # pytesseract/pdf2image are only needed here
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    return ocr_pdf(path, txt_path=cached)
+
+
+# ---- stage 2: generate ----
+
+def enabler_input_key(enabler: str, journal_hash: str, template_hash: str, model: str) -> str:
+    """Hash of every input that affects the LLM answer for one enabler"""
+    return canonical_key(enabler, journal_hash, template_hash, model, GENERATION_PARAMS)
+
+
+def enabler_cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, "enablers", f"{key}.json")
+
+
+async def generate_missing(pending, prompt: str, concurrency: int, max_attempts: int) -> int:
+    """
+    Generate the enablers without a cached answer
+
+    Each answer is cached as soon as it arrives; a failed enabler does not
+    stop the others. The LLM failure text and answers that parse to no
+    questions count as failed and are never cached, so the next build asks
+    again instead of shipping an empty enabler.
+
+    Returns:
+        Number of enablers that failed
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    start_time = time.time()
+
+    async def run(enabler: str, key: str) -> None:
+        nonlocal done
+        async with semaphore:
+            result = await generate_enabler(enabler, prompt, max_attempts)
+        if is_unavailable(result["response"]) or result["questions_parsed"] == 0:
+            raise RuntimeError("LLM gave no usable answer; not cached")
+        write_json_atomic(enabler_cache_path(key), {
+            "enabler": enabler,
+            "response": result["response"],
+            "model": llm_service.model,
+            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        })
+        done += 1
+        logger.info(
+            f"Progress: {done}/{len(pending)} - {enabler.split('(')[0].strip()}: "
+            f"{result['questions_parsed']}/{indicator_count(enabler)} questions ({time.time() - start_time:.1f}s)"
+        )
+
+    outcomes = await asyncio.gather(*(run(enabler, key) for enabler, key in pending), return_exceptions=True)
+    failed = 0
+    for (enabler, _), outcome in zip(pending, outcomes):
+        if isinstance(outcome, Exception):
+            failed += 1
+            logger.error(f"Generation failed for {enabler}: {outcome}")
+    return failed
+
+
+# ---- stage 3: assemble ----
+
+def normalize_indicator(text: str) -> str:
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def load_scoring(path: str) -> dict:
+    """(enabler_id, indicator) -> contribution_max from an existing bank"""
+    if not path or not os.path.exists(path):
+        logger.warning("No scoring source; questions use the importer's default contribution_max")
+        return {}
+    scoring = {}
+    for enabler in read_json(path).get("enablers", []):
+        for question in enabler.get("questions", []):
+            if "contribution_max" in question:
+                key = (enabler.get("enabler_id"), normalize_indicator(question.get("indicator", "")))
+                scoring[key] = question["contribution_max"]
+    logger.info(f"Loaded scoring for {len(scoring)} indicators from {path}")
+    return scoring
+
+
+def apply_scoring(bank: dict, scoring: dict) -> int:
+    """Copy contribution_max onto matching indicators; returns the number of unscored questions"""
+    unscored = 0
+    for enabler in bank["enablers"]:
+        for question in enabler["questions"]:
+            value = scoring.get((enabler["enabler_id"], normalize_indicator(question["indicator"])))
+            if value is None:
+                unscored += 1
+            else:
+                question["contribution_max"] = value
+        if all("contribution_max" in q for q in enabler["questions"]):
+            enabler["sum_contribution_max"] = sum(q["contribution_max"] for q in enabler["questions"])
+    return unscored
+
+
+def bank_version(bank: dict) -> str:
+    """Content version: identical questions and scoring give the same version"""
+    return canonical_key(bank["enablers"])[:12]
+
+
+def load_manifest() -> dict:
+    if os.path.exists(MANIFEST):
+        return read_json(MANIFEST)
+    return {"current": None, "versions": []}
+
+
+def current_bank_path(manifest: dict):
+    if not manifest.get("current"):
+        return None
+    return os.path.join(BANK_DIR, f"bank-{manifest['current']}.json")
+
+
+def publish(bank: dict, manifest: dict) -> str:
+    """Write the bank (if new) and point the manifest at it"""
+    version = bank["metadata"]["bank_version"]
+    path = os.path.join(BANK_DIR, f"bank-{version}.json")
+    if not os.path.exists(path):
+        write_json_atomic(path, bank)
+    if manifest.get("current") != version:
+        manifest["current"] = version
+        manifest["versions"].append({
+            "version": version,
+            "file": os.path.basename(path),
+            "built_at": bank["metadata"]["generated_at"],
+            "inputs": bank["metadata"]["inputs"]
+        })
+        write_json_atomic(MANIFEST, manifest)
+    return path
+
+
+async def build(args) -> None:
+    start_time = time.time()
+    manifest = load_manifest()
+
+    journal_text = load_journal(args.journal)
+    journal_hash = sha256_bytes(journal_text.encode('utf-8'))
+    template_hash = sha256_bytes(GENERATE_QUESTION_V2_TEMPLATE.encode('utf-8'))
+    model = llm_service.model
+
+    keys = [enabler_input_key(enabler, journal_hash, template_hash, model) for enabler in enabler_list]
+    pending = [(enabler, key) for enabler, key in zip(enabler_list, keys) if not os.path.exists(enabler_cache_path(key))]
+    logger.info(f"{len(enabler_list) - len(pending)}/{len(enabler_list)} enablers unchanged, {len(pending)} to generate")
+
+    if args.dry_run:
+        for enabler, _ in pending:
+            logger.info(f"  would generate: {enabler}")
+        return
+
+    if pending:
+        prompt = build_generate_question_v2_prompt(journal_text)
+        failed = await generate_missing(pending, prompt, args.concurrency, args.max_attempts)
+        if failed:
+            logger.error(f"{failed} enablers failed; rerun to retry them (finished ones are cached)")
+            sys.exit(1)
+
+    raw = [read_json(enabler_cache_path(key)) for key in keys]
+    bank = structure_all_enablers(raw)
+
+    scoring_from = args.scoring_from or current_bank_path(manifest) or LEGACY_BANK
+    unscored = apply_scoring(bank, load_scoring(scoring_from))
+    if unscored:
+        logger.warning(f"{unscored} questions have no contribution_max (new indicators?)")
+
+    bank["metadata"]["inputs"] = {
+        "journal_sha256": journal_hash,
+        "prompt_sha256": template_hash,
+        "model": model,
+        "generation": GENERATION_PARAMS,
+        "enablers": dict(zip((e.split(':')[0] for e in enabler_list), keys)),
+        "scoring_from": os.path.relpath(scoring_from, project_root) if os.path.exists(scoring_from) else None
+    }
+    bank["metadata"]["bank_version"] = bank_version(bank)
+
+    previous = manifest.get("current")
+    path = publish(bank, manifest)
+    version = bank["metadata"]["bank_version"]
+
+    logger.info(f"\n{'='*60}")
+    if version == previous:
+        logger.info(f"Bank unchanged: version {version}")
+    else:
+        logger.info(f"Published bank version {version} (previous: {previous})")
+    logger.info(f"Questions: {sum(e['questions_parsed'] for e in bank['enablers'])}, unscored: {unscored}")
+    logger.info(f"Saved to {path}")
+    logger.info(f"Time taken: {time.time() - start_time:.2f} seconds")
+    logger.info(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--journal", default=JOURNAL_TXT, help="Journal .txt, or a .pdf to OCR")
+    parser.add_argument("--scoring-from", help="Bank to copy contribution_max from (default: current bank)")
+    parser.add_argument("--concurrency", type=int, default=len(enabler_list), help="Enablers generated at the same time")
+    parser.add_argument("--max-attempts", type=int, default=3, help="LLM attempts per enabler when parsing comes up short")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which enablers would be regenerated")
+    args = parser.parse_args()
+
+    asyncio.run(build(args))
+
+
+if __name__ == "__main__":
+    main()
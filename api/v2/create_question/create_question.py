@@ -1,3 +1,4 @@
+import argparse
 import json
 import re
 import sys
@@ -9,13 +10,15 @@ import time
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
 sys.path.insert(0, project_root)
 
-from services.llm_service import LLMService
-from lib.generating_question import generate_question_v2_prompt
+from services.llm_service import llm_service, is_unavailable
+from shared.admission import PRIORITY_BATCH
+from lib.generating_question import JOURNAL_TXT, load_journal_text, build_generate_question_v2_prompt
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-llm_service = LLMService()
+# LLM parameters for question generation (part of the bank build cache key)
+GENERATION_PARAMS = {"max_tokens": 4000, "temperature": 0.7}
 
 enabler_list = [
     "1. Enabler 1: Principles, Policies, and Frameworks (jumlah indikator: 10)",
@@ -81,37 +84,155 @@ def parse_questions_to_json(raw_response, enabler_name="Unknown"):
     return questions
 
 
-async def create_question_from_text():
-    """Generate questions using LLMService"""
-    results = []
-    
-    for idx, enabler in enumerate(enabler_list, 1):
-        enabler_name = enabler.split(':')[1].split('(')[0].strip()
-        logger.info(f"Processing Enabler {idx}/7: {enabler_name}")
-        
-        messages = [
-            {
-                "role": "user",
-                "content": f"enabler yang difokuskan saat ini: {enabler}\n\n{generate_question_v2_prompt}\n\nenabler yang difokuskan saat ini: {enabler}"
-            }
-        ]
+def enabler_messages(enabler, prompt):
+    """LLM messages generating the questions of one enabler"""
+    return [
+        {
+            "role": "user",
+            "content": f"enabler yang difokuskan saat ini: {enabler}\n\n{prompt}\n\nenabler yang difokuskan saat ini: {enabler}"
+        }
+    ]
+
+
+def indicator_count(enabler):
+    """Number of indicators (= expected questions) of an enabler line"""
+    match = re.search(r'jumlah indikator:\s*(\d+)', enabler)
+    return int(match.group(1)) if match else 0
+
+
+def checkpoint_path(checkpoint_dir, idx):
+    return os.path.join(checkpoint_dir, f"enabler_{idx}.json")
+
+
+def load_checkpoint(checkpoint_dir, idx, enabler):
+    """Raw result saved by an earlier run, or None"""
+    path = checkpoint_path(checkpoint_dir, idx)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    # The enabler list changed since the checkpoint was written
+    if result.get("enabler") != enabler:
+        return None
+    return result
+
+
+def save_checkpoint(checkpoint_dir, idx, result):
+    """Write atomically so an interrupted run never leaves a half-written file"""
+    path = checkpoint_path(checkpoint_dir, idx)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+async def generate_enabler(enabler, prompt, max_attempts=3):
+    """
+    Generate the questions of one enabler
+
+    The LLM is asked again (for this enabler only) while the answer parses
+    to fewer questions than the enabler has indicators; the best attempt is
+    kept if none is complete.
 
+    Returns:
+        Dict with enabler, response, questions_parsed and attempts
+
+    Raises:
+        RuntimeError: No attempt produced a single question (e.g. every
+            backend was unavailable), so nothing is checkpointed
+    """
+    enabler_name = enabler.split(':')[1].split('(')[0].strip()
+    expected = indicator_count(enabler)
+    best = None
+
+    for attempt in range(1, max_attempts + 1):
         response = await llm_service.call_llm(
-            messages=messages,
-            max_tokens=4000,
-            temperature=0.7
+            messages=enabler_messages(enabler, prompt),
+            max_tokens=GENERATION_PARAMS["max_tokens"],
+            temperature=GENERATION_PARAMS["temperature"],
+            priority=PRIORITY_BATCH
         )
+        parsed = 0 if is_unavailable(response) else len(parse_questions_to_json(response, enabler_name))
+
+        if best is None or parsed > best["questions_parsed"]:
+            best = {"enabler": enabler, "response": response, "questions_parsed": parsed}
+        best["attempts"] = attempt
+
+        if parsed >= expected:
+            break
+        logger.warning(
+            f"{enabler_name}: parsed {parsed}/{expected} questions "
+            f"(attempt {attempt}/{max_attempts})"
+        )
+
+    if best["questions_parsed"] == 0:
+        raise RuntimeError(f"{enabler_name}: no questions parsed after {max_attempts} attempt(s)")
+    return best
+
+
+async def create_question_from_text(prompt=None, concurrency=7, max_attempts=3, checkpoint_dir=None):
+    """
+    Generate questions for all enablers concurrently
+
+    Args:
+        prompt: Generation prompt (default: built from database/journal_base_v2.txt)
+        concurrency: Enablers generated at the same time
+        max_attempts: LLM attempts per enabler when parsing comes up short
+        checkpoint_dir: Directory for per-enabler results; enablers with a
+            checkpoint are not generated again (None disables checkpoints)
+
+    Returns:
+        List of {"enabler", "response"} dicts in enabler order
+    """
+    if prompt is None:
+        prompt = build_generate_question_v2_prompt(load_journal_text())
+    results = [None] * len(enabler_list)
+    pending = []
+
+    for idx, enabler in enumerate(enabler_list, 1):
+        checkpoint = load_checkpoint(checkpoint_dir, idx, enabler) if checkpoint_dir else None
+        if checkpoint is not None:
+            results[idx - 1] = checkpoint
+        else:
+            pending.append((idx, enabler))
+
+    total = len(enabler_list)
+    done = total - len(pending)
+    if done:
+        logger.info(f"Resuming: {done}/{total} enablers loaded from checkpoints")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    start_time = time.time()
+
+    async def run(idx, enabler):
+        nonlocal done
+        async with semaphore:
+            result = await generate_enabler(enabler, prompt, max_attempts)
+
+        results[idx - 1] = {"enabler": enabler, "response": result["response"]}
+        if checkpoint_dir:
+            save_checkpoint(checkpoint_dir, idx, results[idx - 1])
+
+        done += 1
+        logger.info(
+            f"Progress: {done}/{total} enablers - Enabler {idx} done with "
+            f"{result['questions_parsed']}/{indicator_count(enabler)} questions "
+            f"after {result['attempts']} attempt(s) ({time.time() - start_time:.1f}s)"
+        )
+
+    # A failed enabler does not cancel the others; its checkpoint is simply
+    # missing, so the next run retries just that one
+    outcomes = await asyncio.gather(*(run(idx, enabler) for idx, enabler in pending), return_exceptions=True)
+    failed = [(idx, error) for (idx, _), error in zip(pending, outcomes) if isinstance(error, Exception)]
+    for idx, error in failed:
+        logger.error(f"Enabler {idx} failed: {error}")
+    if failed:
+        raise RuntimeError(f"{len(failed)}/{total} enablers failed; rerun to resume from checkpoints")
 
-        result = {
-            "enabler": enabler,
-            "response": response
-        }
-    
-        results.append(result)
-        logger.info(f"Completed Enabler {idx}/7")
-        
-        await asyncio.sleep(1)
-    
     return results
 
 
@@ -199,13 +320,26 @@ def debug_failed_parsing(raw_data):
                 logger.warning(response[-200:])
 
 
-async def main():
+async def main(args):
     """Main async function"""
     try:
         start_time = time.time()
         logger.info("Starting question generation...")
         
-        raw_questions = await create_question_from_text()
+        checkpoint_dir = None if args.no_checkpoint else args.checkpoint_dir
+        if checkpoint_dir:
+            if args.fresh and os.path.isdir(checkpoint_dir):
+                for name in os.listdir(checkpoint_dir):
+                    if name.startswith("enabler_") and name.endswith(".json"):
+                        os.remove(os.path.join(checkpoint_dir, name))
+            os.makedirs(checkpoint_dir, exist_ok=True)
+        
+        raw_questions = await create_question_from_text(
+            prompt=build_generate_question_v2_prompt(load_journal_text(args.journal)),
+            concurrency=args.concurrency,
+            max_attempts=args.max_attempts,
+            checkpoint_dir=checkpoint_dir
+        )
         
         # Debug first
         debug_failed_parsing(raw_questions)
@@ -213,12 +347,13 @@ async def main():
         structured_json = structure_all_enablers(raw_questions)
         
         # Save files
-        raw_output = "/Users/tiarasabrina/Documents/PROJECT/AI/df_readiness/database/generated_questions_raw.json"
+        os.makedirs(args.output_dir, exist_ok=True)
+        raw_output = os.path.join(args.output_dir, "generated_questions_raw.json")
         with open(raw_output, 'w', encoding='utf-8') as f:
             json.dump(raw_questions, f, indent=2, ensure_ascii=False)
         logger.info(f"Raw responses saved to {raw_output}")
         
-        structured_output = "/Users/tiarasabrina/Documents/PROJECT/AI/df_readiness/database/generated_questions_structured.json"
+        structured_output = os.path.join(args.output_dir, "generated_questions_structured.json")
         with open(structured_output, 'w', encoding='utf-8') as f:
             json.dump(structured_json, f, indent=2, ensure_ascii=False)
         logger.info(f"Structured JSON saved to {structured_output}")
@@ -247,5 +382,17 @@ async def main():
         logger.error(f"Fatal error: {e}", exc_info=True)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate the enabler question bank with the LLM")
+    parser.add_argument("--journal", default=JOURNAL_TXT, help="OCR'd journal text used as context")
+    parser.add_argument("--concurrency", type=int, default=len(enabler_list), help="Enablers generated at the same time")
+    parser.add_argument("--max-attempts", type=int, default=3, help="LLM attempts per enabler when parsing comes up short")
+    parser.add_argument("--output-dir", default=os.path.join(project_root, "database"), help="Directory for the generated JSON files")
+    parser.add_argument("--checkpoint-dir", default=os.path.join(project_root, "database", "question_checkpoints"), help="Per-enabler checkpoints for resuming")
+    parser.add_argument("--fresh", action="store_true", help="Discard existing checkpoints and regenerate every enabler")
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not read or write checkpoints")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(parse_args()))
\ No newline at end of file
@@ -1,39 +1,175 @@
-import pytesseract
-from pdf2image import convert_from_path
-import pandas as pd
-import re
+"""
+OCR of the journal PDF
+
+Pages are processed independently: each page is rendered on its own (never
+the whole document in memory), pages that already carry a usable text layer
+skip OCR, and the rest are OCR'd across a process pool. Results are cached
+per page under the PDF's sha256, so re-running after a crash or on an
+unchanged PDF only redoes missing pages.
+
+Text-layer detection needs pypdf; without it every page is OCR'd.
+
+Usage:
+    python api/v2/create_question/ocr.py [PDF ...] [--workers N] [--dpi 300] [--no-cache]
+"""
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
 from tqdm import tqdm
 
-def ocr_pdf(pdf_path, dpi=300, lang='eng'):
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency
+    PdfReader = None
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+
+PAGE_CACHE_DIR = os.path.join(project_root, "database", "question_bank", "cache", "ocr_pages")
+# A page with at least this much extractable text is not OCR'd
+MIN_TEXT_LAYER_CHARS = 200
+
+
+def pdf_sha256(pdf_path):
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def page_cache_path(cache_dir, pdf_hash, page_num, dpi, lang):
+    # dpi and language change the OCR output, so they are part of the key
+    return os.path.join(cache_dir, pdf_hash, f"page{page_num:04d}-{dpi}-{lang}.txt")
+
+
+def read_cached_page(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def write_cached_page(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def text_layer_pages(pdf_path):
+    """Page number -> embedded text for pages with a usable text layer"""
+    if PdfReader is None:
+        return {}
+    pages = {}
+    try:
+        for page_num, page in enumerate(PdfReader(pdf_path).pages, 1):
+            text = page.extract_text() or ""
+            if len(text.strip()) >= MIN_TEXT_LAYER_CHARS:
+                pages[page_num] = text
+    except Exception as e:
+        print(f"Text layer tidak bisa dibaca, semua halaman di-OCR: {e}")
+        return {}
+    return pages
+
+
+def _init_worker():
+    # One tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def ocr_page(pdf_path, page_num, dpi, lang):
+    """Render and OCR a single page (runs in a worker process)"""
+    image = convert_from_path(pdf_path, dpi=dpi, first_page=page_num, last_page=page_num)[0]
+    try:
+        return page_num, pytesseract.image_to_string(image, lang=lang)
+    finally:
+        image.close()
+
+
+def ocr_pdf(pdf_path, dpi=300, lang='eng', txt_path=None, workers=None, cache_dir=PAGE_CACHE_DIR, use_text_layer=True):
     """
     Perform OCR on a PDF and save the extracted text to a .txt file
+
+    Args:
+        txt_path: Output file (default: the PDF path with a .txt suffix)
+        workers: OCR processes (default: CPU count)
+        cache_dir: Per-page cache directory (None disables the cache)
+        use_text_layer: Use embedded text instead of OCR where present
+
+    Returns:
+        The extracted text
     """
     print(f"\nMemproses: {Path(pdf_path).name}")
-    
-    # Konversi PDF ke gambar
-    pages = convert_from_path(pdf_path, dpi=dpi)
-
-    # ocr setiap halaman
-    extracted_text = ""
-    for page_num, page in enumerate(tqdm(pages, desc="Melakukan OCR pada halaman")):
-        text = pytesseract.image_to_string(page, lang=lang)
-        extracted_text += f"\n\n--- Halaman {page_num + 1} ---\n\n{text}"
-    
+
+    total_pages = pdfinfo_from_path(pdf_path)["Pages"]
+    pdf_hash = pdf_sha256(pdf_path) if cache_dir else None
+    texts = {}
+
+    # Halaman dari cache
+    if cache_dir:
+        for page_num in range(1, total_pages + 1):
+            cached = read_cached_page(page_cache_path(cache_dir, pdf_hash, page_num, dpi, lang))
+            if cached is not None:
+                texts[page_num] = cached
+    from_cache = len(texts)
+
+    # Halaman yang sudah punya text layer tidak perlu OCR
+    from_text_layer = 0
+    if use_text_layer:
+        for page_num, text in text_layer_pages(pdf_path).items():
+            if page_num not in texts:
+                texts[page_num] = text
+                from_text_layer += 1
+
+    # OCR sisa halaman secara paralel, satu halaman per task
+    pending = [page_num for page_num in range(1, total_pages + 1) if page_num not in texts]
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker) as pool:
+            futures = [pool.submit(ocr_page, pdf_path, page_num, dpi, lang) for page_num in pending]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Melakukan OCR pada halaman"):
+                page_num, text = future.result()
+                texts[page_num] = text
+                if cache_dir:
+                    write_cached_page(page_cache_path(cache_dir, pdf_hash, page_num, dpi, lang), text)
+
+    print(
+        f"Halaman: {total_pages} (cache: {from_cache}, text layer: {from_text_layer}, "
+        f"OCR: {len(pending)})"
+    )
+
+    extracted_text = "".join(
+        f"\n\n--- Halaman {page_num} ---\n\n{texts[page_num]}"
+        for page_num in range(1, total_pages + 1)
+    )
+
     # Simpan hasil OCR ke file .txt
-    txt_path = Path(pdf_path).with_suffix('.txt')
+    txt_path = txt_path or Path(pdf_path).with_suffix('.txt')
     with open(txt_path, 'w', encoding='utf-8') as f:
         f.write(extracted_text)
+    return extracted_text
+
 
 # Contoh penggunaan
 if __name__ == "__main__":
-    # List semua PDF
-    pdf_files = [
-        "/Users/tiarasabrina/Documents/PROJECT/AI/df_readiness/database/journal_base_v2.pdf"
-    ]
-    
-    # Output file
-    output_file = "/Users/tiarasabrina/Documents/PROJECT/AI/df_readiness/database/journal_base_v2.txt"
-    
-    for pdf_file in pdf_files:
-        ocr_pdf(pdf_file)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="OCR PDF ke .txt (di samping file PDF)")
+    parser.add_argument("pdf_files", nargs="*", default=[os.path.join(project_root, "database", "journal_base_v2.pdf")])
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses OCR (default: jumlah CPU)")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--no-cache", action="store_true", help="Abaikan cache per halaman")
+    args = parser.parse_args()
+
+    for pdf_file in args.pdf_files:
+        ocr_pdf(
+            pdf_file,
+            dpi=args.dpi,
+            lang=args.lang,
+            workers=args.workers,
+            cache_dir=None if args.no_cache else PAGE_CACHE_DIR
+        )
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+jobs_v2 = Blueprint('jobs_v2', __name__)
+
+from . import routes  # noqa: E402,F401
@@ -0,0 +1,86 @@
+from flask import Response, request
+import logging
+
+from shared.json_provider import json_response
+from shared.job_queue import job_queue
+from ..base.base_schemas import BaseResponse
+from .utils import request_session_id, to_job_response, job_accepted_response
+from . import jobs_v2
+
+logger = logging.getLogger(__name__)
+
+# Longest a status request may block with ?wait=<seconds>
+MAX_LONG_POLL_SECONDS = 30
+# Comment line sent on idle event streams so proxies keep them open
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def _find_job(job_id: str):
+    # Jobs are only visible to the session that owns them
+    job = job_queue.get(job_id)
+    if job is None or (job.session_id and job.session_id != request_session_id()):
+        return None
+    return job
+
+
+def _job_not_found():
+    return json_response(
+        BaseResponse.error(
+            message="Job not found",
+            errors="Unknown, expired or foreign job id"
+        )
+    ), 404
+
+
+@jobs_v2.route('/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    """Job status and result; ?wait=<seconds> long-polls until it finishes"""
+    job = _find_job(job_id)
+    if job is None:
+        return _job_not_found()
+
+    try:
+        wait = min(float(request.args.get('wait', 0)), MAX_LONG_POLL_SECONDS)
+    except ValueError:
+        wait = 0
+    if wait > 0:
+        job.wait(wait)
+
+    if not job.done:
+        return job_accepted_response(job)
+
+    return json_response(
+        BaseResponse.success(
+            data=to_job_response(job),
+            message=f"Job {job.status}"
+        )
+    ), 200
+
+
+@jobs_v2.route('/<job_id>/events', methods=['GET'])
+def job_events(job_id: str):
+    """Server-sent events: the current status, then the final status with the result"""
+    job = _find_job(job_id)
+    if job is None:
+        return _job_not_found()
+
+    # Built here: url_for needs the request context the generator runs without
+    initial = to_job_response(job)
+
+    def stream():
+        yield f"event: status\ndata: {initial.model_dump_json()}\n\n"
+        while not job.wait(SSE_HEARTBEAT_SECONDS):
+            yield ": keep-alive\n\n"
+        final = initial.model_copy(update={
+            "status": job.status,
+            "finished_at": job.finished_at,
+            "result": job.result,
+            "error": job.error
+        })
+        yield f"event: {job.status}\ndata: {final.model_dump_json()}\n\n"
+
+    return Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
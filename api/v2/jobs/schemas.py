@@ -0,0 +1,16 @@
+# api/v2/jobs/schemas.py
+from typing import Any, Optional
+from pydantic import BaseModel
+
+# RESPONSE SCHEMAS
+class JobResponse(BaseModel):
+    """Status of a background generation job"""
+    job_id: str
+    kind: str
+    status: str
+    status_url: str
+    events_url: str
+    created_at: float
+    finished_at: Optional[float] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,88 @@
+# api/v2/jobs/utils.py
+from typing import Tuple
+
+from flask import Response, request, session, url_for
+
+from shared.admission import AdmissionRejected
+from shared.json_provider import json_response
+from shared.job_queue import Job
+from ..base.base_schemas import BaseResponse
+from .schemas import JobResponse
+
+# Poll interval suggested to clients of unfinished jobs (seconds)
+POLL_RETRY_AFTER = 2
+
+
+def wants_async() -> bool:
+    """Client asked for a job id instead of waiting (?async=true or Prefer: respond-async)"""
+    return (
+        request.args.get('async', '').lower() in ('1', 'true', 'yes') or
+        'respond-async' in request.headers.get('Prefer', '')
+    )
+
+
+def request_session_id() -> str:
+    """Session id sent with the request, without creating a new session"""
+    return (
+        request.args.get('session_id') or
+        request.headers.get('X-Session-ID') or
+        session.get('session_id') or
+        ''
+    )
+
+
+def to_job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        status_url=url_for('jobs_v2.get_job', job_id=job.id),
+        events_url=url_for('jobs_v2.job_events', job_id=job.id),
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=job.error
+    )
+
+
+def job_accepted_response(job: Job) -> Tuple[Response, int]:
+    """202 pointing the client at the job status endpoint"""
+    job_data = to_job_response(job)
+    response = json_response(
+        BaseResponse.success(
+            data=job_data,
+            message="Job accepted, poll status_url for the result"
+        )
+    )
+    response.headers["Location"] = job_data.status_url
+    response.headers["Retry-After"] = str(POLL_RETRY_AFTER)
+    return response, 202
+
+
+def job_error_response(job: Job, message: str) -> Tuple[Response, int]:
+    """Error response for a failed job, with the status its exception maps to"""
+    error = job.exception
+    if isinstance(error, AdmissionRejected):
+        response = json_response(
+            BaseResponse.error(
+                message="AI system is busy, please retry later",
+                errors=job.error
+            )
+        )
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response, 429
+
+    if isinstance(error, ValueError):
+        return json_response(
+            BaseResponse.error(
+                message="Validation failed",
+                errors=job.error
+            )
+        ), 400
+
+    return json_response(
+        BaseResponse.error(
+            message=message,
+            errors=job.error
+        )
+    ), 500
@@ -1,12 +1,19 @@
 from typing import Dict, List, Any
 import os
+from functools import lru_cache
+
+from shared.token_budget import EndpointBudget, PromptSection, fit_sections
 
 # Get the directory of this file and construct the path to journal_base_v2.txt
 current_dir = os.path.dirname(os.path.abspath(__file__))
 txt_file = os.path.join(current_dir, "journal_base_v2.txt")
 
-with open(txt_file, 'r', encoding='utf-8') as file:
-    JOURNAL_TEXT = file.read()
+
+@lru_cache(maxsize=1)
+def journal_text() -> str:
+    """Journal text, read on first use instead of at import"""
+    with open(txt_file, 'r', encoding='utf-8') as file:
+        return file.read()
 
 
 # ============== PROMPT TEMPLATES ==============
@@ -66,10 +73,40 @@ Setiap rekomendasi harus:
 Format sebagai numbered list. Jangan tambahkan penjelasan di luar list.
 """
 
+# ============== TOKEN BUDGETS ==============
+
+# Output: 2-3 sentences of prose (room for one extra)
+SUMMARY_ANALYSIS_BUDGET = EndpointBudget(
+    name="summary_analysis",
+    max_prompt_tokens=16000,
+    output_schema=4 * 80
+)
+
+# Output: numbered list of 3 one-sentence steps (room for a preamble line)
+NEXT_STEPS_BUDGET = EndpointBudget(
+    name="next_steps",
+    max_prompt_tokens=12000,
+    output_schema=5 * 40
+)
+
+# The journal is background context and the first thing to trim
+JOURNAL_MIN_TOKENS = 2000
+
 # ============== HELPER FUNCTIONS ==============
 
 def build_summary_analysis_messages(questions_answers: str, profile_description: str, maturity_level: str) -> List[Dict[str, str]]:
     """Build LLM messages for summary analysis generation"""
+    fields = fit_sections(
+        SUMMARY_ANALYSIS_BUDGET,
+        SUMMARY_ANALYSIS_SYSTEM_PROMPT,
+        SUMMARY_ANALYSIS_USER_PROMPT,
+        [
+            PromptSection("journal_text", journal_text(), value=0, min_tokens=JOURNAL_MIN_TOKENS),
+            PromptSection("profile_description", profile_description, value=1, min_tokens=300),
+            PromptSection("questions_answers", str(questions_answers), value=2)
+        ],
+        maturity_level=maturity_level
+    )
     return [
         {
             "role": "system",
@@ -77,12 +114,7 @@ def build_summary_analysis_messages(questions_answers: str, profile_description:
         },
         {
             "role": "user",
-            "content": SUMMARY_ANALYSIS_USER_PROMPT.format(
-                journal_text=JOURNAL_TEXT,
-                questions_answers=questions_answers,
-                profile_description=profile_description,
-                maturity_level=maturity_level
-            )
+            "content": SUMMARY_ANALYSIS_USER_PROMPT.format(**fields)
         }
     ]
 
@@ -93,6 +125,18 @@ def build_next_steps_messages(
     profile_description: str
 ) -> List[Dict[str, str]]:
     """Build LLM messages for next steps recommendations"""
+    fields = fit_sections(
+        NEXT_STEPS_BUDGET,
+        NEXT_STEPS_SYSTEM_PROMPT,
+        NEXT_STEPS_USER_PROMPT,
+        [
+            PromptSection("journal_text", journal_text(), value=0, min_tokens=JOURNAL_MIN_TOKENS),
+            PromptSection("profile_description", profile_description, value=1, min_tokens=300)
+        ],
+        summary_analysis=summary_analysis,
+        lowest_enabler_name=lowest_enabler.get('name', 'N/A'),
+        lowest_enabler_score=lowest_enabler.get('score', 0)
+    )
     return [
         {
             "role": "system",
@@ -100,12 +144,6 @@ def build_next_steps_messages(
         },
         {
             "role": "user",
-            "content": NEXT_STEPS_USER_PROMPT.format(
-                journal_text=JOURNAL_TEXT,
-                summary_analysis=summary_analysis,
-                lowest_enabler_name=lowest_enabler.get('name', 'N/A'),
-                lowest_enabler_score=lowest_enabler.get('score', 0),
-                profile_description=profile_description
-            )
+            "content": NEXT_STEPS_USER_PROMPT.format(**fields)
         }
     ]
\ No newline at end of file
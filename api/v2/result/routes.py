@@ -1,13 +1,16 @@
 from flask import request, jsonify
 from shared.session_manager import get_or_create_session, async_route
-from shared.async_utils import run_async
+from shared.json_provider import json_response
+from shared.job_queue import JOB_FAILED
+from config import settings
 from datetime import datetime
 import logging
 
 from .usecases import send_email
 from ..base.base_schemas import BaseResponse
+from ..jobs.utils import wants_async, job_accepted_response, job_error_response
 from .schemas import EmailRequest, EmailResponse, SummaryAnalysisResponse
-from .usecases import get_summary_analysis
+from .usecases import submit_results_job
 from email_template import generate_email_template
 
 from . import result_v2
@@ -41,16 +44,21 @@ def submit_email():
             data=data,
             message="Email submitted successfully"
         )
-        return jsonify(response.model_dump()), 200
+        return json_response(response), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 @result_v2.route('/get_results', methods=['GET'])
 def get_results():
-    """Get final evaluation and recommendations using LLM"""
-    import json 
-    
+    """
+    Get final evaluation and recommendations using LLM
+
+    Generation runs as a background job (usually already started when the
+    answers were submitted). With ?async=true or ``Prefer: respond-async``
+    the job is returned right away (202); otherwise the request waits for
+    it and answers 202 only if it takes longer than JOB_SYNC_WAIT_SECONDS.
+    """
     try:
         manager = get_or_create_session()
         
@@ -61,33 +69,26 @@ def get_results():
         # if current_phase == "evaluation":
         #     print("Performing LLM evaluation...")
         
-        analysis = {}
-        analysis = run_async(get_summary_analysis(manager))
+        job = submit_results_job(manager)
+        if wants_async() or not job.wait(settings.JOB_SYNC_WAIT_SECONDS):
+            return job_accepted_response(job)
 
-        data = {
-            "score_per_enablers": manager.context.get("score_enablers", {}),
-            "maturity_level": manager.context.get("maturity_level", ""),
-            "summary_analysis": analysis["summary_analysis"],
-            "next_steps": analysis["next_steps"],
-            "highest_enabler": analysis["highest_enabler"],
-            "lowest_enabler": analysis["lowest_enabler"]
-        }
+        if job.status == JOB_FAILED:
+            logger.warning(f"Results job {job.id} failed: {job.error}")
+            return job_error_response(job, "Failed to generate results")
 
-        return jsonify(
+        return json_response(
             BaseResponse.success(
-                data=data,
+                data=job.result,
                 message="Answers submitted successfully"
-            ).model_dump()
+            )
         ), 200
 
     except Exception as e:
-        logger.error(f"Error in submit_test_answers: {e}", exc_info=True)
-        return jsonify(
+        logger.error(f"Error in get_results: {e}", exc_info=True)
+        return json_response(
             BaseResponse.error(
                 message="Failed to submit answers",
                 errors=str(e)
-            ).model_dump()
+            )
         ), 500
-
-
-    
\ No newline at end of file
@@ -1,66 +1,134 @@
-import resend
 from config import settings
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import random
 import json
 import logging
 
 from shared.session_manager import SessionManager
-from services.llm_service import llm_service
+from shared.job_queue import job_queue, Job
+from shared.singleflight import canonical_key
+from shared.metrics import registry, register_cache
+from shared.logging_config import truncated
+from services.llm_service import llm_service, is_unavailable
+from services.email_outbox import email_outbox
 from .utils import merge_question_and_answer, format_next_steps_to_list, find_highest_lowest_enablers
-from .prompts import build_summary_analysis_messages, build_next_steps_messages
+from .prompts import (
+    build_summary_analysis_messages,
+    build_next_steps_messages,
+    SUMMARY_ANALYSIS_BUDGET,
+    NEXT_STEPS_BUDGET
+)
 
-resend.api_key = settings.MAIL_RESEND_API_KEY
 logger = logging.getLogger("debug_logger")
-# level logging.DEBUG untuk debug detail
-logger.setLevel(logging.DEBUG)
-
-def send_email(to: str, subject: str, body: str):
-    """Send email notification using Resend"""
-    try:
-        params = {
-            "from": "noreply@stelarea.com",
-            "to": [to],
-            "subject": subject,
-            "html": body,
-        }
-        
-        email = resend.Emails.send(params)
-        
-        print(f"Email sent successfully to {to}")
-        print(f"Email ID: {email.get('id')}")
-        return email
-        
-    except Exception as e:
-        print(f"Failed to send email to {to}: {str(e)}")
-        raise e
+
+SUMMARY_ANALYSIS_CACHE = registry.counter(
+    "summary_analysis_cache_total",
+    "Summary analysis lookups served from the session cache (hit) or the LLM (miss)",
+    ("result",)
+)
+register_cache(
+    "summary_analysis",
+    lambda: (SUMMARY_ANALYSIS_CACHE.value(result="hit"), SUMMARY_ANALYSIS_CACHE.value(result="miss"))
+)
+
+def send_email(to: str, subject: str, body: str, idempotency_key: Optional[str] = None) -> str:
+    """
+    Queue an email notification for background delivery
+
+    Returns right away; the outbox sender delivers (and retries) it.
+    Passing the same ``idempotency_key`` again does not send a second email.
+
+    Returns:
+        The message's idempotency key
+    """
+    return email_outbox.enqueue(to, subject, body, idempotency_key)
     
 async def get_summary_analysis(manager: SessionManager) -> Dict[str, Any]:
-    """Generate comprehensive analysis using LLM"""
+    """
+    Generate comprehensive analysis using LLM
+
+    The analysis is memoized on the session together with a key of its
+    inputs, so it is generated once per submission (normally by the job
+    started in ``process_assessment_submission``) and later calls are a
+    cache read.
+    """
     
     question_answers = merge_question_and_answer(manager)
     manager.context['question_answers'] = question_answers
     profile_description = manager.context.get('profile_description', '')
     score_enablers = manager.context.get('score_enablers', {})
+
+    inputs_key = canonical_key(
+        question_answers,
+        profile_description,
+        manager.context.get('maturity_level', ''),
+        score_enablers
+    )
+    cached = manager.context.get('summary_analysis_cache')
+    if cached and cached["key"] == inputs_key:
+        logger.info(f"Summary analysis cache hit for session {manager.session_id}")
+        SUMMARY_ANALYSIS_CACHE.inc(result="hit")
+        return cached["analysis"]
+    SUMMARY_ANALYSIS_CACHE.inc(result="miss")
     
     # Format questions and answers
     summary_prompt = build_summary_analysis_messages(question_answers, profile_description, manager.context.get('maturity_level', ''))
-    summary = await llm_service.call_llm(summary_prompt)
+    summary = await llm_service.call_llm(summary_prompt, max_tokens=SUMMARY_ANALYSIS_BUDGET.max_tokens)
+    # Fail the job instead of caching the failure text as this session's analysis
+    if is_unavailable(summary):
+        raise RuntimeError("LLM unavailable while generating the summary analysis")
 
     # Find highest and lowest enablers
-    logger.info(f"Score Enablers: {score_enablers}")  # Ganti ke .info()
-    print(f"[DEBUG] Score Enablers: {score_enablers}", flush=True)  # Tambah print biasa
+    logger.debug("Score Enablers: %s", truncated(score_enablers))
 
     highest_enabler, lowest_enabler = find_highest_lowest_enablers(score_enablers)
 
     next_step_prompt = build_next_steps_messages(summary, lowest_enabler, manager.context.get('profile_description', ''))
-    next_steps = await llm_service.call_llm(next_step_prompt)
+    next_steps = await llm_service.call_llm(next_step_prompt, max_tokens=NEXT_STEPS_BUDGET.max_tokens)
+    if is_unavailable(next_steps):
+        raise RuntimeError("LLM unavailable while generating the next steps")
     next_steps_formatted = format_next_steps_to_list(next_steps)
     
-    # Return all analysis
-    return {
+    analysis = {
         "summary_analysis": summary.strip(),
         "next_steps": next_steps_formatted,
         "highest_enabler": highest_enabler,
         "lowest_enabler": lowest_enabler
-    }
\ No newline at end of file
+    }
+    manager.context['summary_analysis_cache'] = {"key": inputs_key, "analysis": analysis}
+    
+    # Return all analysis
+    return analysis
+
+
+async def build_results(manager: SessionManager) -> Dict[str, Any]:
+    """Full ``get_results`` payload: scores plus the LLM analysis"""
+    analysis = await get_summary_analysis(manager)
+    return {
+        "score_per_enablers": manager.context.get("score_enablers", {}),
+        "maturity_level": manager.context.get("maturity_level", ""),
+        "summary_analysis": analysis["summary_analysis"],
+        "next_steps": analysis["next_steps"],
+        "highest_enabler": analysis["highest_enabler"],
+        "lowest_enabler": analysis["lowest_enabler"]
+    }
+
+
+def submit_results_job(manager: SessionManager, replace: bool = False) -> Job:
+    """
+    Generate the session's results in the background
+
+    Args:
+        manager: Session with submitted assessment answers
+        replace: Start over even if results exist (answers were resubmitted)
+
+    Returns:
+        The background job; an existing job for the session is reused
+    """
+    return job_queue.submit(
+        "results",
+        f"results:{manager.session_id}",
+        lambda: build_results(manager),
+        session_id=manager.session_id,
+        replace=replace
+    )
@@ -1,6 +1,5 @@
 from typing import Dict, Any, List, Tuple
 from shared.session_manager import SessionManager
-import resend
 from config import settings
 import json
 import re
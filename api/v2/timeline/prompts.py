@@ -2,14 +2,23 @@
 
 from typing import Dict, List, Any
 import os
+from functools import lru_cache
 from datetime import date
 
+from shared.token_budget import EndpointBudget, PromptSection, fit_sections
+from shared.structured_output import StructuredOutput
+from .schemas import TimelineOutput
+
 # Get the directory of this file and construct the path to journal_base_v2.txt
 current_dir = os.path.dirname(os.path.abspath(__file__))
 txt_file = os.path.join(current_dir, "journal_base_v2.txt")
 
-with open(txt_file, 'r', encoding='utf-8') as file:
-    JOURNAL_TEXT = file.read()
+
+@lru_cache(maxsize=1)
+def journal_text() -> str:
+    """Journal text, read on first use instead of at import"""
+    with open(txt_file, 'r', encoding='utf-8') as file:
+        return file.read()
 
 
 # ============== MATURITY LEVEL DESCRIPTIONS ==============
@@ -107,6 +116,26 @@ Berikan output dalam format JSON dengan struktur:
 """
 
 
+# ============== TOKEN BUDGET & OUTPUT SCHEMA ==============
+
+# Output shape mirrors the JSON structure requested in TIMELINE_USER_PROMPT
+TIMELINE_BUDGET = EndpointBudget(
+    name="timeline",
+    max_prompt_tokens=16000,
+    output_schema={
+        "total_duration": 10,
+        "timeline": [
+            {"tanggal_mulai": 8, "tanggal_selesai": 8, "task": 45, "focus_enabler": 15},
+            15
+        ],
+        "risks": [{"risk": 35, "mitigation": 45}, 6]
+    }
+)
+
+# Guided decoding schema for backends that support it
+TIMELINE_OUTPUT = StructuredOutput.from_model("timeline", TimelineOutput)
+
+
 # ============== HELPER FUNCTIONS ==============
 
 def build_timeline_messages(
@@ -132,6 +161,29 @@ def build_timeline_messages(
     Returns:
         List of message dicts for LLM
     """
+    fields = fit_sections(
+        TIMELINE_BUDGET,
+        TIMELINE_SYSTEM_PROMPT,
+        TIMELINE_USER_PROMPT,
+        [
+            PromptSection("journal_text", journal_text(), value=0, min_tokens=2000),
+            PromptSection("profile_description", profile_description, value=1, min_tokens=300),
+            PromptSection("questions_answers", str(questions_answers), value=2)
+        ],
+        current_level=current_level,
+        today=time,
+        current_level_description=MATURITY_LEVELS[str(current_level)]["description"],
+        lowest_enabler_name=lowest_enabler.get('name', 'N/A'),
+        lowest_enabler_score=lowest_enabler.get('score', 0),
+        highest_enabler_name=highest_enabler.get('name', 'N/A'),
+        highest_enabler_score=highest_enabler.get('score', 0),
+        score_enablers=score_enablers,
+        timeline_duration=timeline_answers.get('timeline_duration', 'N/A'),
+        budget_allocation=timeline_answers.get('budget_allocation', 'N/A'),
+        dedicated_team=timeline_answers.get('dedicated_team', 'N/A'),
+        priority_enabler=timeline_answers.get('priority_enabler', 'N/A'),
+        management_commitment=timeline_answers.get('management_commitment', 'N/A')
+    )
     return [
         {
             "role": "system",
@@ -139,23 +191,6 @@ def build_timeline_messages(
         },
         {
             "role": "user",
-            "content": TIMELINE_USER_PROMPT.format(
-                journal_text=JOURNAL_TEXT,
-                profile_description=profile_description,
-                current_level=current_level,
-                today=time,
-                current_level_description=MATURITY_LEVELS[str(current_level)]["description"],
-                lowest_enabler_name=lowest_enabler.get('name', 'N/A'),
-                lowest_enabler_score=lowest_enabler.get('score', 0),
-                highest_enabler_name=highest_enabler.get('name', 'N/A'),
-                highest_enabler_score=highest_enabler.get('score', 0),
-                questions_answers=questions_answers,
-                score_enablers=score_enablers,
-                timeline_duration=timeline_answers.get('timeline_duration', 'N/A'),
-                budget_allocation=timeline_answers.get('budget_allocation', 'N/A'),
-                dedicated_team=timeline_answers.get('dedicated_team', 'N/A'),
-                priority_enabler=timeline_answers.get('priority_enabler', 'N/A'),
-                management_commitment=timeline_answers.get('management_commitment', 'N/A')
-            )
+            "content": TIMELINE_USER_PROMPT.format(**fields)
         }
     ]
\ No newline at end of file
@@ -2,9 +2,12 @@ from flask import Blueprint, request, jsonify
 import logging
 
 from shared.session_manager import get_or_create_session
-from shared.async_utils import run_async
+from shared.json_provider import json_response
+from shared.job_queue import JOB_FAILED
+from config import settings
 from ..base.base_schemas import BaseResponse
-from .usecases import generate_timeline
+from ..jobs.utils import wants_async, job_accepted_response, job_error_response
+from .usecases import submit_timeline_job
 from . import timeline_v2
 
 logger = logging.getLogger(__name__)
@@ -81,26 +84,30 @@ def get_timeline_questions():
             ]
         }
         
-        return jsonify(
+        return json_response(
             BaseResponse.success(
                 data=questions,
                 message="Timeline questions retrieved successfully"
-            ).model_dump()
+            )
         ), 200
         
     except Exception as e:
         logger.error(f"Error getting timeline questions: {e}", exc_info=True)
-        return jsonify(
+        return json_response(
             BaseResponse.error(
                 message="Failed to get timeline questions",
                 errors=str(e)
-            ).model_dump()
+            )
         ), 500
 
 
 @timeline_v2.route('/get_timeline_result', methods=['POST'])
 def create_timeline():
-    """Generate implementation timeline based on profiling answers"""
+    """
+    Generate implementation timeline based on profiling answers
+
+    Supports ?async=true / ``Prefer: respond-async`` like ``get_results``.
+    """
     try:
         manager = get_or_create_session()
         
@@ -117,38 +124,44 @@ def create_timeline():
         # Get request data
         data = request.get_json()
         if not data:
-            return jsonify(
+            return json_response(
                 BaseResponse.error(
                     message="Invalid request",
                     errors="Request body is required"
-                ).model_dump()
+                )
             ), 400
         
-        # Generate timeline
+        # Generate timeline (background job, see get_results)
         logger.info("Generating timeline...")
-        result = run_async(generate_timeline(manager, data))
+        job = submit_timeline_job(manager, data)
+        if wants_async() or not job.wait(settings.JOB_SYNC_WAIT_SECONDS):
+            return job_accepted_response(job)
+
+        if job.status == JOB_FAILED:
+            logger.warning(f"Timeline job {job.id} failed: {job.error}")
+            return job_error_response(job, "Failed to generate timeline")
         
-        return jsonify(
+        return json_response(
             BaseResponse.success(
-                data=result,
+                data=job.result,
                 message="Timeline generated successfully"
-            ).model_dump()
+            )
         ), 200
         
     except ValueError as e:
         logger.warning(f"Validation error: {e}")
-        return jsonify(
+        return json_response(
             BaseResponse.error(
                 message="Validation failed",
                 errors=str(e)
-            ).model_dump()
+            )
         ), 400
         
     except Exception as e:
         logger.error(f"Error generating timeline: {e}", exc_info=True)
-        return jsonify(
+        return json_response(
             BaseResponse.error(
                 message="Failed to generate timeline",
                 errors=str(e)
-            ).model_dump()
+            )
         ), 500
\ No newline at end of file
@@ -19,4 +19,23 @@ class SummaryAnalysisResponse(BaseModel):
     summary_analysis: str
     next_steps: str
     highest_enabler: str
-    lowest_enabler: str
\ No newline at end of file
+    lowest_enabler: str
+
+# LLM OUTPUT SCHEMAS
+class TimelineTask(BaseModel):
+    """One task in the generated timeline"""
+    tanggal_mulai: str
+    tanggal_selesai: str
+    task: str
+    focus_enabler: str
+
+class TimelineRisk(BaseModel):
+    """One risk with its mitigation"""
+    risk: str
+    mitigation: str
+
+class TimelineOutput(BaseModel):
+    """JSON structure the LLM must return for timeline generation"""
+    total_duration: str
+    timeline: List[TimelineTask]
+    risks: List[TimelineRisk]
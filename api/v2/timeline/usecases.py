@@ -4,8 +4,11 @@ import logging
 import json
 
 from shared.session_manager import SessionManager
+from shared.job_queue import job_queue, Job
+from shared.singleflight import canonical_key
 from services.llm_service import llm_service
-from .prompts import build_timeline_messages
+from shared.json_repair import complete_truncated
+from .prompts import build_timeline_messages, TIMELINE_BUDGET, TIMELINE_OUTPUT
 from .utils import (
     parse_timeline_answers,
     parse_timeline_json,
@@ -60,7 +63,25 @@ async def generate_timeline(
         
         # Generate timeline with LLM
         logger.info("Generating timeline with LLM...")
-        timeline_response = await llm_service.call_llm(timeline_messages, max_tokens=3000, temperature=0.7)
+        timeline_response = await llm_service.call_llm(
+            timeline_messages,
+            max_tokens=TIMELINE_BUDGET.max_tokens,
+            temperature=0.7,
+            hedge=True,
+            response_schema=TIMELINE_OUTPUT
+        )
+        
+        # Ask only for the missing tail if the JSON was cut off
+        timeline_response = await complete_truncated(
+            timeline_response,
+            timeline_messages,
+            lambda messages: llm_service.call_llm(
+                messages,
+                max_tokens=TIMELINE_BUDGET.max_tokens,
+                temperature=0.2,
+                check_error=False
+            )
+        )
         
         # Parse timeline JSON
         timeline = parse_timeline_json(timeline_response)
@@ -82,4 +103,19 @@ async def generate_timeline(
         raise ValueError(f"Failed to parse timeline: Invalid JSON format")
     except Exception as e:
         logger.error(f"Error generating timeline: {e}", exc_info=True)
-        raise
\ No newline at end of file
+        raise
+
+
+def submit_timeline_job(manager: SessionManager, data: Dict[str, Any]) -> Job:
+    """
+    Generate a timeline in the background
+
+    The same answers and assessment scores from the same session reuse the
+    existing job (and its stored result); anything different starts a new one.
+    """
+    return job_queue.submit(
+        "timeline",
+        f"timeline:{manager.session_id}:{canonical_key(data, manager.context.get('score_enablers', {}))}",
+        lambda: generate_timeline(manager, data),
+        session_id=manager.session_id
+    )
@@ -1,29 +1,25 @@
 from typing import Dict, Any, List
 import json
-import re
 from shared.session_manager import SessionManager
+from shared.json_repair import repair_json
 
 def clean_json_response(llm_response: str) -> str:
     """
     Clean LLM response to extract valid JSON
     
+    Strips markdown code blocks and surrounding text and repairs common
+    defects (trailing commas, single quotes, truncated output).
+    
     Args:
         llm_response: Raw LLM response that might contain markdown or extra text
         
     Returns:
         Clean JSON string
+        
+    Raises:
+        ValueError: If the response contains no JSON object or array
     """
-    # Remove markdown code blocks
-    cleaned = re.sub(r'```json\s*', '', llm_response)
-    cleaned = re.sub(r'```\s*', '', cleaned)
-    
-    # Find JSON object/array
-    # Try to find { ... } or [ ... ]
-    match = re.search(r'(\{.*\}|\[.*\])', cleaned, re.DOTALL)
-    if match:
-        cleaned = match.group(1)
-    
-    return cleaned.strip()
+    return repair_json(llm_response).text.strip()
 
 def parse_timeline_answers(data: Dict[str, Any]) -> Dict[str, str]:
     """
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: result email rendering
+
+Compares rendering with the template compiled on every call against the
+cached compiled template, and one batch call for many sessions (as the
+email outbox does). The evaluation is stored as a JSON string, like the
+LLM output kept in the session context.
+
+Usage:
+    python benchmarks/email_template.py [--number 2000] [--batch 50]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import email_template
+from email_template import (
+    EMAIL_TEMPLATE_SOURCE,
+    email_context,
+    generate_email_template,
+    generate_email_templates,
+    minify_html
+)
+
+
+def build_manager(index: int = 0) -> SimpleNamespace:
+    evaluation = {
+        "overall_level": "Intermediate",
+        "overall_score": 68,
+        "readiness_percentage": 68,
+        "strengths": [f"Kebijakan retensi log terdokumentasi ({i})" for i in range(6)],
+        "weaknesses": [f"Belum ada prosedur chain of custody ({i})" for i in range(6)],
+        "recommendations": [f"Susun SOP penanganan bukti digital ({i})" for i in range(6)],
+        "priority_actions": [f"Latih tim incident response ({i})" for i in range(4)],
+        "detailed_analysis": "Organisasi memiliki fondasi yang cukup.\n" * 20,
+        "improvement_roadmap": "Bulan 1-3: kebijakan.\nBulan 4-6: tooling.\n" * 5,
+        "risk_assessment": "Risiko kehilangan bukti digital masih sedang."
+    }
+    return SimpleNamespace(session_id=f"bench-{index}", context={
+        "final_evaluation": json.dumps(evaluation, ensure_ascii=False),
+        "user_profile": json.dumps({"email": f"user{index}@example.com"}),
+        "selected_package": "qb_v2_000",
+        "test_questions": [{}] * 40,
+        "test_answers": [{}] * 38,
+        "timestamp": "2025-12-08 10:00:00"
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="iterations per case")
+    parser.add_argument("--batch", type=int, default=50, help="sessions per batch call")
+    args = parser.parse_args()
+
+    manager = build_manager()
+    managers = [build_manager(i) for i in range(args.batch)]
+
+    def run_compile_per_call():
+        # What an uncached template costs: parse the JSON and compile every time
+        ctx = dict(manager.context, final_evaluation=json.loads(manager.context["final_evaluation"]))
+        template = email_template._environment().from_string(minify_html(EMAIL_TEMPLATE_SOURCE))
+        return template.render(email_context(ctx))
+
+    def run_cached():
+        return generate_email_template(manager)
+
+    def run_batch():
+        return generate_email_templates(managers)
+
+    assert run_compile_per_call() == run_cached()
+
+    print(f"Email: {len(run_cached())} bytes, batch of {args.batch}, {args.number} iterations")
+
+    cases = [
+        ("compile per call", run_compile_per_call, 1),
+        ("cached template", run_cached, 1),
+        (f"batch x{args.batch} (per email)", run_batch, args.batch),
+    ]
+    baseline = None
+    for name, fn, per_call in cases:
+        number = max(1, args.number // per_call)
+        elapsed = min(timeit.repeat(fn, number=number, repeat=3))
+        per_email_us = elapsed / (number * per_call) * 1e6
+        baseline = baseline or per_email_us
+        print(f"  {name:<32} {per_email_us:9.1f} us/email  ({baseline / per_email_us:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Micro-benchmarks: pure-Python hot paths, compared against a saved baseline
+
+Times scoring (``calculate_score``, ``check_maturity_level``), LLM answer
+parsing (``format_next_steps_to_list``, ``clean_json_response``,
+``parse_timeline_json``, ``parse_questions_to_json``), the prompt builders in
+api/v2/*/prompts.py and ``format_questions``, on fixtures built from the
+generated question banks in database/.
+
+Timings are divided by a fixed pure-Python calibration workload timed
+alongside each case before they are compared, so a baseline saved on a
+laptop still means something on a CI runner. Exits non-zero when a case is slower than the baseline by more than
+``--max-regression`` so it can gate deploys.
+
+Usage:
+    python benchmarks/hot_paths.py [--number 200] [--filter prompt] [--max-regression 1.3]
+    python benchmarks/hot_paths.py --save     # record a new baseline
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+# create_question.py is a script module (like build_bank.py imports it)
+sys.path.insert(1, os.path.join(project_root, "api", "v2", "create_question"))
+
+from json_serialization import QUESTION_BANK, load_question_bank
+
+from shared.session_manager import SessionManager
+from shared import token_budget
+from api.v2.assessment_before.utils import format_questions, calculate_score, check_maturity_level
+from api.v2.result.utils import format_next_steps_to_list, merge_question_and_answer, find_highest_lowest_enablers
+from api.v2.result.prompts import build_summary_analysis_messages, build_next_steps_messages
+from api.v2.timeline.utils import clean_json_response, parse_timeline_json
+from api.v2.timeline.prompts import build_timeline_messages
+from create_question import parse_questions_to_json
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hot_paths_baseline.json")
+RAW_QUESTIONS = os.path.join(project_root, "database", "generated_questions_raw.json")
+
+PROFILE_DESCRIPTION = (
+    "Organisasi bergerak di bidang teknologi informasi dengan 50-100 karyawan dan kondisi finansial stabil. "
+    "Pengguna menjabat sebagai Direktur IT selama 5 tahun dengan latar belakang S1 Teknik Informatika. "
+    "Organisasi belum memiliki tim forensik khusus namun pernah menangani insiden keamanan secara reguler, "
+    "sehingga membutuhkan kesiapan digital forensics pada tingkat dasar hingga menengah."
+)
+
+SUMMARY = (
+    "Organisasi berada pada maturity level 2 dengan kesadaran awal terhadap digital forensics readiness. "
+    "Kebijakan dan prosedur belum terdokumentasi secara konsisten, sementara enabler People, Skills, and "
+    "Competences menjadi yang terlemah dan perlu diprioritaskan."
+)
+
+TIMELINE_ANSWERS = {
+    "target_level": "Level 3 - Defined",
+    "timeline_duration": "6-12 bulan",
+    "budget_allocation": "50-200 juta",
+    "dedicated_team": "Berencana membentuk (1-2 orang)",
+    "priority_enabler": "6. People, Skills, and Competences",
+    "management_commitment": "Moderate - mendukung dengan keterbatasan"
+}
+
+
+def _calibration_work():
+    table = {}
+    for i in range(2000):
+        key = f"k{i % 97}"
+        table[key] = table.get(key, 0) + i * i
+    return sorted(table.items())
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int = 7) -> Tuple[float, float]:
+    """
+    (us per call, us per calibration run), each the fastest of ``repeat``
+
+    A run of a fixed dict/str/loop workload is timed right after every
+    repeat of the case, so both minimums come from the same stretch of time
+    and their ratio survives CPU frequency changes and noisy neighbours.
+    """
+    case_runs, calibration_runs = [], []
+    for _ in range(repeat):
+        case_runs.append(timeit.timeit(fn, number=number) / number)
+        calibration_runs.append(timeit.timeit(_calibration_work, number=5) / 5)
+    return min(case_runs) * 1e6, min(calibration_runs) * 1e6
+
+
+def next_steps_text(questions: List[dict]) -> str:
+    """Numbered list as the LLM writes it: bold titles, wrapped lines"""
+    steps = []
+    for i, q in enumerate(questions[:5], 1):
+        steps.append(f"{i}. **{q['indicator'][:40]}**: Tetapkan program untuk memenuhi indikator ini.\n"
+                     f"   {q['question']}")
+    return "Berikut rekomendasi langkah selanjutnya:\n\n" + "\n\n".join(steps)
+
+
+def timeline_text(questions: List[dict]) -> str:
+    """Timeline answer with the defects repair_json handles: fence, prose, trailing commas"""
+    timeline = [
+        {
+            "tanggal_mulai": f"2026-{(i % 12) + 1:02d}-01",
+            "tanggal_selesai": f"2026-{(i % 12) + 1:02d}-28",
+            "task": q["question"],
+            "focus_enabler": q["enabler"]
+        }
+        for i, q in enumerate(questions[:12])
+    ]
+    risks = [{"risk": q["indicator"], "mitigation": q["question"]} for q in questions[12:16]]
+    document = json.dumps({"total_duration": "12 bulan", "timeline": timeline, "risks": risks},
+                          ensure_ascii=False, indent=2)
+    return "Berikut timeline implementasi:\n```json\n" + document.replace("}\n  ]", "},\n  ]") + "\n```"
+
+
+def build_cases(questions: List[dict]) -> List[Tuple[str, Callable[[], object]]]:
+    rng = random.Random(0)
+    formatted = format_questions(questions)
+    answers = [rng.randint(0, q["contribution_max"]) for q in formatted]
+
+    manager = SessionManager()
+    manager.context["test_questions"] = formatted
+    manager.context["test_answers"] = answers
+    manager.context["answers"] = answers
+    scores = calculate_score(manager)
+    questions_answers = merge_question_and_answer(manager)
+    highest, lowest = find_highest_lowest_enablers(scores)
+
+    next_steps = next_steps_text(formatted)
+    timeline = timeline_text(formatted)
+    with open(RAW_QUESTIONS, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    # Sanity checks: the fixtures must take the paths production takes
+    assert len(format_next_steps_to_list(next_steps)) == 5
+    assert len(parse_timeline_json(timeline)["timeline"]) == 12
+    assert all(parse_questions_to_json(r["response"], r["enabler"]) for r in raw)
+
+    return [
+        ("format_questions", lambda: format_questions(questions)),
+        ("calculate_score", lambda: calculate_score(manager)),
+        ("check_maturity_level", lambda: check_maturity_level(scores)),
+        ("format_next_steps_to_list", lambda: format_next_steps_to_list(next_steps)),
+        ("clean_json_response", lambda: clean_json_response(timeline)),
+        ("parse_timeline_json", lambda: parse_timeline_json(timeline)),
+        ("parse_questions_to_json (7 enablers)",
+         lambda: [parse_questions_to_json(r["response"], r["enabler"]) for r in raw]),
+        ("build_summary_analysis_messages",
+         lambda: build_summary_analysis_messages(questions_answers, PROFILE_DESCRIPTION, "2")),
+        ("build_next_steps_messages",
+         lambda: build_next_steps_messages(SUMMARY, lowest, PROFILE_DESCRIPTION)),
+        ("build_timeline_messages",
+         lambda: build_timeline_messages("2026-01-01", PROFILE_DESCRIPTION, 2, lowest, highest,
+                                         scores, TIMELINE_ANSWERS, questions_answers)),
+    ]
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "tokenizer": "tiktoken" if token_budget.tiktoken is not None else "heuristic"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="iterations per case")
+    parser.add_argument("--bank", default=QUESTION_BANK, help="generated question bank used as fixture")
+    parser.add_argument("--filter", default="", help="only cases containing this text")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=1.3, help="allowed slowdown vs the baseline")
+    args = parser.parse_args()
+    if args.save and args.filter:
+        parser.error("--save records every case; drop --filter")
+
+    # Measure the code, not log output (create_question logs per call)
+    logging.disable(logging.CRITICAL)
+
+    questions = load_question_bank(args.bank)
+    cases = [(name, fn) for name, fn in build_cases(questions) if args.filter in name]
+
+    results: Dict[str, float] = {}
+    units: Dict[str, float] = {}
+    calibration_us = float("inf")
+    for name, fn in cases:
+        per_call_us, run_calibration_us = measure(fn, args.number)
+        results[name] = per_call_us
+        units[name] = per_call_us / run_calibration_us
+        calibration_us = min(calibration_us, run_calibration_us)
+
+    print(f"Fixture: {len(questions)} questions from {os.path.basename(args.bank)}, "
+          f"{args.number} iterations, calibration {calibration_us:.0f} us")
+
+    if args.save:
+        for name, per_call_us in results.items():
+            print(f"  {name:<38} {per_call_us:10.1f} us/call")
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                "environment": environment(),
+                "calibration_us": round(calibration_us, 1),
+                # Case time / calibration run time; us/call kept for reading
+                "units": {name: round(u, 5) for name, u in units.items()},
+                "cases": {name: round(us, 2) for name, us in results.items()}
+            }, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {os.path.relpath(args.baseline, project_root)}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment():
+            print(f"Note: baseline recorded with {baseline.get('environment')}, running {environment()}")
+
+    print(f"  {'case':<38} {'us/call':>10} {'baseline':>10}")
+    regressions = []
+    for name, per_call_us in results.items():
+        expected = baseline.get("units", {}).get(name)
+        if expected is None:
+            print(f"  {name:<38} {per_call_us:10.1f} {'-':>10}")
+            continue
+        ratio = units[name] / expected
+        # Baseline expressed in this machine's speed
+        expected_us = per_call_us / ratio
+        flag = "  REGRESSION" if ratio > args.max_regression else ""
+        print(f"  {name:<38} {per_call_us:10.1f} {expected_us:10.1f}  ({ratio:4.2f}x){flag}")
+        if flag:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} case(s) over {args.max_regression:.2f}x the baseline: {', '.join(regressions)}")
+        sys.exit(1)
+    if baseline:
+        print(f"\nOK: every case within {args.max_regression:.2f}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
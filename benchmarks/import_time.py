@@ -0,0 +1,82 @@
+"""
+Startup benchmark: import time of the Flask app
+
+Imports ``main`` in fresh interpreters under ``python -X importtime`` and
+reports the total, the slowest top-level imports, and any module that should
+only be loaded lazily but was imported at startup. Exits non-zero when the
+best run exceeds ``--max-ms`` or a lazy module was imported, so it can gate
+CI against startup regressions.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--max-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Loaded on first use (see main.preload); importing them at startup is a regression
+LAZY_MODULES = ("google.genai", "openai", "motor", "resend")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str = "main") -> list:
+    """(self_us, cumulative_us, depth, name) for every import in one fresh run"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters; the fastest counts")
+    parser.add_argument("--max-ms", type=float, default=1500.0, help="regression threshold for the fastest run")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals = [next(cum for _, cum, _, name in rows if name == args.module) / 1000 for rows in runs]
+    best = runs[totals.index(min(totals))]
+
+    print(f"import {args.module}: best {min(totals):.0f} ms, "
+          f"median {sorted(totals)[len(totals) // 2]:.0f} ms over {args.runs} runs")
+
+    print("\nSlowest imports by cumulative time (best run):")
+    for self_us, cumulative_us, depth, name in sorted(best, key=lambda r: -r[1])[1:args.top + 1]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self  {name}")
+
+    failed = False
+    eager = sorted({name for _, _, _, name in best
+                    if any(name == lazy or name.startswith(f"{lazy}.") for lazy in LAZY_MODULES)})
+    if eager:
+        failed = True
+        print(f"\nFAIL: lazily loaded modules imported at startup: {', '.join(eager)}")
+    if min(totals) > args.max_ms:
+        failed = True
+        print(f"\nFAIL: {min(totals):.0f} ms exceeds the {args.max_ms:.0f} ms threshold")
+
+    if not failed:
+        print(f"\nOK: under {args.max_ms:.0f} ms, no lazy module imported")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark: JSON serialization of the quick-test response
+
+Compares the old ``jsonify(BaseResponse(...).model_dump())`` path against the
+orjson-backed provider and the direct ``model_dump_json`` path, using the
+full v2 question bank as payload.
+
+Usage:
+    python benchmarks/json_serialization.py [--number 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from api.v2.base.base_schemas import BaseResponse
+from api.v2.assessment_before.schemas import GetAssessmentModel
+from api.v2.assessment_before.utils import format_questions
+from shared.json_provider import FastJSONProvider, json_response
+
+QUESTION_BANK = os.path.join(project_root, "database", "generated_questions_08122025_0138.json")
+
+
+def load_question_bank(path: str = QUESTION_BANK) -> list:
+    """Flatten the generated v2 bank into the documents stored in Mongo"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    questions = []
+    for enabler in data.get("enablers", []):
+        for q in enabler.get("questions", []):
+            questions.append({
+                "question": q.get("question", ""),
+                "indicator": q.get("indicator", ""),
+                "enabler": f"{enabler.get('enabler_id')}. {enabler.get('enabler_name')}",
+                "contribution_max": q.get("contribution_max", enabler.get("contribution_max", 4))
+            })
+    return questions
+
+
+def build_response() -> BaseResponse:
+    questions = format_questions(load_question_bank())
+    data = GetAssessmentModel(
+        session_id="bench-session",
+        package="qb_v2_000",
+        questions=questions,
+        questions_count=len(questions),
+        current_phase="evaluation"
+    )
+    return BaseResponse.success(data=data, message="Test questions retrieved successfully")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="iterations per case")
+    args = parser.parse_args()
+
+    response = build_response()
+
+    stdlib_app = Flask("bench_stdlib")
+    stdlib_app.json = DefaultJSONProvider(stdlib_app)
+    fast_app = Flask("bench_fast")
+    fast_app.json = FastJSONProvider(fast_app)
+
+    def run_stdlib():
+        with stdlib_app.app_context():
+            return jsonify(response.model_dump()).get_data()
+
+    def run_fast_provider():
+        with fast_app.app_context():
+            return jsonify(response.model_dump()).get_data()
+
+    def run_model_dump_json():
+        return json_response(response).get_data()
+
+    cases = [
+        ("jsonify + model_dump (stdlib)", run_stdlib),
+        ("jsonify + model_dump (orjson)", run_fast_provider),
+        ("model_dump_json -> bytes", run_model_dump_json),
+    ]
+
+    print(f"Payload: {len(response.data.questions)} questions, "
+          f"{len(run_model_dump_json())} bytes, {args.number} iterations")
+
+    baseline = None
+    for name, fn in cases:
+        # Sanity check: every path must produce the same document
+        assert json.loads(fn()) == json.loads(run_stdlib()), name
+        elapsed = min(timeit.repeat(fn, number=args.number, repeat=3))
+        per_call_us = elapsed / args.number * 1e6
+        baseline = baseline or per_call_us
+        print(f"  {name:<32} {per_call_us:9.1f} us/call  ({baseline / per_call_us:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Load test: the full v2 assessment flow
+
+Each virtual user logs in (or reuses ``--token``) and repeats the flow
+a real client goes through:
+
+    profiling   GET start_profiling + POST submit_answers      (LLM: profile)
+    quick_test  GET get_quick_test_questions
+    submit      POST submit_test_answers                       (starts the results job)
+    results     GET get_results, long-polling the job on 202   (LLM: summary, next steps)
+    timeline    POST get_timeline_result, same                 (LLM: timeline)
+
+Answers are randomized per flow, so identical requests do not simply
+coalesce in the LLM single-flight cache. A step that fails ends its flow;
+the user starts the next one. Reports throughput and p50/p95/p99 latency
+per step and for whole flows.
+
+For reproducible numbers run the app against benchmarks/mock_llm_server.py
+(see its docstring) and pass ``--mock-url`` to include its counters.
+
+Usage:
+    python benchmarks/load_v2_flow.py [--base-url http://127.0.0.1:5001] [--users 20]
+        [--duration 120 | --iterations 3] [--ramp-up 10] [--think 0]
+        [--username kingrokade --password benteng88 | --token JWT]
+        [--mock-url http://127.0.0.1:8090] [--json results.json] [--seed 1]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+STEPS = ("profiling", "quick_test", "submit", "results", "timeline")
+
+# Used for profiling questions that have no options to choose from
+FREE_TEXT_ANSWER = "Teknologi Informasi"
+
+LONG_POLL_SECONDS = 30
+
+
+class StepFailed(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Recorder:
+    """Latencies and failures per step"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def ok(self, step: str, seconds: float) -> None:
+        self.latencies[step].append(seconds)
+
+    def fail(self, step: str, reason: str) -> None:
+        self.errors[step][reason] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        steps = {}
+        for step in STEPS + ("flow",):
+            samples = sorted(self.latencies.get(step, []))
+            steps[step] = {
+                "ok": len(samples),
+                "errors": sum(self.errors[step].values()),
+                "error_reasons": dict(self.errors[step]),
+                "throughput_per_s": len(samples) / elapsed if elapsed else 0.0,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+                "max_ms": (samples[-1] if samples else 0.0) * 1000,
+            }
+        return {"elapsed_s": elapsed, "steps": steps}
+
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, -(-len(sorted_samples) * p // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+def payload(response: httpx.Response) -> Dict[str, Any]:
+    try:
+        body = response.json()
+    except ValueError:
+        raise StepFailed(f"http_{response.status_code}_not_json")
+    if response.status_code >= 400:
+        raise StepFailed(f"http_{response.status_code}")
+    return body.get("data") or {}
+
+
+async def await_job(client: httpx.AsyncClient, response: httpx.Response, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Result of a 200 answer, or of the job a 202 answer points to"""
+    data = payload(response)
+    while response.status_code == 202:
+        # Jobs are only visible to their own session
+        response = await client.get(data["status_url"], params={"wait": LONG_POLL_SECONDS}, headers=headers)
+        data = payload(response)
+    if data.get("status") == "failed":
+        raise StepFailed("job_failed")
+    return data.get("result", data) if "job_id" in data else data
+
+
+class VirtualUser:
+    def __init__(self, args: argparse.Namespace, client: httpx.AsyncClient, recorder: Recorder,
+                 timeline_questions: List[Dict[str, Any]], rng: random.Random):
+        self.args = args
+        self.client = client
+        self.recorder = recorder
+        self.timeline_questions = timeline_questions
+        self.rng = rng
+        self.session_id = ""
+
+    async def step(self, name: str, coro) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await coro
+        except StepFailed as e:
+            self.recorder.fail(name, e.reason)
+            raise
+        except httpx.HTTPError as e:
+            self.recorder.fail(name, type(e).__name__)
+            raise StepFailed(type(e).__name__)
+        self.recorder.ok(name, time.perf_counter() - started)
+        if self.args.think:
+            await asyncio.sleep(self.args.think)
+        return result
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"X-Session-ID": self.session_id}
+
+    async def profiling(self) -> None:
+        response = await self.client.get("/api/v1/start_profiling/start_profiling")
+        data = payload(response)
+        self.session_id = data["session_id"]
+        answers = [
+            self.rng.choice(q["options"])["label"] if q.get("options") else FREE_TEXT_ANSWER
+            for q in data["questions"]
+        ]
+        response = await self.client.post(
+            "/api/v1/start_profiling/submit_answers", json={"answers": answers}, headers=self.headers
+        )
+        payload(response)
+
+    async def quick_test(self) -> List[Dict[str, Any]]:
+        response = await self.client.get("/api/v2/assessment_before/get_quick_test_questions", headers=self.headers)
+        questions = payload(response).get("questions") or []
+        if not questions:
+            raise StepFailed("no_questions")
+        return questions
+
+    async def submit(self, questions: List[Dict[str, Any]]) -> None:
+        answers = [self.rng.choice(q.get("options") or [1, 2, 3, 4]) for q in questions]
+        response = await self.client.post(
+            "/api/v2/assessment_before/submit_test_answers", json={"answers": answers}, headers=self.headers
+        )
+        payload(response)
+
+    async def results(self) -> None:
+        response = await self.client.get("/api/v2/result/get_results", headers=self.headers)
+        result = await await_job(self.client, response, self.headers)
+        if not result.get("summary_analysis"):
+            raise StepFailed("empty_summary")
+
+    async def timeline(self) -> None:
+        answers = [self.rng.choice(q["choices"])["label"] for q in self.timeline_questions]
+        response = await self.client.post(
+            "/api/v2/timeline/get_timeline_result", json={"answers": answers}, headers=self.headers
+        )
+        result = await await_job(self.client, response, self.headers)
+        if not result.get("timeline"):
+            raise StepFailed("empty_timeline")
+
+    async def flow(self) -> None:
+        started = time.perf_counter()
+        try:
+            await self.step("profiling", self.profiling())
+            questions = await self.step("quick_test", self.quick_test())
+            await self.step("submit", self.submit(questions))
+            await self.step("results", self.results())
+            await self.step("timeline", self.timeline())
+        except StepFailed as e:
+            self.recorder.fail("flow", e.reason)
+            return
+        self.recorder.ok("flow", time.perf_counter() - started)
+
+
+async def login(client: httpx.AsyncClient, args: argparse.Namespace) -> str:
+    if args.token:
+        return args.token
+    response = await client.post("/api/v1/auth/login", json={"username": args.username, "password": args.password})
+    if response.status_code != 200:
+        sys.exit(f"Login failed ({response.status_code}): {response.text[:200]}")
+    return response.json()["access_token"]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    recorder = Recorder()
+    seed = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as setup:
+        token = await login(setup, args)
+        setup.headers["Authorization"] = f"Bearer {token}"
+        timeline_questions = payload(await setup.get("/api/v2/timeline/questions"))["timeline_profiling_questions"]
+
+    deadline = time.perf_counter() + args.duration if not args.iterations else None
+
+    async def user_loop(index: int, client: httpx.AsyncClient) -> None:
+        await asyncio.sleep(args.ramp_up * index / args.users)
+        user = VirtualUser(args, client, recorder, timeline_questions, random.Random(seed.getrandbits(64)))
+        done = 0
+        while (deadline is None and done < args.iterations) or (deadline is not None and time.perf_counter() < deadline):
+            await user.flow()
+            done += 1
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=args.timeout,
+        limits=limits,
+        headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        recorder.started = time.perf_counter()
+        await asyncio.gather(*(user_loop(i, client) for i in range(args.users)))
+        recorder.finished = time.perf_counter()
+
+    result = recorder.summary()
+    if args.mock_url:
+        async with httpx.AsyncClient(timeout=10) as client:
+            try:
+                result["mock_llm"] = (await client.get(f"{args.mock_url.rstrip('/')}/stats")).json()
+            except httpx.HTTPError as e:
+                result["mock_llm"] = {"error": str(e)}
+    return result
+
+
+def report(result: Dict[str, Any], args: argparse.Namespace) -> None:
+    print(f"{args.users} users, {result['elapsed_s']:.1f} s against {args.base_url}\n")
+    print(f"{'step':<12}{'ok':>7}{'err':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step, row in result["steps"].items():
+        print(f"{step:<12}{row['ok']:>7}{row['errors']:>6}{row['throughput_per_s']:>9.2f}"
+              f"{row['p50_ms']:>10.0f}{row['p95_ms']:>10.0f}{row['p99_ms']:>10.0f}{row['max_ms']:>10.0f}")
+
+    failures = [(step, row["error_reasons"]) for step, row in result["steps"].items() if row["error_reasons"] and step != "flow"]
+    if failures:
+        print("\nErrors:")
+        for step, reasons in failures:
+            print(f"  {step:<12}" + ", ".join(f"{reason} x{count}" for reason, count in sorted(reasons.items())))
+    if "mock_llm" in result:
+        print(f"\nMock LLM: {json.dumps(result['mock_llm'], sort_keys=True)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:5001")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=120.0, help="seconds to run (ignored with --iterations)")
+    parser.add_argument("--iterations", type=int, default=0, help="flows per user instead of a duration")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds until all users have started")
+    parser.add_argument("--think", type=float, default=0.0, help="pause between steps")
+    parser.add_argument("--timeout", type=float, default=180.0, help="per-request timeout")
+    parser.add_argument("--username", default="kingrokade")
+    parser.add_argument("--password", default="benteng88")
+    parser.add_argument("--token", default="", help="access token instead of logging in")
+    parser.add_argument("--mock-url", default="", help="mock LLM server whose /stats to include")
+    parser.add_argument("--json", default="", help="also write the summary to this file")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report(result, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
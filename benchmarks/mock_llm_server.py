@@ -0,0 +1,358 @@
+"""
+Mock OpenAI-compatible LLM server for load tests
+
+Serves ``POST /v1/chat/completions`` (plain and ``stream: true``) with answers
+shaped like the real model's for every prompt the app sends:
+
+    profile     - one descriptive paragraph (start_profiling)
+    summary     - the v2 summary analysis paragraph
+    next_steps  - a numbered list, parsed by format_next_steps_to_list
+    timeline    - JSON valid against api.v2.timeline.schemas.TimelineOutput
+
+Requests carrying a ``response_format`` JSON schema the mock does not know
+get a generic instance of that schema. Latency distribution, error rate,
+hung requests and malformed answers are configurable, so timeouts, the
+fallback cascade, circuit breakers and admission control can be exercised
+reproducibly without a live model. ``GET /stats`` returns counters.
+
+Point the app at it (and turn off shortcuts that skip the LLM):
+    LLM_OVERRIDE_URL=http://127.0.0.1:8090/v1/chat/completions LLM_OVERRIDE_TOKEN=mock \\
+    LLM_OVERRIDE_MODEL=mock PROFILE_ARCHETYPES_ENABLED=false python main.py
+
+Usage:
+    python benchmarks/mock_llm_server.py [--port 8090] [--latency lognormal:2,0.4]
+        [--token-latency 0.01] [--ttft 0.3] [--error-rate 0.02] [--error-codes 500,503,429]
+        [--hang-rate 0] [--hang-seconds 120] [--malformed-rate 0] [--seed 1]
+
+Latency distributions (seconds, sampled per request):
+    fixed:S  uniform:LO,HI  normal:MEAN,SD  lognormal:MEDIAN,SIGMA
+    exponential:MEAN  pareto:SCALE,ALPHA
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+ENABLERS = [
+    "Principles, Policies, and Frameworks",
+    "Processes",
+    "Organizational Structures",
+    "Information",
+    "Culture, Ethics, and Behavior",
+    "People, Skills, and Competences",
+    "Services, Infrastructure, and Applications",
+]
+
+TASKS = [
+    "Menyusun kebijakan digital forensics readiness yang disetujui manajemen",
+    "Mendokumentasikan prosedur pengumpulan dan preservasi bukti digital",
+    "Membentuk tim respons insiden dengan peran dan tanggung jawab yang jelas",
+    "Mengidentifikasi sumber bukti digital dan kebutuhan retensi log",
+    "Melaksanakan pelatihan kesadaran forensik untuk seluruh karyawan",
+    "Meningkatkan kompetensi tim melalui sertifikasi digital forensics",
+    "Menerapkan sistem logging terpusat dan sinkronisasi waktu",
+    "Melakukan simulasi insiden untuk menguji prosedur forensik",
+    "Menetapkan metrik evaluasi kesiapan dan melakukan review berkala",
+]
+
+RISKS = [
+    ("Keterbatasan anggaran menghambat pengadaan tools", "Prioritaskan tools open source dan ajukan anggaran bertahap"),
+    ("Resistensi perubahan dari karyawan", "Libatkan manajemen sebagai sponsor dan lakukan sosialisasi rutin"),
+    ("Kurangnya SDM dengan keahlian forensik", "Gunakan konsultan eksternal sambil membangun kompetensi internal"),
+    ("Log tidak lengkap saat insiden terjadi", "Tetapkan kebijakan retensi log dan audit konfigurasi secara berkala"),
+]
+
+SENTENCES = [
+    "Organisasi telah memiliki kesadaran awal terhadap pentingnya kesiapan digital forensics.",
+    "Kebijakan dan prosedur yang ada belum sepenuhnya terdokumentasi dan diterapkan secara konsisten.",
+    "Enabler dengan nilai terendah perlu menjadi prioritas pada tahap perbaikan berikutnya.",
+    "Dukungan manajemen menjadi faktor kunci untuk meningkatkan tingkat kematangan secara berkelanjutan.",
+    "Kapabilitas pengumpulan dan preservasi bukti digital masih bergantung pada individu tertentu.",
+    "Infrastruktur pendukung seperti logging terpusat sudah tersedia namun belum dimanfaatkan optimal.",
+    "Peningkatan kompetensi SDM melalui pelatihan terstruktur akan mempercepat pencapaian level berikutnya.",
+    "Evaluasi berkala terhadap proses forensik diperlukan agar perbaikan dapat diukur.",
+]
+
+# Prompt kind by keywords of the system prompt (first match wins)
+PROMPT_KINDS = [
+    ("timeline", ("roadmap implementasi", "timeline implementasi")),
+    ("next_steps", ("rekomendasi strategis", "numbered list")),
+    ("summary", ("menganalisis tingkat kematangan",)),
+    ("profile", ("analisis profil organisasi", "deskripsi karakteristik")),
+]
+
+
+# ---- latency ----
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """``"lognormal:2,0.4"`` -> sampler of seconds"""
+    kind, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",") if p.strip()]
+    samplers = {
+        "fixed": (1, lambda rng, s: s),
+        "uniform": (2, lambda rng, lo, hi: rng.uniform(lo, hi)),
+        "normal": (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        "lognormal": (2, lambda rng, median, sigma: rng.lognormvariate(math.log(median), sigma)),
+        "exponential": (1, lambda rng, mean: rng.expovariate(1 / mean)),
+        "pareto": (2, lambda rng, scale, alpha: scale * rng.paretovariate(alpha)),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution '{kind}' (one of {', '.join(samplers)})")
+    arity, fn = samplers[kind]
+    if len(params) != arity:
+        raise ValueError(f"'{kind}' takes {arity} parameter(s), got '{raw}'")
+    return lambda rng: max(0.0, fn(rng, *params))
+
+
+# ---- answers ----
+
+def prompt_kind(messages: List[Dict[str, Any]], response_format: Optional[Dict[str, Any]]) -> str:
+    schema_name = ((response_format or {}).get("json_schema") or {}).get("name")
+    if schema_name:
+        return schema_name
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system").lower()
+    text = system or " ".join(m.get("content", "") for m in messages).lower()
+    for kind, keywords in PROMPT_KINDS:
+        if any(keyword in text for keyword in keywords):
+            return kind
+    return "text"
+
+
+def paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.sample(SENTENCES, min(sentences, len(SENTENCES))))
+
+
+def timeline_answer(rng: random.Random) -> Dict[str, Any]:
+    start = date.today() + timedelta(days=7)
+    timeline = []
+    for task in rng.sample(TASKS, rng.randint(4, 8)):
+        end = start + timedelta(days=rng.choice((14, 30, 45, 60)))
+        timeline.append({
+            "tanggal_mulai": start.isoformat(),
+            "tanggal_selesai": end.isoformat(),
+            "task": task,
+            "focus_enabler": rng.choice(ENABLERS),
+        })
+        start = end + timedelta(days=1)
+    months = max(1, round((start - date.today()).days / 30))
+    return {
+        "total_duration": f"{months} bulan",
+        "timeline": timeline,
+        "risks": [{"risk": r, "mitigation": m} for r, m in rng.sample(RISKS, rng.randint(2, 4))],
+    }
+
+
+def schema_instance(schema: Dict[str, Any], rng: random.Random) -> Any:
+    """Minimal instance of a (strict, $ref-free) JSON schema"""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "anyOf" in schema:
+        return schema_instance(schema["anyOf"][0], rng)
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {key: schema_instance(sub, rng) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        count = max(schema.get("minItems", 0), rng.randint(1, 3))
+        return [schema_instance(schema.get("items", {}), rng) for _ in range(count)]
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 1), schema.get("maximum", 5))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0), schema.get("maximum", 5)), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return rng.choice(SENTENCES)
+
+
+def answer_for(kind: str, response_format: Optional[Dict[str, Any]], rng: random.Random) -> str:
+    schema = ((response_format or {}).get("json_schema") or {}).get("schema")
+    if kind == "timeline":
+        answer = timeline_answer(rng)
+        # Only when the schema still has the shape this mock knows
+        if schema is None or set(schema.get("properties", {})) == set(answer):
+            return json.dumps(answer, ensure_ascii=False)
+    if schema is not None:
+        return json.dumps(schema_instance(schema, rng), ensure_ascii=False)
+    if kind == "next_steps":
+        steps = rng.sample(TASKS, 5)
+        return "\n".join(f"{i}. **{step.split(' ', 1)[0]}**: {step}." for i, step in enumerate(steps, 1))
+    if kind == "summary":
+        return paragraph(rng, 5)
+    return paragraph(rng, 4)
+
+
+def malformed(content: str, rng: random.Random) -> str:
+    """Answer a broken model might give: truncated, prose-wrapped or too short"""
+    return rng.choice([
+        content[:max(1, len(content) // 2)],
+        f"Berikut jawabannya: {content}",
+        "Error",
+    ])
+
+
+# ---- server ----
+
+class MockLLM:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.latency = parse_latency(args.latency)
+        self.error_codes = [int(code) for code in args.error_codes.split(",")]
+        self._rng = random.Random(args.seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def rng(self) -> random.Random:
+        # One seeded stream hands out per-request generators: reproducible
+        # across runs with the same request order, and thread-safe
+        with self._rng_lock:
+            return random.Random(self._rng.getrandbits(64))
+
+    def count(self, *keys: str) -> None:
+        with self._stats_lock:
+            for key in keys:
+                self.stats[key] += 1
+
+
+def create_app(args: argparse.Namespace) -> Flask:
+    app = Flask(__name__)
+    mock = MockLLM(args)
+
+    def error(code: int, message: str) -> Response:
+        response = jsonify({"error": {"message": message, "type": "mock_error", "code": code}})
+        response.status_code = code
+        if code == 429:
+            response.headers["Retry-After"] = "1"
+        return response
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        if args.token and request.headers.get("Authorization") != f"Bearer {args.token}":
+            mock.count("requests", "status_401")
+            return error(401, "Invalid token")
+
+        body = request.get_json(silent=True) or {}
+        messages = body.get("messages") or []
+        response_format = body.get("response_format")
+        kind = prompt_kind(messages, response_format)
+        rng = mock.rng()
+        mock.count("requests", f"kind_{kind}")
+
+        latency = mock.latency(rng)
+        if rng.random() < args.hang_rate:
+            mock.count("hung")
+            time.sleep(args.hang_seconds)
+        if rng.random() < args.error_rate:
+            code = rng.choice(mock.error_codes)
+            time.sleep(min(latency, args.ttft))
+            mock.count(f"status_{code}")
+            return error(code, "Injected failure")
+
+        content = answer_for(kind, response_format, rng)
+        if rng.random() < args.malformed_rate:
+            mock.count("malformed")
+            content = malformed(content, rng)
+        mock.count("status_200")
+
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        completion_tokens = max(1, len(content) // 4)
+        total = latency + completion_tokens * args.token_latency
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = body.get("model") or "mock"
+
+        if not body.get("stream"):
+            time.sleep(total)
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+        chunks = [content[i:i + args.chunk_chars] for i in range(0, len(content), args.chunk_chars)]
+        first = min(args.ttft, total)
+        gap = (total - first) / max(1, len(chunks) - 1)
+
+        def event(delta: Dict[str, Any], finish: Optional[str] = None) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }, ensure_ascii=False) + "\n\n"
+
+        def stream() -> Iterator[str]:
+            time.sleep(first)
+            yield event({"role": "assistant", "content": ""})
+            for i, chunk in enumerate(chunks):
+                if i:
+                    time.sleep(gap)
+                yield event({"content": chunk})
+            yield event({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @app.route("/v1/models", methods=["GET"])
+    def models():
+        return jsonify({"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+
+    @app.route("/stats", methods=["GET"])
+    def stats():
+        with mock._stats_lock:
+            return jsonify(dict(mock.stats))
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({"status": "ok"})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:2,0.4", help="base latency distribution")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="extra seconds per completion token")
+    parser.add_argument("--ttft", type=float, default=0.3, help="time to first token when streaming")
+    parser.add_argument("--chunk-chars", type=int, default=16, help="characters per streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction answered with an HTTP error")
+    parser.add_argument("--error-codes", default="500,503,429", help="status codes of injected errors")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction that hangs (client timeouts)")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="fraction of truncated/prose/short answers")
+    parser.add_argument("--token", default="", help="required bearer token (any if empty)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    args = parser.parse_args()
+
+    parse_latency(args.latency)  # fail fast on a bad spec
+    print(f"Mock LLM on http://{args.host}:{args.port}/v1/chat/completions "
+          f"(latency {args.latency}, errors {args.error_rate:.0%}, malformed {args.malformed_rate:.0%})")
+    create_app(args).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
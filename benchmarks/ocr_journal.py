@@ -0,0 +1,95 @@
+"""
+Benchmark: OCR of the journal PDF
+
+Compares the previous approach (render every page into memory, then OCR
+them one by one) with the streamed process-pool OCR in
+``api/v2/create_question/ocr.py``, cold and with a warm page cache.
+
+Needs poppler and tesseract plus the pdf2image/pytesseract packages.
+
+Usage:
+    python benchmarks/ocr_journal.py [--pdf PATH] [--pages 8] [--workers N] [--dpi 300]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(project_root, "api", "v2", "create_question"))
+
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
+from pypdf import PdfReader, PdfWriter
+
+import ocr
+
+JOURNAL_PDF = os.path.join(project_root, "database", "journal_base_v2.pdf")
+
+
+def first_pages(pdf_path: str, pages: int, out_dir: str) -> str:
+    """Copy of the first ``pages`` pages so every case sees the same input"""
+    writer = PdfWriter()
+    for page in PdfReader(pdf_path).pages[:pages]:
+        writer.add_page(page)
+    path = os.path.join(out_dir, "sample.pdf")
+    with open(path, 'wb') as f:
+        writer.write(f)
+    return path
+
+
+def sequential_ocr(pdf_path: str, dpi: int) -> str:
+    """The pre-pipeline implementation: all pages rendered up front, serial OCR"""
+    images = convert_from_path(pdf_path, dpi=dpi)
+    return "".join(
+        f"\n\n--- Halaman {i + 1} ---\n\n{pytesseract.image_to_string(image)}"
+        for i, image in enumerate(images)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", default=JOURNAL_PDF)
+    parser.add_argument("--pages", type=int, default=8, help="Pages to process (0 = whole PDF)")
+    parser.add_argument("--workers", type=int, default=None, help="OCR processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = first_pages(args.pdf, args.pages, tmp) if args.pages else args.pdf
+        pages = pdfinfo_from_path(pdf_path)["Pages"]
+        cache_dir = os.path.join(tmp, "cache")
+        out_path = os.path.join(tmp, "out.txt")
+
+        def streamed():
+            return ocr.ocr_pdf(pdf_path, dpi=args.dpi, txt_path=out_path, workers=args.workers, cache_dir=cache_dir)
+
+        def streamed_ocr_only():
+            return ocr.ocr_pdf(
+                pdf_path, dpi=args.dpi, txt_path=out_path, workers=args.workers,
+                cache_dir=None, use_text_layer=False
+            )
+
+        cases = [
+            ("sequential (render all, serial OCR)", lambda: sequential_ocr(pdf_path, args.dpi)),
+            ("process pool, OCR every page", streamed_ocr_only),
+            ("process pool + text layer, cold cache", streamed),
+            ("warm page cache", streamed),
+        ]
+
+        print(f"PDF: {os.path.basename(args.pdf)}, {pages} pages, dpi {args.dpi}, workers {args.workers or os.cpu_count()}")
+        baseline = None
+        for name, fn in cases:
+            start = time.perf_counter()
+            text = fn()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"  {name:<40} {elapsed:8.2f} s  {pages / elapsed:6.2f} pages/s  "
+                f"({baseline / elapsed:5.1f}x, {len(text)} chars)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -21,23 +21,108 @@ class Settings:
     
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    # Root level plus optional per-logger overrides (see shared/logging_config.py),
+    # e.g. "INFO,services.llm_service=DEBUG,werkzeug=WARNING"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")  # json or text
+    LOG_MAX_MESSAGE_CHARS: int = int(os.getenv("LOG_MAX_MESSAGE_CHARS", 2000))
 
     # LLM Configuration
     LLM_URL: str = os.getenv("LLM_URL", "").strip()
     LLM_TOKEN: str = os.getenv("LLM_TOKEN", "").strip()
     LLM_MODEL: str = os.getenv("LLM_MODEL", "").strip()
+    ## Primary LLM override for load tests (benchmarks/mock_llm_server.py);
+    ## unset in deployments, where LLMService uses the hosted model
+    LLM_OVERRIDE_URL: str = os.getenv("LLM_OVERRIDE_URL", "").strip()
+    LLM_OVERRIDE_TOKEN: str = os.getenv("LLM_OVERRIDE_TOKEN", "").strip()
+    LLM_OVERRIDE_MODEL: str = os.getenv("LLM_OVERRIDE_MODEL", "").strip()
 
     ## LLM Fallback Key
     FALLBACK_LLM_KEY_GEMINI: str = os.getenv("FALLBACK_LLM_KEY_GEMINI", "").strip()
     FALLBACK_LLM_KEY_OPENAI: str = os.getenv("FALLBACK_LLM_KEY_OPENAI", "").strip()
+
+    ## LLM Request Coalescing (identical in-flight prompts share one call)
+    LLM_SINGLE_FLIGHT: bool = os.getenv("LLM_SINGLE_FLIGHT", "True").lower() == "true"
+
+    ## LLM Circuit Breaker (per backend)
+    LLM_BREAKER_WINDOW_SIZE: int = int(os.getenv("LLM_BREAKER_WINDOW_SIZE", 20))
+    LLM_BREAKER_WINDOW_SECONDS: float = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", 120))
+    LLM_BREAKER_MIN_CALLS: int = int(os.getenv("LLM_BREAKER_MIN_CALLS", 5))
+    LLM_BREAKER_ERROR_RATE: float = float(os.getenv("LLM_BREAKER_ERROR_RATE", 0.5))
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", 20))
+    LLM_BREAKER_SLOW_CALL_RATE: float = float(os.getenv("LLM_BREAKER_SLOW_CALL_RATE", 0.8))
+    LLM_BREAKER_OPEN_SECONDS: float = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 30))
+    LLM_BREAKER_HALF_OPEN_PROBES: int = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", 1))
+
+    ## LLM Hedged Requests (opt-in per call)
+    LLM_HEDGE_QUANTILE: float = float(os.getenv("LLM_HEDGE_QUANTILE", 0.9))
+    LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+    LLM_HEDGE_DEFAULT_DELAY: float = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 10))
+
+    ## Thread pool for the blocking Gemini/OpenAI SDK calls
+    LLM_FALLBACK_WORKERS: int = int(os.getenv("LLM_FALLBACK_WORKERS", 8))
+
+    ## LLM Admission Control (per-backend concurrency + priority queue)
+    LLM_MAX_CONCURRENT_PRIMARY: int = int(os.getenv("LLM_MAX_CONCURRENT_PRIMARY", 8))
+    LLM_MAX_CONCURRENT_FALLBACK: int = int(os.getenv("LLM_MAX_CONCURRENT_FALLBACK", 16))
+    LLM_QUEUE_DEADLINE: float = float(os.getenv("LLM_QUEUE_DEADLINE", 10))
+    LLM_MAX_QUEUE_SIZE: int = int(os.getenv("LLM_MAX_QUEUE_SIZE", 64))
+
+    ## LLM Token Budgets (prompt trimming + max_tokens from output shape)
+    LLM_TOKEN_BUDGET_ENABLED: bool = os.getenv("LLM_TOKEN_BUDGET_ENABLED", "True").lower() == "true"
+    LLM_CONTEXT_WINDOW: int = int(os.getenv("LLM_CONTEXT_WINDOW", 32768))
+    LLM_TOKEN_SAFETY_MARGIN: int = int(os.getenv("LLM_TOKEN_SAFETY_MARGIN", 256))
+    LLM_TOKENIZER_ENCODING: str = os.getenv("LLM_TOKENIZER_ENCODING", "cl100k_base")
+
+    ## LLM Structured Output (schema-guided decoding for JSON endpoints)
+    LLM_STRUCTURED_OUTPUT: bool = os.getenv("LLM_STRUCTURED_OUTPUT", "True").lower() == "true"
+    LLM_STREAM_STRUCTURED: bool = os.getenv("LLM_STREAM_STRUCTURED", "True").lower() == "true"
+
+    # Precomputed profile descriptions (see api/start_profiling/build_archetypes.py)
+    PROFILE_ARCHETYPES_ENABLED: bool = os.getenv("PROFILE_ARCHETYPES_ENABLED", "True").lower() == "true"
+    PROFILE_ARCHETYPES_PATH: str = os.getenv("PROFILE_ARCHETYPES_PATH", "database/profile_archetypes.json")
+
+    # Background jobs for results/timeline generation (see shared/job_queue.py)
+    JOB_MAX_CONCURRENT: int = int(os.getenv("JOB_MAX_CONCURRENT", 8))
+    JOB_RESULT_TTL_SECONDS: int = int(os.getenv("JOB_RESULT_TTL_SECONDS", 3600))
+    # How long the synchronous endpoints wait for a job before answering 202
+    JOB_SYNC_WAIT_SECONDS: float = float(os.getenv("JOB_SYNC_WAIT_SECONDS", 110))
+    # Start generating results as soon as the assessment answers are submitted
+    JOB_PRESTART_RESULTS: bool = os.getenv("JOB_PRESTART_RESULTS", "True").lower() == "true"
     
-    # Validate LLM configuration
-    if not LLM_URL or not LLM_TOKEN:
-        print("Warning: LLM configuration not complete. Check environment variables:")
-        print("   - LLM_URL")
-        print("   - TOKEN_CUSTOM_LLM_APILOGY")
-        print("   - LLM_MODEL")
+    # Prometheus scrape endpoint (/metrics); when a token is set, scrapers
+    # must send it as "Authorization: Bearer <token>"
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+    
+    # OpenTelemetry tracing (see shared/tracing.py): none, otlp, file or console
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "data/traces.jsonl")
+    TRACING_SERVICE_NAME: str = os.getenv("TRACING_SERVICE_NAME", "df-readiness-api")
+    TRACING_SAMPLE_RATIO: float = float(os.getenv("TRACING_SAMPLE_RATIO", 1.0))
+    
+    # Request profiling (see shared/profiling.py). Users listed in
+    # PROFILING_ADMINS (usernames or emails, comma separated) can profile a
+    # request with "X-Profile: 1"; PROFILING_SAMPLE_RATE of all requests are
+    # profiled in the background, keeping the slowest PROFILING_KEEP_SLOWEST
+    PROFILING_ADMINS: str = os.getenv("PROFILING_ADMINS", "")
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_KEEP_SLOWEST: int = int(os.getenv("PROFILING_KEEP_SLOWEST", 20))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", 5))
+    PROFILING_DIR: str = os.getenv("PROFILING_DIR", "data/profiles")
+    
+    # Response compression (see shared/compression.py). Brotli is used when the
+    # brotli package is installed and the client accepts it, gzip otherwise;
+    # bodies under COMPRESSION_MIN_SIZE bytes are sent as they are
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+    COMPRESSION_MIMETYPES: str = os.getenv(
+        "COMPRESSION_MIMETYPES",
+        "application/json,text/event-stream,text/plain,text/html,text/css,text/javascript,"
+        "application/javascript,image/svg+xml"
+    )
     
     # Database Configuration
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
@@ -56,6 +141,16 @@ class Settings:
     
     # Mail Resend API Key
     MAIL_RESEND_API_KEY: str = os.getenv("MAIL_RESEND_API_KEY", "")
+    MAIL_FROM: str = os.getenv("MAIL_FROM", "noreply@stelarea.com")
+    # Email outbox (see services/email_outbox.py); "smtp" targets e.g. a local fake mail sink
+    MAIL_TRANSPORT: str = os.getenv("MAIL_TRANSPORT", "resend")
+    MAIL_SMTP_HOST: str = os.getenv("MAIL_SMTP_HOST", "localhost")
+    MAIL_SMTP_PORT: int = int(os.getenv("MAIL_SMTP_PORT", 1025))
+    MAIL_OUTBOX_PATH: str = os.getenv("MAIL_OUTBOX_PATH", "data/email_outbox.db")
+    MAIL_BATCH_SIZE: int = int(os.getenv("MAIL_BATCH_SIZE", 50))
+    MAIL_MAX_ATTEMPTS: int = int(os.getenv("MAIL_MAX_ATTEMPTS", 6))
+    # A batch claimed longer ago than this is taken to be abandoned by a dead sender
+    MAIL_CLAIM_LEASE_SECONDS: float = float(os.getenv("MAIL_CLAIM_LEASE_SECONDS", 900))
 
     # Collection Names
     USERS_COLLECTION: str = "users"
@@ -108,6 +203,19 @@ class Settings:
             "max_retries": 3
         }
     
+    def get_circuit_breaker_config(self) -> dict:
+        """Get LLM circuit breaker configuration as CircuitBreaker kwargs"""
+        return {
+            "window_size": self.LLM_BREAKER_WINDOW_SIZE,
+            "window_seconds": self.LLM_BREAKER_WINDOW_SECONDS,
+            "min_calls": self.LLM_BREAKER_MIN_CALLS,
+            "error_rate_threshold": self.LLM_BREAKER_ERROR_RATE,
+            "slow_call_seconds": self.LLM_BREAKER_SLOW_CALL_SECONDS,
+            "slow_call_rate_threshold": self.LLM_BREAKER_SLOW_CALL_RATE,
+            "open_seconds": self.LLM_BREAKER_OPEN_SECONDS,
+            "half_open_probes": self.LLM_BREAKER_HALF_OPEN_PROBES
+        }
+    
     def is_development(self) -> bool:
         """Check if running in development mode"""
         return self.ENVIRONMENT.lower() == "development"
@@ -116,6 +224,16 @@ class Settings:
         """Check if running in production mode"""
         return self.ENVIRONMENT.lower() == "production"
     
+    def config_warnings(self) -> list:
+        """Incomplete configuration, reported at startup instead of on import"""
+        warnings = []
+        if not self.LLM_URL or not self.LLM_TOKEN:
+            warnings.append(
+                "LLM configuration not complete. Check environment variables: "
+                "LLM_URL, TOKEN_CUSTOM_LLM_APILOGY, LLM_MODEL"
+            )
+        return warnings
+    
     def print_config_summary(self):
         """Print configuration summary (safe for logging)"""
         print(f"""
@@ -138,8 +256,4 @@ class Settings:
 """)
 
 # Create global settings instance
-settings = Settings()
-
-# Print config on import (only in development)
-if settings.is_development():
-    settings.print_config_summary()
\ No newline at end of file
+settings = Settings()
\ No newline at end of file
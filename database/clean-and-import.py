@@ -13,6 +13,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Paths are relative to this script (/database in the importer container)
+DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTION_BANK_MANIFEST = os.path.join(DATABASE_DIR, 'question_bank', 'manifest.json')
+# Used until a bank has been built with api/v2/create_question/build_bank.py
+LEGACY_QUESTIONS_V2_JSON = os.path.join(DATABASE_DIR, 'generated_questions_08122025_0138.json')
+
 
 class MongoDBConfig:
     """MongoDB configuration from environment variables"""
@@ -163,8 +169,15 @@ class CSVImporter:
             return 0
     
     def import_questions_v2(self, json_path: str, package_id: str = "qb_v2_000") -> int:
-        """Import generated questions JSON to question_before_v2 collection"""
-        collection = self.db.question_before_v2
+        """
+        Import generated questions JSON to question_before_v2 collection
+
+        Documents are written to a staging collection that then replaces
+        question_before_v2 in one rename, so the app never reads a
+        half-imported bank. Importing the bank version that is already
+        loaded is skipped.
+        """
+        staging = self.db.question_before_v2_staging
         documents = []
         
         if not os.path.exists(json_path):
@@ -177,8 +190,16 @@ class CSVImporter:
             
             metadata = data.get('metadata', {})
             enablers = data.get('enablers', [])
+            bank_version = metadata.get('bank_version')
+            
+            logger.info(f"Processing JSON v2 - Model: {metadata.get('model')}, Version: {metadata.get('version')}, Bank: {bank_version}")
             
-            logger.info(f"Processing JSON v2 - Model: {metadata.get('model')}, Version: {metadata.get('version')}")
+            if bank_version:
+                loaded = self.db.question_before_v2.find_one({}, {'bank_version': 1}) or {}
+                if loaded.get('bank_version') == bank_version:
+                    count = self.db.question_before_v2.count_documents({})
+                    logger.info(f"Question bank {bank_version} already loaded ({count} documents), skipping")
+                    return count
             
             for enabler in enablers:
                 enabler_id = enabler.get('enabler_id')
@@ -196,6 +217,7 @@ class CSVImporter:
                         'contribution_max': q.get('contribution_max', contribution_max),
                         'sum_contribution_max': sum_contribution_max,
                         'generated_at': metadata.get('generated_at'),
+                        'bank_version': bank_version,
                         'created_at': datetime.now().isoformat(),
                         'updated_at': datetime.now().isoformat()
                     }
@@ -204,7 +226,9 @@ class CSVImporter:
                         documents.append(doc)
             
             if documents:
-                result = collection.insert_many(documents)
+                staging.drop()
+                result = staging.insert_many(documents)
+                staging.rename('question_before_v2', dropTarget=True)
                 logger.info(f"Imported {len(result.inserted_ids)} documents to 'question_before_v2'")
                 return len(result.inserted_ids)
             else:
@@ -236,13 +260,23 @@ class CSVImporter:
                 logger.info(json.dumps(sample, default=str, indent=2))
 
 
+def current_question_bank() -> str:
+    """Path of the bank the manifest points at, or the legacy bank"""
+    if os.path.exists(QUESTION_BANK_MANIFEST):
+        with open(QUESTION_BANK_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('current'):
+            return os.path.join(DATABASE_DIR, 'question_bank', f"bank-{manifest['current']}.json")
+    return LEGACY_QUESTIONS_V2_JSON
+
+
 def main():
     """Main import process"""
     time.sleep(5)
     
-    keterangan_csv = '/database/keterangan.csv'
-    questions_v1_csv = '/database/data_wisang.csv'
-    questions_v2_json = '/database/generated_questions_08122025_0138.json'
+    keterangan_csv = os.path.join(DATABASE_DIR, 'keterangan.csv')
+    questions_v1_csv = os.path.join(DATABASE_DIR, 'data_wisang.csv')
+    questions_v2_json = current_question_bank()
     
     importer = CSVImporter()
     
@@ -253,7 +287,6 @@ def main():
     try:
         importer.drop_collection('keterangan')
         importer.drop_collection('question_before_v1')
-        importer.drop_collection('question_before_v2')
         
         keterangan_count = importer.import_keterangan(keterangan_csv)
         v1_count = importer.import_questions_v1(questions_v1_csv, package_id="qb_v1_000")
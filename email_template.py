@@ -1,146 +1,212 @@
 # email_template.py
-from typing import Dict, Any
+"""
+Assessment result email
+
+The HTML template is compiled by Jinja2 once (on first use) and reused for
+every email. Its static markup is minified before compilation, so the
+whitespace cost is paid once instead of on every render. Values coming
+from the LLM are HTML-escaped.
+
+``generate_email_templates`` renders many sessions in one call for the
+email outbox.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List
 import json
+import logging
+import re
+
+from jinja2 import Environment
+from markupsafe import Markup, escape
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATE_SOURCE = """
+<!DOCTYPE html>
+<html>
+  <body style="font-family: Arial, sans-serif; color: #222; line-height: 1.5;">
+    <p>Terima kasih telah menyelesaikan Digital Forensics Readiness Assessment.</p>
+
+    <h3>Ringkasan Hasil Assessment</h3>
+    <table cellpadding="4">
+      <tr><td>Email</td><td>{{ user_email }}</td></tr>
+      <tr><td>Paket Assessment</td><td>{{ selected_package }}</td></tr>
+      <tr><td>Level Kesiapan</td><td>{{ overall_level }}</td></tr>
+      <tr><td>Overall Score</td><td>{{ overall_score }}/100</td></tr>
+      <tr><td>Readiness Percentage</td><td>{{ readiness_percentage }}%</td></tr>
+      <tr><td>Completion Rate</td><td>{{ '%.1f' | format(completion_percentage) }}%</td></tr>
+    </table>
+
+    {% for title, items in sections %}
+    <h3>{{ title }}</h3>
+    <ul>
+      {% for item in items %}<li>{{ item }}</li>{% endfor %}
+    </ul>
+    {% endfor %}
+
+    <h3>Analisis Detail</h3>
+    <p>{{ detailed_analysis | nl2br }}</p>
+
+    <h3>Roadmap Perbaikan</h3>
+    <p>{{ improvement_roadmap | nl2br }}</p>
+
+    <h3>Penilaian Risiko</h3>
+    <p>{{ risk_assessment | nl2br }}</p>
+
+    <h3>Informasi Assessment</h3>
+    <table cellpadding="4">
+      <tr><td>Total Pertanyaan</td><td>{{ test_questions_count }}</td></tr>
+      <tr><td>Pertanyaan Dijawab</td><td>{{ test_answers_count }}</td></tr>
+      <tr><td>Tanggal Assessment</td><td>{{ timestamp }}</td></tr>
+    </table>
+
+    <p>Untuk informasi lebih lanjut atau konsultasi, silakan hubungi tim kami.</p>
+    <p>Terima kasih,<br>Tim Digital Forensics Readiness Assessment</p>
+  </body>
+</html>
+"""
+
+FALLBACK_TEMPLATE_SOURCE = """
+<p>Terima kasih telah menyelesaikan Digital Forensics Readiness Assessment.</p>
+<p>Terjadi kendala teknis dalam generate email template: {{ error }}<br>
+Silakan hubungi tim support untuk mendapatkan hasil assessment lengkap.</p>
+<p>Tim Digital Forensics Readiness Assessment</p>
+"""
+
+# Used when final_evaluation is not valid JSON (the raw text becomes the analysis)
+UNPARSED_EVALUATION = {
+    "overall_level": "Basic",
+    "overall_score": 0,
+    "readiness_percentage": 40,
+    "strengths": ["Assessment telah diselesaikan"],
+    "weaknesses": ["Perlu evaluasi lebih lanjut"],
+    "recommendations": ["Konsultasi dengan tim untuk analisis mendalam"],
+    "priority_actions": ["Review hasil assessment"],
+    "improvement_roadmap": "Diperlukan analisis lebih detail",
+    "risk_assessment": "Status assessment perlu dikonfirmasi"
+}
+
+# Used when final_evaluation is neither a string nor a dict
+INVALID_EVALUATION = {
+    "overall_level": "Unknown",
+    "overall_score": 0,
+    "readiness_percentage": 0,
+    "strengths": ["Assessment attempted"],
+    "weaknesses": ["Technical issue occurred"],
+    "recommendations": ["Please contact support"],
+    "priority_actions": ["Contact technical team"],
+    "detailed_analysis": "Technical issue during evaluation",
+    "improvement_roadmap": "Technical support required",
+    "risk_assessment": "Unable to assess due to technical issue"
+}
+
+# (title, evaluation key, fallback when the value is not a list)
+LIST_SECTIONS = [
+    ("Kekuatan Organisasi", "strengths", "Assessment completed"),
+    ("Area yang Perlu Diperbaiki", "weaknesses", "Areas for improvement identified"),
+    ("Rekomendasi", "recommendations", "Follow up recommended"),
+    ("Prioritas Tindakan", "priority_actions", "Review results"),
+]
+
+
+def minify_html(source: str) -> str:
+    """Collapse indentation and whitespace between tags in static markup"""
+    source = " ".join(line.strip() for line in source.strip().splitlines() if line.strip())
+    # Whitespace between tags and around {% %} blocks is never rendered meaningfully
+    return re.sub(r"(>|%\})\s+(<|\{%)", r"\1\2", source)
+
+
+def _nl2br(text: Any) -> Markup:
+    return Markup("<br>").join(escape(str(text)).split("\n"))
+
+
+@lru_cache(maxsize=1)
+def _environment() -> Environment:
+    env = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+    env.filters["nl2br"] = _nl2br
+    return env
+
+
+@lru_cache(maxsize=None)
+def _template(source: str):
+    # Compiled once per process
+    return _environment().from_string(minify_html(source))
+
+
+def load_templates() -> None:
+    """Compile the templates now instead of on the first email (pre-fork preload)"""
+    _template(EMAIL_TEMPLATE_SOURCE)
+    _template(FALLBACK_TEMPLATE_SOURCE)
+
+
+@lru_cache(maxsize=256)
+def _parse_evaluation(text: str) -> Dict[str, Any]:
+    # The same evaluation string is rendered for every email of a session
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, ValueError):
+        data = None
+    if not isinstance(data, dict):
+        return dict(UNPARSED_EVALUATION, detailed_analysis=text)
+    return data
+
+
+def _evaluation_data(final_evaluation: Any) -> Dict[str, Any]:
+    if isinstance(final_evaluation, str):
+        return _parse_evaluation(final_evaluation)
+    if isinstance(final_evaluation, dict):
+        return final_evaluation
+    return INVALID_EVALUATION
+
+
+def email_context(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Template variables for one session context"""
+    evaluation_data = _evaluation_data(ctx.get("final_evaluation", {}))
+
+    user_profile = ctx.get("user_profile", {})
+    if isinstance(user_profile, str):
+        try:
+            user_profile = json.loads(user_profile)
+        except (json.JSONDecodeError, ValueError):
+            user_profile = {}
+
+    test_questions_count = len(ctx.get("test_questions", []))
+    test_answers_count = len(ctx.get("test_answers", []))
+
+    sections = []
+    for title, key, fallback in LIST_SECTIONS:
+        items = evaluation_data.get(key, [fallback])
+        sections.append((title, items if isinstance(items, list) else [fallback]))
+
+    return {
+        "user_email": user_profile.get("email", "Unknown") if isinstance(user_profile, dict) else "Unknown",
+        "selected_package": ctx.get("selected_package", "Unknown"),
+        "overall_level": evaluation_data.get("overall_level", "Basic"),
+        "overall_score": evaluation_data.get("overall_score", 0),
+        "readiness_percentage": evaluation_data.get("readiness_percentage", 40),
+        "completion_percentage": (test_answers_count / test_questions_count * 100) if test_questions_count > 0 else 0,
+        "sections": sections,
+        "detailed_analysis": evaluation_data.get("detailed_analysis", "Analysis not available"),
+        "improvement_roadmap": evaluation_data.get("improvement_roadmap", "Roadmap to be developed"),
+        "risk_assessment": evaluation_data.get("risk_assessment", "Risk assessment pending"),
+        "test_questions_count": test_questions_count,
+        "test_answers_count": test_answers_count,
+        "timestamp": ctx.get("timestamp", "N/A"),
+    }
+
 
 def generate_email_template(manager) -> str:
     """Generate email template with assessment results"""
     try:
-        ctx = manager.context
-        
-        # Fix: Handle final_evaluation safely - could be string or dict
-        final_evaluation = ctx.get("final_evaluation", {})
-        
-        # Parse final_evaluation properly
-        if isinstance(final_evaluation, str):
-            # If it's a string, try to parse as JSON first
-            try:
-                evaluation_data = json.loads(final_evaluation)
-            except (json.JSONDecodeError, ValueError):
-                # If parsing fails, create fallback structure
-                evaluation_data = {
-                    "overall_level": "Basic",
-                    "overall_score": 0,
-                    "readiness_percentage": 40,
-                    "strengths": ["Assessment telah diselesaikan"],
-                    "weaknesses": ["Perlu evaluasi lebih lanjut"],
-                    "recommendations": ["Konsultasi dengan tim untuk analisis mendalam"],
-                    "priority_actions": ["Review hasil assessment"],
-                    "detailed_analysis": final_evaluation,  # Include the original string
-                    "improvement_roadmap": "Diperlukan analisis lebih detail",
-                    "risk_assessment": "Status assessment perlu dikonfirmasi"
-                }
-        elif isinstance(final_evaluation, dict):
-            evaluation_data = final_evaluation
-        else:
-            # Fallback for any other type
-            evaluation_data = {
-                "overall_level": "Unknown",
-                "overall_score": 0,
-                "readiness_percentage": 0,
-                "strengths": ["Assessment attempted"],
-                "weaknesses": ["Technical issue occurred"],
-                "recommendations": ["Please contact support"],
-                "priority_actions": ["Contact technical team"],
-                "detailed_analysis": "Technical issue during evaluation",
-                "improvement_roadmap": "Technical support required",
-                "risk_assessment": "Unable to assess due to technical issue"
-            }
-        
-        # Safe get with fallback values
-        overall_level = evaluation_data.get("overall_level", "Basic")
-        overall_score = evaluation_data.get("overall_score", 0)
-        readiness_percentage = evaluation_data.get("readiness_percentage", 40)
-        strengths = evaluation_data.get("strengths", ["Assessment completed"])
-        weaknesses = evaluation_data.get("weaknesses", ["Areas for improvement identified"])
-        recommendations = evaluation_data.get("recommendations", ["Follow up recommended"])
-        priority_actions = evaluation_data.get("priority_actions", ["Review assessment results"])
-        detailed_analysis = evaluation_data.get("detailed_analysis", "Analysis not available")
-        improvement_roadmap = evaluation_data.get("improvement_roadmap", "Roadmap to be developed")
-        risk_assessment = evaluation_data.get("risk_assessment", "Risk assessment pending")
-        
-        # Get other context data safely
-        user_profile = ctx.get("user_profile", {})
-        if isinstance(user_profile, str):
-            try:
-                user_profile = json.loads(user_profile)
-            except:
-                user_profile = {}
-        
-        user_email = user_profile.get("email", "Unknown") if isinstance(user_profile, dict) else "Unknown"
-        selected_package = ctx.get("selected_package", "Unknown")
-        test_questions_count = len(ctx.get("test_questions", []))
-        test_answers_count = len(ctx.get("test_answers", []))
-        
-        # Calculate completion percentage
-        completion_percentage = (test_answers_count / test_questions_count * 100) if test_questions_count > 0 else 0
-        
-        # Format strengths, weaknesses, recommendations, and priority actions as lists
-        strengths_list = "\n".join([f"• {strength}" for strength in strengths]) if isinstance(strengths, list) else "• Assessment completed"
-        weaknesses_list = "\n".join([f"• {weakness}" for weakness in weaknesses]) if isinstance(weaknesses, list) else "• Areas for improvement identified"
-        recommendations_list = "\n".join([f"• {rec}" for rec in recommendations]) if isinstance(recommendations, list) else "• Follow up recommended"
-        priority_actions_list = "\n".join([f"• {action}" for action in priority_actions]) if isinstance(priority_actions, list) else "• Review results"
-        
-        email_template = f"""
-Subject: Hasil Assessment Digital Forensics Readiness - {user_email}
-
-Terima kasih telah menyelesaikan Digital Forensics Readiness Assessment.
-
-=== RINGKASAN HASIL ASSESSMENT ===
-
-Email: {user_email}
-Paket Assessment: {selected_package}
-Level Kesiapan: {overall_level}
-Overall Score: {overall_score}/100
-Readiness Percentage: {readiness_percentage}%
-Completion Rate: {completion_percentage:.1f}%
-
-=== KEKUATAN ORGANISASI ===
-{strengths_list}
-
-=== AREA YANG PERLU DIPERBAIKI ===
-{weaknesses_list}
-
-=== REKOMENDASI ===
-{recommendations_list}
-
-=== PRIORITAS TINDAKAN ===
-{priority_actions_list}
-
-=== ANALISIS DETAIL ===
-{detailed_analysis}
-
-=== ROADMAP PERBAIKAN ===
-{improvement_roadmap}
-
-=== PENILAIAN RISIKO ===
-{risk_assessment}
-
-=== INFORMASI ASSESSMENT ===
-Total Pertanyaan: {test_questions_count}
-Pertanyaan Dijawab: {test_answers_count}
-Tanggal Assessment: {ctx.get('timestamp', 'N/A')}
-
-Untuk informasi lebih lanjut atau konsultasi, silakan hubungi tim kami.
-
-Terima kasih,
-Tim Digital Forensics Readiness Assessment
-        """
-        
-        return email_template.strip()
-        
+        return _template(EMAIL_TEMPLATE_SOURCE).render(email_context(manager.context))
+
     except Exception as e:
-        print(f"ERROR in generate_email_template: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        
-        # Return fallback email template
-        return f"""
-Subject: Hasil Assessment Digital Forensics Readiness
+        logger.error(f"Error in generate_email_template: {e}", exc_info=True)
 
-Terima kasih telah menyelesaikan Digital Forensics Readiness Assessment.
+        # Return fallback email template
+        return _template(FALLBACK_TEMPLATE_SOURCE).render(error=str(e))
 
-Terjadi kendala teknis dalam generate email template: {str(e)}
-Silakan hubungi tim support untuk mendapatkan hasil assessment lengkap.
 
-Tim Digital Forensics Readiness Assessment
-        """
\ No newline at end of file
+def generate_email_templates(managers: List[Any]) -> List[str]:
+    """Render the result email for many sessions in one call (outbox batches)"""
+    return [generate_email_template(manager) for manager in managers]
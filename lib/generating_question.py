@@ -1,9 +1,9 @@
-txt_file = "/Users/tiarasabrina/Documents/PROJECT/AI/df_readiness/database/journal_base_v2.txt"
+import os
 
-with open(txt_file, 'r', encoding='utf-8') as file:
-    text = file.read()
+JOURNAL_TXT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "journal_base_v2.txt")
 
-generate_question_v2_prompt = f"""
+# ``{text}`` is replaced with the journal text, see build_generate_question_v2_prompt
+GENERATE_QUESTION_V2_TEMPLATE = """
 Kamu adalah ahli Capability Maturity Models (CMM) untuk Digital Forensic Readiness (DFR).
 
 Pahami konteks berikut: {text}
@@ -44,4 +44,14 @@ Untuk setiap indikator, tulis dalam format ini:
 1=Initial, 2=Managed, 3=Defined, 4=Quantitatively Managed, 5=Optimized
 
 Sekarang buatlah pertanyaan HANYA untuk enabler yang disebutkan di awal.
-"""
\ No newline at end of file
+"""
+
+
+def load_journal_text(path: str = JOURNAL_TXT) -> str:
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def build_generate_question_v2_prompt(text: str) -> str:
+    """Question generation prompt with the journal as context"""
+    return GENERATE_QUESTION_V2_TEMPLATE.format(text=text)
@@ -5,9 +5,17 @@ Digital Forensics Readiness Assessment API
 import logging
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+from werkzeug.serving import is_running_from_reloader
 
 from config.settings import settings
 from services.database_service import db_service
+from services.email_outbox import email_outbox
+from shared.json_provider import init_json_provider
+from shared.metrics import init_request_metrics
+from shared.tracing import init_tracing, traced
+from shared.logging_config import setup_logging
+from shared.profiling import init_profiling
+from shared.compression import init_compression
 from api.auth.models import db as pg_db, User
 from api.auth.jwt_utils import decode_token
 
@@ -21,22 +29,24 @@ from api.rag_faiss import rag_faiss_bp
 from api.v2.assessment_before import assessment_before_bp_v2 as assessment_before_bp_v2
 from api.v2.result import result_v2
 from api.v2.timeline import timeline_v2
+from api.v2.jobs import jobs_v2
+from api.metrics import metrics_bp
+from api.profiling import profiling_bp
 
 # ============== APP INITIALIZATION ==============
 app = Flask(__name__)
 app.secret_key = settings.SECRET_KEY or 'secret_key'
+init_json_provider(app)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()  # Output to console/terminal
-    ]
-)
+# Configure logging (levels per module from LOG_LEVEL)
+setup_logging()
 
-# Set Flask's logger to DEBUG as well
-app.logger.setLevel(logging.DEBUG)
+# after_request hooks run in reverse: registered first, compression sees the final response
+init_compression(app)
+
+# Registered first so the request span and timing include the JWT check
+init_tracing(app)
+init_request_metrics(app)
 
 # CORS configuration
 CORS(app, supports_credentials=True)
@@ -57,16 +67,22 @@ app.register_blueprint(rag_faiss_bp, url_prefix='/api/v1/rag_faiss')
 app.register_blueprint(assessment_before_bp_v2, url_prefix='/api/v2/assessment_before')
 app.register_blueprint(result_v2, url_prefix='/api/v2/result')
 app.register_blueprint(timeline_v2, url_prefix='/api/v2/timeline')
+app.register_blueprint(jobs_v2, url_prefix='/api/v2/jobs')
+
+app.register_blueprint(metrics_bp)
+app.register_blueprint(profiling_bp, url_prefix='/api/v1/profiles')
 
 # ============== JWT MIDDLEWARE ==============
 PUBLIC_PATHS = {
     '/',
     '/api/v1/auth/login',
     '/api/v1/auth/register',
-    '/api/v1/auth/refresh'
+    '/api/v1/auth/refresh',
+    '/metrics'  # scrapers authenticate with METRICS_TOKEN instead
 }
 
 @app.before_request
+@traced("jwt_protect_routes")
 def jwt_protect_routes():
     """Protect all routes except public endpoints with JWT"""
     # Allow public endpoints
@@ -101,6 +117,10 @@ def jwt_protect_routes():
         return jsonify({'error': 'Invalid token', 'detail': str(e)}), 401
 
 
+# Registered after jwt_protect_routes: on-demand profiling is admin-only
+init_profiling(app)
+
+
 # ============== ROUTES ==============
 @app.route('/', methods=['GET'])
 def home():
@@ -134,6 +154,56 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 
+# ============== PRELOAD ==============
+def preload():
+    """
+    Do the work startup defers to first use, ahead of time
+
+    Heavy SDKs (google.genai, openai, motor, resend), the journal prompt
+    texts, the email template and the tokenizer are all loaded lazily so a
+    plain import of this module stays fast. Pre-fork servers should call
+    this once in the master after importing ``app`` (e.g. gunicorn
+    ``--preload`` with ``on_starting``), so the workers share these pages
+    copy-on-write instead of each paying for them on their first request.
+
+    Nothing here starts threads or event loops, which do not survive a
+    fork. The log listener thread is already running by then (setup_logging
+    runs at import); it is restarted in each forked worker. The email
+    outbox opens its SQLite connection per process on first use, and each
+    worker starts its own sender with ``start_workers``.
+    """
+    import importlib
+
+    for module in ("google.genai", "openai", "motor.motor_asyncio", "resend"):
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logging.getLogger(__name__).warning(f"Preload skipped {module}: {e}")
+
+    from api.v2.result.prompts import journal_text as result_journal_text
+    from api.v2.timeline.prompts import journal_text as timeline_journal_text
+    from email_template import load_templates
+    from shared.token_budget import count_tokens
+
+    result_journal_text()
+    timeline_journal_text()
+    load_templates()
+    count_tokens("preload")
+
+
+def start_workers():
+    """
+    Start this process's background workers
+
+    Call once in every process that serves requests, after any fork: the
+    ``__main__`` block below does, and pre-fork servers should call it from
+    a post-fork hook (e.g. gunicorn ``post_worker_init``). The email sender
+    first delivers whatever is already due, including mail queued before a
+    restart, instead of waiting for the next enqueue.
+    """
+    email_outbox.start()
+
+
 # ============== DATABASE INITIALIZATION ==============
 async def initialize_database():
     """Initialize database connections and check data"""
@@ -189,6 +259,11 @@ if __name__ == '__main__':
     print("Starting Digital Forensics Readiness API")
     print("=" * 50)
     
+    if settings.is_development():
+        settings.print_config_summary()
+    for warning in settings.config_warnings():
+        print(f"⚠ Warning: {warning}")
+    
     # Initialize databases
     with app.app_context():
         initialize_postgres()
@@ -197,8 +272,14 @@ if __name__ == '__main__':
     # import asyncio
     # asyncio.run(initialize_database())
     
+    # With the reloader on, this block also runs in the watcher process,
+    # which serves nothing; only the serving child starts workers
+    debug = True
+    if not debug or is_running_from_reloader():
+        start_workers()
+    
     print("=" * 50)
     print("Server starting on http://0.0.0.0:5001")
     print("=" * 50)
     
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    app.run(debug=debug, host='0.0.0.0', port=5001)
\ No newline at end of file
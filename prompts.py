@@ -2,9 +2,32 @@
 from typing import Dict, Any, List
 import json
 
+from shared.structured_output import StructuredOutput, JSONStreamError
+
 class AssessmentPrompts:
     """Collection of prompts for digital forensics readiness assessment"""
     
+    # JSON schema of the evaluation answer (guided decoding + validation)
+    EVALUATION_SCHEMA = {
+        "type": "object",
+        "properties": {
+            "overall_score": {"type": "number"},
+            "readiness_level": {"type": "string"},
+            "summary": {"type": "string"},
+            "strengths": {"type": "array", "items": {"type": "string"}},
+            "weaknesses": {"type": "array", "items": {"type": "string"}},
+            "recommendations": {"type": "array", "items": {"type": "string"}},
+            "next_steps": {"type": "array", "items": {"type": "string"}},
+            "risk_level": {"type": "string"},
+            "detailed_analysis": {"type": "string"}
+        },
+        "required": [
+            "overall_score", "readiness_level", "summary", "strengths", "weaknesses",
+            "recommendations", "next_steps", "risk_level", "detailed_analysis"
+        ],
+        "additionalProperties": False
+    }
+    
     @staticmethod
     def get_evaluation_prompt(user_profile: Dict[str, Any], 
                             selected_package: str,
@@ -438,16 +461,8 @@ Template harus siap pakai dan terlihat profesional.
         Validate and parse evaluation response from LLM
         """
         try:
-            # Remove markdown code blocks if present
-            cleaned = response.strip()
-            if cleaned.startswith('```json'):
-                cleaned = cleaned[7:]
-            if cleaned.endswith('```'):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
-            
-            # Parse JSON
-            evaluation = json.loads(cleaned)
+            # Parse JSON (a surrounding markdown code block is tolerated)
+            evaluation = EVALUATION_OUTPUT.parse(response)
             
             # Validate required fields
             required_fields = [
@@ -460,16 +475,14 @@ Template harus siap pakai dan terlihat profesional.
                     raise ValueError(f"Missing required field: {field}")
             
             # Validate data types
-            if not isinstance(evaluation["strengths"], list):
-                raise ValueError("strengths must be a list")
-            if not isinstance(evaluation["weaknesses"], list):
-                raise ValueError("weaknesses must be a list")
-            if not isinstance(evaluation["recommendations"], list):
-                raise ValueError("recommendations must be a list")
+            properties = AssessmentPrompts.EVALUATION_SCHEMA["properties"]
+            for field, spec in properties.items():
+                if spec["type"] == "array" and field in evaluation and not isinstance(evaluation[field], list):
+                    raise ValueError(f"{field} must be a list")
                 
             return evaluation
             
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
+        except (JSONStreamError, ValueError, KeyError) as e:
             print(f"Validation error: {str(e)}")
             return None
     
@@ -488,4 +501,7 @@ Berikan respons sederhana dalam format JSON:
 }
 
 Berikan HANYA JSON tanpa teks tambahan.
-"""
\ No newline at end of file
+"""
+
+
+EVALUATION_OUTPUT = StructuredOutput("evaluation", AssessmentPrompts.EVALUATION_SCHEMA)
@@ -1,10 +1,41 @@
 from pymongo import MongoClient
 from typing import Optional
 from config.settings import settings
+from shared.metrics import registry, DB_BUCKETS
+from shared.tracing import span
+import functools
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+MONGO_OPERATION_DURATION = registry.histogram(
+    "mongo_operation_duration_seconds",
+    "Duration of collection service methods",
+    ("collection", "method"),
+    buckets=DB_BUCKETS
+)
+
+
+def timed_operation(fn):
+    """Trace a collection service method as a span and record its duration"""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            with span(
+                f"mongo.{self.collection_name}.{fn.__name__}",
+                **{"db.system": "mongodb", "db.collection": self.collection_name, "db.operation": fn.__name__}
+            ):
+                return fn(self, *args, **kwargs)
+        finally:
+            MONGO_OPERATION_DURATION.observe(
+                time.perf_counter() - started,
+                collection=self.collection_name,
+                method=fn.__name__
+            )
+    return wrapper
+
 
 class BaseMongoService:
     """Base class for MongoDB collections"""
@@ -26,6 +57,7 @@ class BaseMongoService:
         
         return f"mongodb://{username}:{password}@{host}:{port}/{database}?authSource=admin", database
     
+    @timed_operation
     def connect(self):
         """Connect to MongoDB"""
         if self._connected:
@@ -2,7 +2,7 @@
 Questions V1 Service - question_before_v1 collection
 """
 from typing import List, Dict
-from ..base import BaseMongoService, logger
+from ..base import BaseMongoService, logger, timed_operation
 
 
 class QuestionsV1Service(BaseMongoService):
@@ -11,6 +11,7 @@ class QuestionsV1Service(BaseMongoService):
     def __init__(self):
         super().__init__("question_before_v1")
     
+    @timed_operation
     def get_by_package(self, package: str, limit: int = 15) -> List[Dict]:
         """
         Get questions filtered by package
@@ -48,6 +49,7 @@ class QuestionsV1Service(BaseMongoService):
             logger.error(f"Error getting v1 questions: {e}")
             return []
     
+    @timed_operation
     def count(self) -> int:
         """Count total questions in collection"""
         try:
@@ -57,6 +59,7 @@ class QuestionsV1Service(BaseMongoService):
             logger.error(f"Error counting v1 questions: {e}")
             return 0
     
+    @timed_operation
     def get_all(self) -> List[Dict]:
         """Get all questions from collection"""
         try:
@@ -81,6 +84,7 @@ class QuestionsV1Service(BaseMongoService):
             logger.error(f"Error getting all v1 questions: {e}")
             return []
     
+    @timed_operation
     def get_packages(self) -> List[str]:
         """Get list of unique packages"""
         try:
@@ -2,9 +2,8 @@
 Questions V2 Service - question_before_v2 collection
 """
 from typing import List, Dict
-import json
 import logging
-from ..base import BaseMongoService, logger
+from ..base import BaseMongoService, logger, timed_operation
 
 
 logger = logging.getLogger("debug_logger")
@@ -15,6 +14,7 @@ class QuestionsV2Service(BaseMongoService):
     def __init__(self):
         super().__init__("question_before_v2")
     
+    @timed_operation
     def get_by_package(self, package: str, limit: int = 15) -> List[Dict]:
         """
         Get questions filtered by package
@@ -54,6 +54,7 @@ class QuestionsV2Service(BaseMongoService):
             logger.error(f"Error getting v2 questions: {e}")
             return []
     
+    @timed_operation
     def get_by_enabler(self, enabler: str, limit: int = 20) -> List[Dict]:
         """
         Get questions filtered by enabler (V2 specific feature)
@@ -88,6 +89,7 @@ class QuestionsV2Service(BaseMongoService):
             logger.error(f"Error getting v2 questions by enabler: {e}")
             return []
     
+    @timed_operation
     def count(self) -> int:
         """Count total questions in collection"""
         try:
@@ -97,6 +99,7 @@ class QuestionsV2Service(BaseMongoService):
             logger.error(f"Error counting v2 questions: {e}")
             return 0
     
+    @timed_operation
     def get_all(self) -> List[Dict]:
         """Get all questions from collection"""
         try:
@@ -106,8 +109,6 @@ class QuestionsV2Service(BaseMongoService):
             questions = []
             
             for doc in cursor:
-                logger.debug(f"Question Document: {json.dumps(doc, default=str)}")
-
                 questions.append({
                     "id": str(doc.get("_id", "")),
                     "question": doc.get("question", ""),
@@ -117,12 +118,14 @@ class QuestionsV2Service(BaseMongoService):
                     "contribution_max": doc.get("contribution_max", 0)
                 })
             
+            logger.debug("Retrieved %d v2 questions", len(questions))
             return questions
             
         except Exception as e:
             logger.error(f"Error getting all v2 questions: {e}")
             return []
     
+    @timed_operation
     def get_enablers(self) -> List[str]:
         """Get list of unique enablers (V2 specific)"""
         try:
@@ -133,6 +136,7 @@ class QuestionsV2Service(BaseMongoService):
             logger.error(f"Error getting enablers: {e}")
             return []
     
+    @timed_operation
     def get_packages(self) -> List[str]:
         """Get list of unique packages"""
         try:
@@ -143,6 +147,7 @@ class QuestionsV2Service(BaseMongoService):
             logger.error(f"Error getting v2 packages: {e}")
             return []
     
+    @timed_operation
     def get_questions_per_enabler(self) -> List[Dict]:
         """
         Get 3 questions per enabler for quick test (V2 specific)
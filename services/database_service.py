@@ -1,12 +1,15 @@
 # services/database_service.py
-from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from bson import ObjectId
 import logging
 import asyncio
 from config.settings import settings
 
+if TYPE_CHECKING:
+    # Motor is imported when the async client connects, not at app import
+    from motor.motor_asyncio import AsyncIOMotorClient
+
 logger = logging.getLogger(__name__)
 
 class DataBaseServiceVersion1:
@@ -14,7 +17,7 @@ class DataBaseServiceVersion1:
     
     def __init__(self):
         # Async client (Motor)
-        self.async_client: Optional[AsyncIOMotorClient] = None
+        self.async_client: Optional["AsyncIOMotorClient"] = None
         self.async_db = None
         
         # Sync client (PyMongo)
@@ -183,6 +186,7 @@ class DataBaseServiceVersion1:
         try:
             connection_string, database = self._get_connection_string()
             
+            from motor.motor_asyncio import AsyncIOMotorClient
             self.async_client = AsyncIOMotorClient(connection_string)
             await self.async_client.admin.command('ping')
             
@@ -258,7 +262,7 @@ class DataBaseServiceVersion2:
     
     def __init__(self):
         # Async client (Motor)
-        self.async_client: Optional[AsyncIOMotorClient] = None
+        self.async_client: Optional["AsyncIOMotorClient"] = None
         self.async_db = None
         
         # Sync client (PyMongo)
@@ -461,6 +465,7 @@ class DataBaseServiceVersion2:
         try:
             connection_string, database = self._get_connection_string()
             
+            from motor.motor_asyncio import AsyncIOMotorClient
             self.async_client = AsyncIOMotorClient(connection_string)
             await self.async_client.admin.command('ping')
             
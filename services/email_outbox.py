@@ -0,0 +1,665 @@
+# services/email_outbox.py
+"""
+Durable outbox for outgoing email
+
+Request handlers only ``enqueue`` a rendered message: it is written to a
+SQLite outbox and the request returns without a round trip to the mail
+provider. A background sender thread delivers due messages in batches,
+retries failures with exponential backoff and gives up after
+``MAIL_MAX_ATTEMPTS`` (status ``dead``).
+
+Delivery is idempotent end to end:
+- every message has an idempotency key (duplicate enqueues are ignored)
+- a claimed batch keeps its composition until it is delivered, so a retry
+  re-sends the same batch under the same idempotency key and the provider
+  drops the duplicate if the first attempt actually went through
+- each claimed batch records its owner process and claim time; a batch left
+  in ``sending`` by a crashed process is retried the same way once its claim
+  is older than ``MAIL_CLAIM_LEASE_SECONDS``, while batches other processes
+  are still sending are left alone
+
+Each process opens its own SQLite connection on first use, so the module
+can be imported in a pre-fork master (see ``preload`` in main.py).
+
+Transports: ``resend`` (production) and ``smtp``, which also works against
+a local fake mail sink such as
+``python -m aiosmtpd -n -l localhost:1025`` or MailHog.
+"""
+import hashlib
+import logging
+import os
+import random
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple, Union
+
+from config import settings
+from shared.latency import LatencyHistogram
+from shared.tracing import span, set_attributes
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_DEAD = "dead"
+
+# Provider status codes that will not succeed on retry
+PERMANENT_ERROR_CODES = {400, 401, 403, 422}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    html TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    batch_key TEXT,
+    provider_id TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_batch ON outbox (batch_key);
+"""
+
+# Columns added after the first release, for outboxes created before them
+_MIGRATIONS = (("claimed_by", "TEXT"), ("claimed_at", "REAL"))
+
+
+# Guards opening a store's per-process connection; replaced in a forked
+# child in case another thread held it at the moment of the fork
+_open_lock = threading.Lock()
+
+
+def _reset_open_lock() -> None:
+    global _open_lock
+    _open_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_open_lock)
+
+
+def claim_owner() -> str:
+    """Identifies the process holding a claim (read at claim time: forks change it)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class OutboxMessage:
+    """A queued email"""
+
+    id: int
+    idempotency_key: str
+    sender: str
+    recipient: str
+    subject: str
+    html: str
+    attempts: int
+    created_at: float
+    batch_key: Optional[str] = None
+
+
+class DeliveryError(Exception):
+    """A transport failed to deliver a batch (raised) or one of its messages (returned)"""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+# ---- storage ----
+
+class OutboxStore:
+    """SQLite-backed message store (WAL mode, safe across threads and processes)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # (pid, connection, lock) of the process that opened them; opened on
+        # first use, so importing the app in a pre-fork master opens nothing
+        self._state: Optional[Tuple[int, sqlite3.Connection, threading.Lock]] = None
+        # A connection inherited across fork() must be neither used nor
+        # closed in the child (closing it can drop the parent's file locks)
+        self._inherited: List[sqlite3.Connection] = []
+
+    def _connection(self) -> Tuple[sqlite3.Connection, threading.Lock]:
+        """This process's connection and the lock serializing its use"""
+        state = self._state
+        if state is None or state[0] != os.getpid():
+            with _open_lock:
+                state = self._state
+                if state is None or state[0] != os.getpid():
+                    if state is not None:
+                        self._inherited.append(state[1])
+                    state = self._state = (os.getpid(), self._connect(), threading.Lock())
+        return state[1], state[2]
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self._migrate(conn)
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}
+        for name, kind in _MIGRATIONS:
+            if name not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE outbox ADD COLUMN {name} {kind}")
+                except sqlite3.OperationalError:
+                    # Another process added it first
+                    pass
+
+    def add(self, key: str, sender: str, recipient: str, subject: str, html: str) -> bool:
+        """Insert a message; returns False if the idempotency key already exists"""
+        now = time.time()
+        conn, lock = self._connection()
+        with lock:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO outbox "
+                "(idempotency_key, sender, recipient, subject, html, status, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, sender, recipient, subject, html, STATUS_PENDING, now, now)
+            )
+            return cursor.rowcount == 1
+
+    def add_many(self, sender: str, messages: List[tuple]) -> int:
+        """Insert (key, recipient, subject, html) rows in one transaction; returns the number inserted"""
+        now = time.time()
+        conn, lock = self._connection()
+        with lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                inserted = 0
+                for key, recipient, subject, html in messages:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO outbox "
+                        "(idempotency_key, sender, recipient, subject, html, status, next_attempt_at, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, sender, recipient, subject, html, STATUS_PENDING, now, now)
+                    )
+                    inserted += cursor.rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return inserted
+
+    def claim_batch(self, limit: int, now: float) -> List[OutboxMessage]:
+        """
+        Mark the next due batch as sending and return it
+
+        An earlier batch that failed is retried as a whole before new
+        messages are batched, so its idempotency key stays valid.
+        """
+        conn, lock = self._connection()
+        with lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT batch_key FROM outbox WHERE status = ? AND batch_key IS NOT NULL "
+                    "AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT 1",
+                    (STATUS_PENDING, now)
+                ).fetchone()
+                if row is not None:
+                    rows = conn.execute(
+                        "SELECT * FROM outbox WHERE batch_key = ? AND status = ? ORDER BY id",
+                        (row["batch_key"], STATUS_PENDING)
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT * FROM outbox WHERE status = ? AND batch_key IS NULL "
+                        "AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                        (STATUS_PENDING, now, limit)
+                    ).fetchall()
+                if not rows:
+                    conn.execute("COMMIT")
+                    return []
+
+                ids = [r["id"] for r in rows]
+                batch_key = row["batch_key"] if row is not None else batch_key_for(r["idempotency_key"] for r in rows)
+                owner = claim_owner()
+                conn.executemany(
+                    "UPDATE outbox SET status = ?, batch_key = ?, claimed_by = ?, claimed_at = ? WHERE id = ?",
+                    [(STATUS_SENDING, batch_key, owner, now, i) for i in ids]
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return [
+            OutboxMessage(
+                id=r["id"], idempotency_key=r["idempotency_key"], sender=r["sender"],
+                recipient=r["recipient"], subject=r["subject"], html=r["html"],
+                attempts=r["attempts"], created_at=r["created_at"], batch_key=batch_key
+            )
+            for r in rows
+        ]
+
+    def mark_sent(self, messages: List[OutboxMessage], provider_ids: List[Optional[str]]) -> None:
+        now = time.time()
+        provider_ids = list(provider_ids) + [None] * (len(messages) - len(provider_ids))
+        conn, lock = self._connection()
+        with lock:
+            conn.executemany(
+                "UPDATE outbox SET status = ?, provider_id = ?, sent_at = ?, attempts = attempts + 1, "
+                "last_error = NULL WHERE id = ?",
+                [(STATUS_SENT, pid, now, m.id) for m, pid in zip(messages, provider_ids)]
+            )
+
+    def mark_failed(
+        self,
+        messages: List[OutboxMessage],
+        error: str,
+        next_attempt_at: float,
+        dead: bool,
+        rebatch: bool = False
+    ) -> None:
+        """
+        Record a failed attempt
+
+        ``rebatch`` drops the batch key: the messages failed on their own
+        (the rest of their batch went out), so they are retried in a new
+        batch instead of re-sending the old one under its idempotency key.
+        """
+        batch_key = ", batch_key = NULL" if rebatch else ""
+        conn, lock = self._connection()
+        with lock:
+            conn.executemany(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = ?"
+                f"{batch_key} WHERE id = ?",
+                [(STATUS_DEAD if dead else STATUS_PENDING, error[:500], next_attempt_at, m.id) for m in messages]
+            )
+
+    def recover(self, lease_seconds: float) -> int:
+        """
+        Return batches abandoned mid-send to pending (they keep their batch key)
+
+        Only claims older than ``lease_seconds`` are taken back: a younger
+        one may belong to another process that is sending it right now.
+        """
+        conn, lock = self._connection()
+        with lock:
+            cursor = conn.execute(
+                "UPDATE outbox SET status = ? WHERE status = ? AND COALESCE(claimed_at, 0) < ?",
+                (STATUS_PENDING, STATUS_SENDING, time.time() - lease_seconds)
+            )
+            return cursor.rowcount
+
+    def next_due(self) -> Optional[float]:
+        conn, lock = self._connection()
+        with lock:
+            row = conn.execute(
+                "SELECT MIN(next_attempt_at) AS due FROM outbox WHERE status = ?", (STATUS_PENDING,)
+            ).fetchone()
+        return row["due"]
+
+    def counts(self) -> Dict[str, int]:
+        conn, lock = self._connection()
+        with lock:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+
+def batch_key_for(idempotency_keys) -> str:
+    return hashlib.sha256("\n".join(sorted(idempotency_keys)).encode("utf-8")).hexdigest()
+
+
+# ---- transports ----
+
+# ``send`` returns one entry per message: the provider's message id (or None),
+# or a DeliveryError for a message that failed while the others went out. It
+# raises DeliveryError when the batch as a whole was not delivered.
+SendResult = Union[Optional[str], DeliveryError]
+
+class ResendTransport:
+    """Resend API: single messages via Emails.send, batches via Batch.send"""
+
+    name = "resend"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._resend = None
+
+    def _client(self):
+        # Imported on first send, not when the outbox is built at app import
+        if self._resend is None:
+            import resend
+            resend.api_key = self.api_key
+            self._resend = resend
+        return self._resend
+
+    def send(self, messages: List[OutboxMessage]) -> List[SendResult]:
+        client = self._client()
+        params = [
+            {"from": m.sender, "to": [m.recipient], "subject": m.subject, "html": m.html}
+            for m in messages
+        ]
+        try:
+            if len(messages) == 1:
+                email = client.Emails.send(params[0], {"idempotency_key": messages[0].idempotency_key})
+                return [email.get("id")]
+            response = client.Batch.send(params, {"idempotency_key": messages[0].batch_key})
+            return [item.get("id") for item in response.get("data", [])] or [None] * len(messages)
+        except Exception as e:
+            code = getattr(e, "code", None)
+            permanent = isinstance(code, int) and code in PERMANENT_ERROR_CODES
+            raise DeliveryError(f"Resend: {e}", permanent=permanent) from e
+
+
+class SMTPTransport:
+    """Plain SMTP, one connection per batch (fake mail sinks, MailHog, relays)"""
+
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def send(self, messages: List[OutboxMessage]) -> List[SendResult]:
+        results: List[SendResult] = []
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                for m in messages:
+                    email = EmailMessage()
+                    email["From"] = m.sender
+                    email["To"] = m.recipient
+                    email["Subject"] = m.subject
+                    email["Message-ID"] = f"<{m.idempotency_key}@outbox>"
+                    email["X-Idempotency-Key"] = m.idempotency_key
+                    email.set_content("This message requires an HTML capable mail client.")
+                    email.add_alternative(m.html, subtype="html")
+                    try:
+                        smtp.send_message(email)
+                    except smtplib.SMTPRecipientsRefused as e:
+                        # Only this recipient is rejected; the session stays usable
+                        results.append(DeliveryError(f"SMTP: {e}", permanent=True))
+                        continue
+                    results.append(email["Message-ID"])
+        except (smtplib.SMTPException, OSError) as e:
+            if not results:
+                raise DeliveryError(f"SMTP: {e}") from e
+            # Messages already handed over stay sent; the rest is retried
+            results += [DeliveryError(f"SMTP: {e}")] * (len(messages) - len(results))
+        return results
+
+
+def transport_from_settings():
+    if settings.MAIL_TRANSPORT == "smtp":
+        return SMTPTransport(settings.MAIL_SMTP_HOST, settings.MAIL_SMTP_PORT)
+    return ResendTransport(settings.MAIL_RESEND_API_KEY)
+
+
+# ---- sender ----
+
+class EmailOutbox:
+    """Queue emails durably and deliver them from a background thread"""
+
+    def __init__(
+        self,
+        store: OutboxStore,
+        transport,
+        sender: str,
+        batch_size: int = 50,
+        max_attempts: int = 6,
+        base_backoff: float = 5.0,
+        max_backoff: float = 900.0,
+        poll_interval: float = 30.0,
+        claim_lease: float = 900.0
+    ):
+        self.store = store
+        self.transport = transport
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        # Longer than any send may take: a claim this old was abandoned
+        self.claim_lease = claim_lease
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # Metrics
+        self.delivery_latency = LatencyHistogram(buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0, 300.0, 900.0))
+        self.send_time = LatencyHistogram()
+        self.enqueued = 0
+        self.duplicates = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.dead = 0
+        self.batches = 0
+
+    def enqueue(self, to: str, subject: str, html: str, idempotency_key: Optional[str] = None) -> str:
+        """
+        Queue an email for delivery
+
+        Args:
+            to: Recipient address
+            subject: Subject line
+            html: Rendered HTML body
+            idempotency_key: Stable key for this logical email (e.g. per
+                session and template); enqueuing the same key again is a
+                no-op. A random key is used when omitted.
+
+        Returns:
+            The idempotency key
+        """
+        key = idempotency_key or uuid.uuid4().hex
+        with span("email.enqueue", **{"email.idempotency_key": key}):
+            added = self.store.add(key, self.sender, to, subject, html)
+        if added:
+            self.enqueued += 1
+            logger.info(f"Email to {to} queued ({key})")
+        else:
+            self.duplicates += 1
+            logger.info(f"Email {key} already queued, ignoring duplicate")
+        self.start()
+        self._wake.set()
+        return key
+
+    def enqueue_many(self, messages: List[tuple]) -> List[str]:
+        """
+        Queue many emails in one store transaction
+
+        Args:
+            messages: (to, subject, html) or (to, subject, html, idempotency_key)
+                tuples; email_template.generate_email_templates renders only
+                the html bodies, so zip them with the addresses and subjects
+
+        Returns:
+            The idempotency keys, in input order
+        """
+        rows = []
+        for message in messages:
+            to, subject, html = message[:3]
+            key = (message[3] if len(message) > 3 else None) or uuid.uuid4().hex
+            rows.append((key, to, subject, html))
+        with span("email.enqueue_many", **{"email.count": len(rows)}):
+            inserted = self.store.add_many(self.sender, rows)
+        self.enqueued += inserted
+        self.duplicates += len(rows) - inserted
+        logger.info(f"{inserted} emails queued, {len(rows) - inserted} duplicates ignored")
+        self.start()
+        self._wake.set()
+        return [key for key, _, _, _ in rows]
+
+    def start(self) -> None:
+        """
+        Start this process's sender thread (idempotent)
+
+        The thread first sends everything already due, so calling this at
+        startup (main.start_workers) drains mail left over from a restart.
+        A forked child has no sender until it calls this itself.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._recover()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Deliver everything that is due now; returns False on timeout (tests, shutdown)"""
+        self.start()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            due = self.store.next_due()
+            if self.store.counts().get(STATUS_SENDING, 0) == 0 and (due is None or due > time.time()):
+                return True
+            self._wake.set()
+            time.sleep(0.05)
+        return False
+
+    def deliver_once(self) -> int:
+        """Send one due batch; returns the number of messages handled"""
+        batch = self.store.claim_batch(self.batch_size, time.time())
+        if not batch:
+            return 0
+
+        self.batches += 1
+        start = time.perf_counter()
+        with span("email.send", **{
+            "email.transport": self.transport.name,
+            "email.batch_size": len(batch),
+            "email.attempt": batch[0].attempts + 1
+        }):
+            try:
+                results = self.transport.send(batch)
+            except DeliveryError as e:
+                set_attributes(**{"email.error": str(e), "email.permanent": e.permanent})
+                if not (e.permanent and len(batch) > 1):
+                    self._fail(batch, str(e), e.permanent)
+                    return len(batch)
+                # The provider rejected the whole batch (e.g. one invalid
+                # address fails a Resend batch): send each message on its
+                # own so only the bad ones are dead-lettered
+                logger.warning(f"Batch of {len(batch)} emails rejected, sending them one by one: {e}")
+                results = [self._send_one(message) for message in batch]
+            except Exception as e:
+                set_attributes(**{"email.error": f"{type(e).__name__}: {e}"})
+                self._fail(batch, f"{type(e).__name__}: {e}", False)
+                return len(batch)
+            finally:
+                self.send_time.observe(time.perf_counter() - start)
+
+        results = list(results) + [None] * (len(batch) - len(results))
+        sent = [(m, r) for m, r in zip(batch, results) if not isinstance(r, DeliveryError)]
+        if sent:
+            self.store.mark_sent([m for m, _ in sent], [r for _, r in sent])
+            now = time.time()
+            for message, _ in sent:
+                self.delivery_latency.observe(now - message.created_at)
+            self.sent += len(sent)
+            logger.info(f"Delivered {len(sent)} emails via {self.transport.name}")
+        for message, error in zip(batch, results):
+            if isinstance(error, DeliveryError):
+                self._fail([message], str(error), error.permanent, rebatch=True)
+        return len(batch)
+
+    def _send_one(self, message: OutboxMessage) -> SendResult:
+        try:
+            return self.transport.send([message])[0]
+        except DeliveryError as e:
+            return e
+        except Exception as e:
+            return DeliveryError(f"{type(e).__name__}: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "transport": self.transport.name,
+            "queue": self.store.counts(),
+            "enqueued": self.enqueued,
+            "duplicates": self.duplicates,
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "dead": self.dead,
+            "batches": self.batches,
+            "delivery_latency": self.delivery_latency.snapshot(),
+            "send_time": self.send_time.snapshot(),
+        }
+
+    def _fail(self, batch: List[OutboxMessage], error: str, permanent: bool, rebatch: bool = False) -> None:
+        attempts = batch[0].attempts + 1
+        dead = permanent or attempts >= self.max_attempts
+        # Full jitter keeps many failed batches from retrying in lockstep
+        delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1)))
+        self.store.mark_failed(batch, error, time.time() + delay, dead, rebatch)
+        self.failed_attempts += 1
+        if dead:
+            self.dead += len(batch)
+            logger.error(f"Giving up on {len(batch)} emails after {attempts} attempts: {error}")
+        else:
+            logger.warning(f"Email batch failed (attempt {attempts}), retrying in {delay:.1f}s: {error}")
+
+    def _recover(self) -> None:
+        recovered = self.store.recover(self.claim_lease)
+        if recovered:
+            logger.warning(f"Retrying {recovered} emails whose sender stopped mid-send")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.deliver_once():
+                    continue
+                # Also picks up batches of a process that died while running
+                self._recover()
+                due = self.store.next_due()
+            except Exception as e:
+                logger.error(f"Email outbox error: {e}", exc_info=True)
+                due = None
+            timeout = self.poll_interval if due is None else max(0.0, min(self.poll_interval, due - time.time()))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+
+def outbox_path() -> str:
+    """Configured outbox path; relative paths are resolved from the project root"""
+    path = settings.MAIL_OUTBOX_PATH
+    if path == ":memory:" or os.path.isabs(path):
+        return path
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    return os.path.join(project_root, path)
+
+
+email_outbox = EmailOutbox(
+    store=OutboxStore(outbox_path()),
+    transport=transport_from_settings(),
+    sender=settings.MAIL_FROM,
+    batch_size=settings.MAIL_BATCH_SIZE,
+    max_attempts=settings.MAIL_MAX_ATTEMPTS,
+    claim_lease=settings.MAIL_CLAIM_LEASE_SECONDS
+)
@@ -1,22 +1,64 @@
 # services/llm_service.py
 import httpx
 import json
-from typing import Dict, Any, Optional, List
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from config.settings import settings
+from shared.singleflight import SingleFlight, canonical_key
+from shared.circuit_breaker import CircuitBreaker, OPEN as CIRCUIT_OPEN
+from shared.latency import LatencyHistogram
+from shared.admission import AdmissionController, AdmissionRejected, PRIORITY_INTERACTIVE
+from shared.structured_output import StructuredOutput, IncrementalJSONParser, JSONTruncatedError
+from shared.metrics import registry, register_cache
+from shared.token_budget import count_tokens, count_message_tokens
+from shared.tracing import span, set_attributes, traced
+from shared.logging_config import sampled
 import logging
 
-from google import genai
-from google.genai import types
-from openai import OpenAI
+# google.genai and openai are imported on first fallback use: together they
+# take longer to import than the rest of the app and most requests never
+# reach a fallback backend
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+LLM_REQUEST_DURATION = registry.histogram(
+    "llm_request_duration_seconds",
+    "LLM call duration per backend and outcome (success, error, error_response)",
+    ("backend", "outcome")
+)
+LLM_ERRORS = registry.counter(
+    "llm_errors_total",
+    "Failed or skipped LLM attempts per backend and reason",
+    ("backend", "reason")
+)
+# Estimated with shared.token_budget (tiktoken when installed)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total",
+    "Estimated prompt and completion tokens of successful LLM calls per backend",
+    ("backend", "kind")
+)
+
+# Returned by call_llm when no backend produced an answer
+UNAVAILABLE_MESSAGE = "Maaf, sistem AI sedang tidak tersedia. Silakan coba lagi nanti."
+NOT_CONFIGURED_MESSAGE = "Error: Primary LLM tidak dikonfigurasi dengan benar. Periksa LLM_URL, LLM_TOKEN, dan LLM_MODEL."
+
+
+def is_unavailable(answer: str) -> bool:
+    """call_llm returned its failure text instead of a model answer"""
+    return answer.strip() in (UNAVAILABLE_MESSAGE, NOT_CONFIGURED_MESSAGE)
+
 
 class LLMService:
     def __init__(self):
-        self.url = "https://llm.rokade.id/v1/chat/completions"
-        self.token = "8q27r8ADo8yaqaINYaty4w8tyai"
-        self.model = "Qwen/Qwen2.5-7B-Instruct-AWQ"
+        # LLM_OVERRIDE_* replace the hosted model only when set, e.g. to point
+        # at benchmarks/mock_llm_server.py for load tests
+        self.url = settings.LLM_OVERRIDE_URL or "https://llm.rokade.id/v1/chat/completions"
+        self.token = settings.LLM_OVERRIDE_TOKEN or "8q27r8ADo8yaqaINYaty4w8tyai"
+        self.model = settings.LLM_OVERRIDE_MODEL or "Qwen/Qwen2.5-7B-Instruct-AWQ"
         logger.info(f"LLMService initialized with URL: {self.url}, Model: {self.model}")
         
         self.token_fallback_gemini = settings.FALLBACK_LLM_KEY_GEMINI
@@ -38,65 +80,351 @@ class LLMService:
         if not self.model:
             logger.error("LLM_MODEL is not set!")
         
-    async def call_llm(self, messages: list, max_tokens: int = 2000, temperature: float = 0.7) -> str:
+        # Identical concurrent requests share one upstream call
+        self.single_flight = SingleFlight() if settings.LLM_SINGLE_FLIGHT else None
+        if self.single_flight is not None:
+            # A follower is served by another caller's in-flight request
+            register_cache("llm_single_flight", lambda: (self.single_flight.followers, self.single_flight.leaders))
+        
+        # One circuit breaker per backend so a dead backend is skipped at once
+        self.breakers = {
+            name: CircuitBreaker(name, **settings.get_circuit_breaker_config())
+            for name in ("primary", "gemini", "openai")
+        }
+        
+        # Bounded concurrency + priority queue per backend
+        self.limiters = {
+            name: AdmissionController(
+                name,
+                max_concurrent=(
+                    settings.LLM_MAX_CONCURRENT_PRIMARY if name == "primary"
+                    else settings.LLM_MAX_CONCURRENT_FALLBACK
+                ),
+                queue_deadline=settings.LLM_QUEUE_DEADLINE,
+                max_queue_size=settings.LLM_MAX_QUEUE_SIZE
+            )
+            for name in self.breakers
+        }
+        
+        # Latency of successful calls per backend (drives the hedge budget)
+        self.latency = {name: LatencyHistogram() for name in self.breakers}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        
+        # Fallback SDK clients are synchronous and thread-safe: build them once
+        # and run their calls on a dedicated pool so they never block the
+        # event loop. (Async SDK clients would be bound to one event loop,
+        # while requests here run on several.)
+        self.fallback_timeout = float(settings.get_llm_config()["timeout"])
+        self._gemini_client = None
+        self._openai_client = None
+        self._client_lock = threading.Lock()
+        self._fallback_executor = ThreadPoolExecutor(
+            max_workers=settings.LLM_FALLBACK_WORKERS,
+            thread_name_prefix="llm-fallback"
+        )
+        
+    @traced("llm.call")
+    async def call_llm(
+        self,
+        messages: list,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        hedge: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+        response_schema: Optional[StructuredOutput] = None,
+        check_error: bool = True
+    ) -> str:
+        """
+        Call the LLM cascade, coalescing identical in-flight requests
+        
+        Concurrent callers with the same messages, max_tokens, temperature,
+        response_schema and check_error await a single upstream call and
+        share its result.
+        
+        Args:
+            messages: Chat messages
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            hedge: If the primary is slower than its recent p90, also send the
+                request to the first healthy fallback and take whichever
+                answers first (for latency-critical endpoints)
+            priority: Queue priority when a backend is at its concurrency
+                limit (PRIORITY_INTERACTIVE before PRIORITY_BATCH)
+            response_schema: Constrain the answer to this JSON schema on
+                backends with guided decoding; answers that are not valid
+                JSON count as a failure and move on to the next backend
+            check_error: Reject short or error-looking answers and fall back;
+                disable for answers that may legitimately be short (e.g. the
+                tail of a truncated JSON answer)
+                
+        Raises:
+            AdmissionRejected: Every usable backend is saturated; callers
+                should answer 429 with ``retry_after`` as Retry-After
+        """
+        if not settings.LLM_STRUCTURED_OUTPUT:
+            response_schema = None
+        
+        if self.single_flight is None:
+            return await self._call_llm_cascade(
+                messages, max_tokens, temperature, hedge, priority, response_schema, check_error
+            )
+        
+        # check_error changes which answers are accepted, so it is part of the key
+        key = canonical_key(
+            self.model, messages, max_tokens, temperature,
+            response_schema.schema if response_schema else None, check_error
+        )
+        return await self.single_flight.do(
+            key,
+            lambda: self._call_llm_cascade(
+                messages, max_tokens, temperature, hedge, priority, response_schema, check_error
+            )
+        )
+    
+    async def _call_llm_cascade(
+        self,
+        messages: list,
+        max_tokens: int,
+        temperature: float,
+        hedge: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+        response_schema: Optional[StructuredOutput] = None,
+        check_error: bool = True
+    ) -> str:
         """
         Try LLMs in cascade:
         1. Primary LLM (required)
         2. Gemini fallback (optional)
         3. OpenAI fallback (optional)
+        
+        Backends whose circuit breaker is open are skipped immediately
+        instead of waiting for another timeout.
         """
         
-        # === TRY PRIMARY LLM ===
-        if self.url:
-            try:
-                result = await self._call_primary_llm(messages, max_tokens, temperature)
-                
-                # Check if result looks like an error
-                if not self._is_error_response(result):
-                    logger.info("Primary LLM succeeded")
-                    return result
-                
-                logger.warning("Primary LLM returned error response, trying fallback")
-                
-            except Exception as e:
-                logger.error(f"Primary LLM failed with exception: {e}")
-        else:
+        if not self.url:
             logger.error("Primary LLM not configured")
-            return "Error: Primary LLM tidak dikonfigurasi dengan benar. Periksa LLM_URL, LLM_TOKEN, dan LLM_MODEL."
+            return NOT_CONFIGURED_MESSAGE
         
-        # === TRY GEMINI FALLBACK (only if configured) ===
-        if self.token_fallback_gemini and len(self.token_fallback_gemini) > 20:
-            try:
-                result = await self._call_gemini_fallback(messages)
-                
-                if not self._is_error_response(result):
-                    logger.info("Gemini fallback succeeded")
+        attempts = self._backend_attempts(messages, max_tokens, temperature, response_schema, check_error)
+        rejections: List[AdmissionRejected] = []
+        opts = {"priority": priority, "rejections": rejections, "messages": messages}
+        
+        if hedge:
+            backup = next(
+                (a for a in attempts[1:] if self.breakers[a[0]].state != CIRCUIT_OPEN),
+                None
+            )
+            if backup is not None:
+                result, backup_used = await self._call_hedged(attempts[0], backup, **opts)
+                if result is not None:
                     return result
-                
-                logger.warning("Gemini returned error response")
-                
-            except Exception as e:
-                logger.error(f"Gemini fallback failed: {e}")
+                attempts = [a for a in attempts[1:] if not (backup_used and a is backup)]
+        
+        for name, call, check_error in attempts:
+            result = await self._try_backend(name, call, check_error, **opts)
+            if result is not None:
+                return result
+        
+        # Overloaded rather than broken: tell the client when to come back
+        if rejections:
+            raise AdmissionRejected(
+                "llm",
+                min(r.retry_after for r in rejections),
+                "all LLM backends are at capacity"
+            )
+        
+        # All failed
+        return UNAVAILABLE_MESSAGE
+    
+    def _backend_attempts(
+        self,
+        messages: list,
+        max_tokens: int,
+        temperature: float,
+        response_schema: Optional[StructuredOutput] = None,
+        check_error: bool = True
+    ) -> List[tuple]:
+        """Configured backends in cascade order as (name, call, check_error)"""
+        check_length = check_error
+        # Structured answers are validated by parsing them; the keyword check
+        # would reject valid JSON that mentions e.g. "error" or "timeout"
+        check_error = check_error and response_schema is None
+        
+        # === PRIMARY LLM ===
+        attempts = [
+            (
+                "primary",
+                lambda: self._call_primary_llm(messages, max_tokens, temperature, response_schema, check_length),
+                check_error
+            )
+        ]
+        
+        # === GEMINI FALLBACK (only if configured) ===
+        if self.token_fallback_gemini and len(self.token_fallback_gemini) > 20:
+            attempts.append(("gemini", lambda: self._call_gemini_fallback(messages, response_schema), check_error))
         else:
-            logger.info("Gemini fallback not configured, skipping")
+            logger.info("Gemini fallback not configured, skipping", extra=sampled(0.01))
         
-        # === TRY OPENAI FALLBACK (only if configured) ===
+        # === OPENAI FALLBACK (only if configured) ===
         if self.token_fallback_openai and len(self.token_fallback_openai) > 20:
-            try:
-                result = await self._call_openai_fallback(messages)
-                logger.info("OpenAI fallback succeeded")
-                return result
-                
-            except Exception as e:
-                logger.error(f"OpenAI fallback failed: {e}")
+            attempts.append(("openai", lambda: self._call_openai_fallback(messages, max_tokens, response_schema), False))
         else:
-            logger.info("OpenAI fallback not configured, skipping")
+            logger.info("OpenAI fallback not configured, skipping", extra=sampled(0.01))
         
-        # All failed
-        return "Maaf, sistem AI sedang tidak tersedia. Silakan coba lagi nanti."
+        return attempts
+    
+    async def _call_hedged(self, primary: tuple, backup: tuple, **opts) -> Tuple[Optional[str], bool]:
+        """
+        Race the primary against a delayed backup request
+        
+        The backup is only fired once the primary exceeds the hedge budget
+        (its recent p90 latency); the slower request is cancelled. A losing
+        Gemini/OpenAI call already running on the fallback executor finishes
+        in the background and holds its admission slot until it returns
+        (see ``_run_in_fallback_executor``).
+        
+        Returns:
+            Tuple of (response text or None, whether the backup was fired)
+        """
+        budget = self.get_hedge_budget()
+        primary_task = asyncio.ensure_future(self._try_backend(*primary, **opts))
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=budget)
+            if done:
+                return primary_task.result(), False
+            
+            logger.info(f"Primary LLM exceeded hedge budget of {budget:.1f}s, hedging to {backup[0]}")
+            self.hedges_fired += 1
+            backup_task = asyncio.ensure_future(self._try_backend(*backup, **opts))
+            tasks.append(backup_task)
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        if task is backup_task:
+                            self.hedges_won += 1
+                        return result, True
+            return None, True
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def get_hedge_budget(self) -> float:
+        """Delay before hedging: recent primary p90, or the configured default"""
+        budget = self.latency["primary"].quantile(
+            settings.LLM_HEDGE_QUANTILE,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES
+        )
+        return budget if budget is not None else settings.LLM_HEDGE_DEFAULT_DELAY
+    
+    async def _try_backend(
+        self,
+        name: str,
+        call: Callable[[], Awaitable[str]],
+        check_error: bool = True,
+        priority: int = PRIORITY_INTERACTIVE,
+        rejections: Optional[List[AdmissionRejected]] = None,
+        messages: Optional[list] = None
+    ) -> Optional[str]:
+        """
+        Call one backend through its admission queue and circuit breaker
+        
+        Args:
+            name: Backend name ("primary", "gemini", "openai")
+            call: Zero-argument coroutine factory performing the request
+            check_error: Treat error-looking text as a failure
+            priority: Admission queue priority
+            rejections: Collects AdmissionRejected errors for the caller
+            messages: Prompt, for the token metrics
+            
+        Returns:
+            Response text, or None if the backend was skipped or failed
+        """
+        with span(f"llm.attempt.{name}", **{"llm.backend": name}):
+            breaker = self.breakers[name]
+            if breaker.state == CIRCUIT_OPEN:
+                logger.warning(f"{name} LLM circuit is open, skipping")
+                LLM_ERRORS.inc(backend=name, reason="circuit_open")
+                set_attributes(**{"llm.outcome": "circuit_open"})
+                return None
+            
+            limiter = self.limiters[name]
+            try:
+                admitted_at = await limiter.acquire(priority)
+            except AdmissionRejected as e:
+                logger.warning(f"{name} LLM rejected by admission control: {e.reason}")
+                LLM_ERRORS.inc(backend=name, reason="rejected")
+                set_attributes(**{"llm.outcome": "rejected"})
+                if rejections is not None:
+                    rejections.append(e)
+                return None
+            
+            try:
+                if not breaker.allow_request():
+                    logger.warning(f"{name} LLM circuit is {breaker.state}, skipping")
+                    LLM_ERRORS.inc(backend=name, reason="circuit_open")
+                    set_attributes(**{"llm.outcome": "circuit_open"})
+                    return None
+            
+                started = time.monotonic()
+                try:
+                    result = await call()
+                except asyncio.CancelledError:
+                    breaker.release()
+                    raise
+                except Exception as e:
+                    latency = time.monotonic() - started
+                    breaker.record_failure(latency)
+                    LLM_REQUEST_DURATION.observe(latency, backend=name, outcome="error")
+                    LLM_ERRORS.inc(backend=name, reason="exception")
+                    set_attributes(**{"llm.outcome": "exception", "llm.error": str(e)})
+                    logger.error(f"{name} LLM failed with exception: {e}")
+                    return None
+            
+                latency = time.monotonic() - started
+                if check_error and self._is_error_response(result):
+                    breaker.record_failure(latency)
+                    LLM_REQUEST_DURATION.observe(latency, backend=name, outcome="error_response")
+                    LLM_ERRORS.inc(backend=name, reason="error_response")
+                    set_attributes(**{"llm.outcome": "error_response"})
+                    logger.warning(f"{name} LLM returned error response, trying fallback")
+                    return None
+            
+                breaker.record_success(latency)
+                self.latency[name].observe(latency)
+                LLM_REQUEST_DURATION.observe(latency, backend=name, outcome="success")
+                set_attributes(**{"llm.outcome": "success"})
+                if messages is not None:
+                    LLM_TOKENS.inc(count_message_tokens(messages), backend=name, kind="prompt")
+                LLM_TOKENS.inc(count_tokens(result), backend=name, kind="completion")
+                logger.info(f"{name} LLM succeeded in {latency:.2f}s")
+                return result
+            finally:
+                limiter.release(admitted_at)
+    
+    def get_backend_health(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state and rolling statistics per backend"""
+        return {name: breaker.snapshot() for name, breaker in self.breakers.items()}
+    
+    def get_admission_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Concurrency, queue depth and queue-time p90 per backend"""
+        return {name: limiter.snapshot() for name, limiter in self.limiters.items()}
 
 
-    async def _call_primary_llm(self, messages: list, max_tokens: int, temperature: float) -> str:
+    async def _call_primary_llm(
+        self,
+        messages: list,
+        max_tokens: int,
+        temperature: float,
+        response_schema: Optional[StructuredOutput] = None,
+        check_length: bool = True
+    ) -> str:
         """Call primary LLM API"""
         
         payload = {
@@ -110,6 +438,9 @@ class LLMService:
             "chat_template_kwargs": {"enable_thinking": False},  # FIXED: Added this
             "stream": False
         }
+        if response_schema is not None:
+            # vLLM guided decoding via the OpenAI-compatible response_format
+            payload["response_format"] = response_schema.openai_response_format()
         
         headers = {
             "Content-Type": "application/json",
@@ -118,6 +449,12 @@ class LLMService:
         
         logger.info(f"Calling primary LLM at {self.url} with model {self.model}")
         
+        if response_schema is not None and settings.LLM_STREAM_STRUCTURED:
+            payload["stream"] = True
+            content = await self._stream_primary_json(payload, headers)
+            self._check_structured("primary", content, response_schema)
+            return content
+        
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.post(self.url, json=payload, headers=headers)
             
@@ -143,20 +480,71 @@ class LLMService:
                 if message := choices[0].get('message'):
                     if content := message.get('content', '').strip():
                         # Validate content is meaningful
-                        if len(content) < 10:
+                        if check_length and len(content) < 10:
                             logger.error(f"Primary LLM returned too short response: {content}")
                             raise Exception("Response too short")
                         
+                        if response_schema is not None:
+                            self._check_structured("primary", content, response_schema)
+                        
                         logger.info(f"Primary LLM returned {len(content)} characters")
                         return content
             
             logger.error(f"Unexpected response structure: {data.keys()}")
             raise Exception("Unexpected response structure")
 
-    async def _call_gemini_fallback(self, messages: list) -> str:
+    async def _stream_primary_json(self, payload: Dict[str, Any], headers: Dict[str, str]) -> str:
+        """
+        Stream a structured answer from the primary LLM
+        
+        The JSON is checked while it arrives, so a backend that ignores the
+        schema and starts writing prose fails after a few tokens instead of
+        after the whole completion.
+        """
+        parser = IncrementalJSONParser()
+        parts: List[str] = []
+        
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            async with client.stream("POST", self.url, json=payload, headers=headers) as response:
+                logger.info(f"Response status: {response.status_code}")
+                
+                if response.status_code != 200:
+                    body = (await response.aread()).decode(errors="replace")
+                    logger.error(f"API Error {response.status_code}: {body}")
+                    if response.status_code == 401:
+                        raise Exception(f"API Auth Error 401 - Token invalid or expired")
+                    raise Exception(f"API Error {response.status_code}")
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    event = json.loads(data)
+                    if 'error' in event:
+                        logger.error(f"API returned error in stream: {event['error']}")
+                        raise Exception(f"API Error: {event['error']}")
+                    
+                    for choice in event.get('choices') or []:
+                        if delta := (choice.get('delta') or {}).get('content'):
+                            parts.append(delta)
+                            parser.feed(delta)
+                    
+                    if parser.complete:
+                        # Anything after the document is noise; stop generating
+                        break
+        
+        content = "".join(parts).strip()
+        logger.info(f"Primary LLM streamed {len(content)} characters ({parser.items} items)")
+        return content
+
+    async def _call_gemini_fallback(self, messages: list, response_schema: Optional[StructuredOutput] = None) -> str:
         """Call Gemini as fallback"""
         try:
-            client = genai.Client(api_key=self.token_fallback_gemini)
+            client = self._get_gemini_client()
+            from google.genai import types
             
             gemini_contents = []
             system_instruction = None
@@ -176,22 +564,33 @@ class LLMService:
             
             config = types.GenerateContentConfig(
                 thinking_config=types.ThinkingConfig(thinking_budget=0),
-                system_instruction=system_instruction
+                system_instruction=system_instruction,
+                **(response_schema.gemini_config() if response_schema is not None else {})
             )
             
-            response = client.models.generate_content(
+            # Sync SDK call runs on the fallback executor, not on the event loop
+            response = await self._run_in_fallback_executor(
+                client.models.generate_content,
                 model="gemini-2.5-flash",
                 contents=gemini_contents,
                 config=config
             )
             
+            if response_schema is not None:
+                self._check_structured("gemini", response.text, response_schema)
+            
             return response.text
             
         except Exception as e:
             logger.error(f"Gemini fallback failed: {e}", exc_info=True)
             raise  # Re-raise to trigger next fallback
 
-    async def _call_openai_fallback(self, messages: list) -> str:
+    async def _call_openai_fallback(
+        self,
+        messages: list,
+        max_tokens: int = 1500,
+        response_schema: Optional[StructuredOutput] = None
+    ) -> str:
         """Call OpenAI as another fallback"""
         try:
             # Validate API key first
@@ -199,21 +598,30 @@ class LLMService:
                 logger.error("OpenAI API key not configured or invalid")
                 raise Exception("OpenAI API key not configured")
             
-            openai_client = OpenAI(api_key=self.token_fallback_openai)
+            openai_client = self._get_openai_client()
             
             formatted_messages = [
                 {"role": msg["role"], "content": msg["content"]} for msg in messages
             ]
             
-            response = openai_client.chat.completions.create(
+            extra = {}
+            if response_schema is not None:
+                extra["response_format"] = response_schema.openai_response_format()
+            
+            response = await self._run_in_fallback_executor(
+                openai_client.chat.completions.create,
                 model="gpt-4o-mini",
                 messages=formatted_messages,
-                max_tokens=1500,
-                temperature=0.7
+                max_tokens=max_tokens,
+                temperature=0.7,
+                **extra
             )
             
             if response.choices:
-                return response.choices[0].message.content.strip()
+                content = response.choices[0].message.content.strip()
+                if response_schema is not None:
+                    self._check_structured("openai", content, response_schema)
+                return content
             
             logger.error("OpenAI returned empty choices")
             raise Exception("OpenAI returned empty response")
@@ -222,6 +630,66 @@ class LLMService:
             logger.error(f"OpenAI fallback failed: {e}", exc_info=True)
             raise  # Re-raise to show final error
 
+    def _get_gemini_client(self) -> "genai.Client":
+        """Gemini client, created once and shared by all calls"""
+        if self._gemini_client is None:
+            with self._client_lock:
+                if self._gemini_client is None:
+                    from google import genai
+                    from google.genai import types
+                    self._gemini_client = genai.Client(
+                        api_key=self.token_fallback_gemini,
+                        http_options=types.HttpOptions(timeout=int(self.fallback_timeout * 1000))
+                    )
+        return self._gemini_client
+    
+    def _get_openai_client(self) -> "OpenAI":
+        """OpenAI client, created once and shared by all calls"""
+        if self._openai_client is None:
+            with self._client_lock:
+                if self._openai_client is None:
+                    from openai import OpenAI
+                    self._openai_client = OpenAI(
+                        api_key=self.token_fallback_openai,
+                        timeout=self.fallback_timeout
+                    )
+        return self._openai_client
+    
+    async def _run_in_fallback_executor(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking SDK call on the dedicated fallback thread pool
+        
+        A call that has started cannot be interrupted. When the caller is
+        cancelled (e.g. the losing side of a hedge), this waits for the
+        thread to return before re-raising, so the admission slot released
+        by ``_try_backend`` is not handed out while the call still runs.
+        The wait is bounded by the clients' ``fallback_timeout``.
+        """
+        future = self._fallback_executor.submit(functools.partial(fn, *args, **kwargs))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Cancelling the wrapper only cancels a call still queued
+            if not future.cancelled():
+                await asyncio.wait([asyncio.wrap_future(future)])
+            raise
+
+    def _check_structured(self, name: str, text: str, response_schema: StructuredOutput) -> None:
+        """
+        Validate a structured answer
+        
+        Truncated JSON is accepted: callers complete it with a continuation
+        request (``json_repair.complete_truncated``), which is cheaper than
+        regenerating the whole answer on another backend.
+        
+        Raises:
+            JSONStreamError: The answer is not (repairable) JSON
+        """
+        try:
+            response_schema.parse(text)
+        except JSONTruncatedError:
+            logger.warning(f"{name} LLM returned truncated JSON ({len(text)} characters)")
+
     def _is_error_response(self, text: str) -> bool:
         """Check if response text is an error message"""
         if not text or len(text.strip()) < 10:  # Too short to be valid
@@ -237,7 +705,12 @@ class LLMService:
         ]
         return any(indicator in text.lower() for indicator in error_indicators)
     
-    async def generate_response(self, prompt: str, conversation_history: List[Dict[str, str]] = None) -> str:
+    async def generate_response(
+        self,
+        prompt: str,
+        conversation_history: List[Dict[str, str]] = None,
+        response_schema: Optional[StructuredOutput] = None
+    ) -> str:
         """
         Generate response based on prompt and conversation history
         """
@@ -269,7 +742,7 @@ class LLMService:
             })
         
         logger.info(f"Generating response with {len(messages)} messages")
-        return await self.call_llm(messages, max_tokens=1500, temperature=0.7)
+        return await self.call_llm(messages, max_tokens=1500, temperature=0.7, response_schema=response_schema)
     
 # Create global instance
 llm_service = LLMService()
\ No newline at end of file
@@ -0,0 +1,151 @@
+# shared/admission.py
+"""
+Admission control: bounded concurrency with a priority queue
+
+Limits how many calls run against a backend at once. Callers beyond the
+limit wait in a priority queue (lower number = served first) and are
+rejected fast when the queue is full or their wait exceeds the deadline,
+so an overloaded backend turns into quick 429s instead of collapsing
+latency for everyone.
+
+Like the other shared primitives, the queue must work across the event
+loops used by Flask request threads, so waiters are
+``concurrent.futures.Future`` objects guarded by a threading lock.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.latency import LatencyHistogram
+
+# Request priorities (lower is served first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted in time; maps to HTTP 429"""
+
+    def __init__(self, name: str, retry_after: int, reason: str):
+        super().__init__(f"{name} overloaded: {reason}")
+        self.name = name
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """Concurrency limiter with a priority wait queue"""
+
+    def __init__(self, name: str, max_concurrent: int, queue_deadline: float, max_queue_size: int = 64):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_deadline = queue_deadline
+        self.max_queue_size = max_queue_size
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._seq = itertools.count()
+        # (priority, seq, waiter); granted/abandoned waiters are skipped on release
+        self._waiters: List[Tuple[int, int, Future]] = []
+        self._queued = 0
+
+        self.queue_time = LatencyHistogram(buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+        self.admitted = 0
+        self.rejected = 0
+        # Exponentially weighted average of how long a slot is held
+        self._avg_hold = 0.0
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """
+        Wait for a slot
+
+        Args:
+            priority: PRIORITY_INTERACTIVE, PRIORITY_BATCH or any int
+
+        Returns:
+            Monotonic timestamp of admission (pass to ``release``)
+
+        Raises:
+            AdmissionRejected: queue full or deadline exceeded
+        """
+        enqueued_at = time.monotonic()
+        with self._lock:
+            if self._active < self.max_concurrent and not self._queued:
+                self._active += 1
+                self.admitted += 1
+                self.queue_time.observe(0.0)
+                return enqueued_at
+
+            if self._queued >= self.max_queue_size:
+                self.rejected += 1
+                raise AdmissionRejected(self.name, self._retry_after(), "queue full")
+
+            waiter = Future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+            self._queued += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(waiter)), timeout=self.queue_deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter.done()
+                if not granted:
+                    # Abandon the waiter; release() skips cancelled futures
+                    waiter.cancel()
+                    self._queued -= 1
+            if granted:
+                # A slot was handed over just as we gave up: pass it on
+                self.release(time.monotonic())
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            with self._lock:
+                self.rejected += 1
+                retry_after = self._retry_after()
+            raise AdmissionRejected(self.name, retry_after, "queue deadline exceeded")
+
+        admitted_at = time.monotonic()
+        self.queue_time.observe(admitted_at - enqueued_at)
+        return admitted_at
+
+    def release(self, admitted_at: Optional[float] = None) -> None:
+        """Free a slot, handing it directly to the highest-priority waiter"""
+        with self._lock:
+            if admitted_at is not None:
+                held = time.monotonic() - admitted_at
+                self._avg_hold = held if not self._avg_hold else 0.8 * self._avg_hold + 0.2 * held
+
+            while self._waiters:
+                _, _, waiter = heapq.heappop(self._waiters)
+                if waiter.cancelled():
+                    continue
+                self._queued -= 1
+                self.admitted += 1
+                # Slot ownership moves to the waiter; _active is unchanged
+                waiter.set_result(True)
+                return
+
+            self._active -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current load and counters (for logs/metrics)"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "active": self._active,
+                "queued": self._queued,
+                "max_concurrent": self.max_concurrent,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "queue_time_p90": self.queue_time.quantile(0.9)
+            }
+
+    def _retry_after(self) -> int:
+        # Rough time for the current queue to drain (lock must be held)
+        hold = self._avg_hold or self.queue_deadline
+        drain = (self._queued + 1) * hold / max(1, self.max_concurrent)
+        return max(1, math.ceil(drain))
@@ -0,0 +1,159 @@
+# shared/circuit_breaker.py
+"""
+Circuit breaker with rolling error-rate and latency windows
+
+States:
+    closed    - calls flow normally, outcomes are recorded
+    open      - calls are rejected immediately until the cool-down expires
+    half_open - a limited number of probe calls decide whether to close
+                again (probe succeeded) or re-open (probe failed)
+
+The breaker is shared by request threads running on different event loops,
+so all state is guarded by a plain threading lock.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-backend circuit breaker"""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        window_seconds: float = 120.0,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        # (finished_at, ok, latency_seconds)
+        self._window: Deque[Tuple[float, bool, float]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may be attempted now
+
+        In half-open state this also reserves a probe slot; the caller must
+        report the outcome with ``record_success``/``record_failure`` or give
+        the slot back with ``release``.
+        """
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful call and its latency in seconds"""
+        self._record(True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        """Record a failed call (exception or unusable response)"""
+        self._record(False, latency)
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without recording an outcome"""
+        with self._lock:
+            if self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and window statistics (for logs/metrics)"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            calls, error_rate, slow_rate = self._rates()
+            return {
+                "name": self.name,
+                "state": self._current_state(now),
+                "calls": calls,
+                "error_rate": round(error_rate, 3),
+                "slow_call_rate": round(slow_rate, 3)
+            }
+
+    # ---- internals (lock must be held) ----
+
+    def _record(self, ok: bool, latency: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+
+            if state == HALF_OPEN:
+                if self._probes_in_flight:
+                    self._probes_in_flight -= 1
+                slow = latency >= self.slow_call_seconds
+                if ok and not slow:
+                    self._close()
+                else:
+                    self._trip(now)
+                return
+
+            self._window.append((now, ok, latency))
+            if state == CLOSED and self._should_trip(now):
+                self._trip(now)
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] > self.window_seconds:
+            self._window.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        calls = len(self._window)
+        if not calls:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, ok, _ in self._window if not ok)
+        slow = sum(1 for _, _, latency in self._window if latency >= self.slow_call_seconds)
+        return calls, failures / calls, slow / calls
+
+    def _should_trip(self, now: float) -> bool:
+        self._expire(now)
+        calls, error_rate, slow_rate = self._rates()
+        if calls < self.min_calls:
+            return False
+        return error_rate >= self.error_rate_threshold or slow_rate >= self.slow_call_rate_threshold
+
+    def _trip(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probes_in_flight = 0
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._window.clear()
+        self._probes_in_flight = 0
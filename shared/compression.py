@@ -0,0 +1,246 @@
+# shared/compression.py
+"""
+Response compression
+
+``init_compression`` compresses responses whose content type is in
+``COMPRESSION_MIMETYPES`` and whose body is at least
+``COMPRESSION_MIN_SIZE`` bytes, with brotli when the client accepts it and
+the ``brotli`` package is installed, gzip otherwise.
+
+Streamed responses (the job events stream) are compressed chunk by chunk
+with a sync flush after every chunk, so each event reaches the client as
+soon as it is written instead of sitting in the compressor's buffer.
+
+The question lists are the same for every session but are wrapped in a
+per-session envelope (``session_id``, ``current_phase``). ``spliced_json_response``
+keeps the serialized list as a ``StaticFragment``: its deflate stream is
+computed once and spliced between the freshly compressed envelope parts,
+producing a regular single-member gzip body. Only the envelope (a few
+hundred bytes) and a CRC are computed per request.
+"""
+import hashlib
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+from pydantic import BaseModel
+
+from config import settings
+from shared.metrics import registry, register_cache
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Header of a gzip member: deflate, no file name, no mtime, unknown OS
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+# Statuses whose body is empty, partial or not ours to rewrite
+_SKIP_STATUSES = {204, 206, 304}
+
+COMPRESSED_BYTES = registry.counter(
+    "http_response_compression_bytes_total",
+    "Response body bytes before and after compression, per encoding",
+    ("encoding", "stage")
+)
+
+
+def _raw_deflate(data: bytes, level: int, mode: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(mode)
+
+
+class StaticFragment:
+    """
+    Serialized JSON value shared by many responses, compressed once
+
+    ``deflate`` is a raw deflate segment ending in a full flush: it starts
+    and ends on a byte boundary with no back-references outside itself,
+    so it can be placed in the middle of any other deflate stream.
+    """
+
+    def __init__(self, data: bytes, level: int):
+        self.data = data
+        self.deflate = _raw_deflate(data, level, zlib.Z_FULL_FLUSH)
+
+
+class FragmentCache:
+    """The last few distinct fragments, keyed by content digest"""
+
+    def __init__(self, size: int = 8):
+        self.size = size
+        self._fragments: "OrderedDict[bytes, StaticFragment]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data: bytes) -> StaticFragment:
+        key = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                return fragment
+            self.misses += 1
+
+        # Compressed outside the lock; two first requests may both compress
+        fragment = StaticFragment(data, settings.COMPRESSION_GZIP_LEVEL)
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.size:
+                self._fragments.popitem(last=False)
+        return fragment
+
+
+fragment_cache = FragmentCache()
+register_cache("compression_fragments", lambda: (fragment_cache.hits, fragment_cache.misses))
+
+
+class SplicedResponse(Response):
+    """JSON response built from a per-request envelope around a static fragment"""
+
+    def __init__(self, prefix: bytes, fragment: StaticFragment, suffix: bytes, status: int = 200):
+        super().__init__(prefix + fragment.data + suffix, status=status, mimetype="application/json")
+        self.splice = (prefix, fragment, suffix)
+
+    def gzip_body(self, level: int) -> bytes:
+        """Single-member gzip of the body, reusing the fragment's deflate segment"""
+        prefix, fragment, suffix = self.splice
+        body = self.get_data()
+        return b"".join((
+            GZIP_HEADER,
+            _raw_deflate(prefix, level, zlib.Z_FULL_FLUSH),
+            fragment.deflate,
+            _raw_deflate(suffix, level, zlib.Z_FINISH),
+            struct.pack("<II", zlib.crc32(body), len(body) & 0xFFFFFFFF)
+        ))
+
+
+def spliced_json_response(model: BaseModel, field: str, value: bytes, status: int = 200) -> Response:
+    """
+    Serialize ``model`` with the JSON ``value`` placed in ``field``
+
+    The model must be built with ``field`` set to an empty list; ``value`` is
+    the already serialized list. Identical values share one compressed
+    fragment across requests.
+    """
+    body = model.model_dump_json().encode()
+    marker = f'"{field}":[]'.encode()
+    head, found, tail = body.partition(marker)
+    if not found:
+        raise ValueError(f"{field!r} is not an empty list in {type(model).__name__}")
+    prefix = head + marker[:-2]
+    return SplicedResponse(prefix, fragment_cache.get(value), tail, status)
+
+
+def _mimetypes() -> set:
+    return {t.strip().lower() for t in settings.COMPRESSION_MIMETYPES.split(",") if t.strip()}
+
+
+def _negotiate(spliced: bool) -> Optional[str]:
+    """Best encoding the client accepts: br, then gzip (gzip first for spliced bodies)"""
+    accepted = request.accept_encodings
+    gzip_q = accepted["gzip"]
+    br_q = accepted["br"] if brotli is not None else 0
+    if spliced and gzip_q:
+        # The precompressed gzip costs a CRC; brotli would compress it all again
+        return "gzip"
+    if br_q and br_q >= gzip_q:
+        return "br"
+    if gzip_q:
+        return "gzip"
+    return None
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return zlib.compress(data, settings.COMPRESSION_GZIP_LEVEL, wbits=16 + zlib.MAX_WBITS)
+
+
+def _compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Compress an iterable body, flushing after every chunk"""
+    if encoding == "br":
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                COMPRESSED_BYTES.inc(len(chunk), encoding=encoding, stage="original")
+                data = compress(chunk) + flush()
+                COMPRESSED_BYTES.inc(len(data), encoding=encoding, stage="sent")
+                yield data
+        yield finish()
+    finally:
+        # The server closes this generator when the client goes away
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Register the compression hook
+
+    Call before the other after_request hooks are registered: Flask runs
+    them in reverse order, so this one sees the final response (including
+    one replaced by the profiler).
+    """
+    if not settings.COMPRESSION_ENABLED:
+        return
+    mimetypes = _mimetypes()
+
+    @app.after_request
+    def _compress_response(response: Response):
+        if (
+            request.method == "HEAD"
+            or response.status_code < 200
+            or response.status_code in _SKIP_STATUSES
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in mimetypes
+            or "no-transform" in (response.headers.get("Cache-Control") or "")
+        ):
+            return response
+
+        streamed = response.is_streamed
+        if not streamed and (response.content_length or 0) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        # The body now depends on Accept-Encoding, whether or not we compress
+        response.vary.add("Accept-Encoding")
+        spliced = isinstance(response, SplicedResponse)
+        encoding = _negotiate(spliced)
+        if encoding is None:
+            return response
+
+        if streamed:
+            response.response = _compress_stream(response.response, encoding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if spliced and encoding == "gzip":
+                compressed = response.gzip_body(settings.COMPRESSION_GZIP_LEVEL)
+            else:
+                compressed = _compress(body, encoding)
+            COMPRESSED_BYTES.inc(len(body), encoding=encoding, stage="original")
+            COMPRESSED_BYTES.inc(len(compressed), encoding=encoding, stage="sent")
+            response.set_data(compressed)
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            # A strong validator must differ between representations
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
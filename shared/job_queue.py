@@ -0,0 +1,186 @@
+# shared/job_queue.py
+"""
+Background jobs for slow LLM generations
+
+Generating results or a timeline takes several LLM calls, often longer than
+a client (or proxy) is willing to hold a request open. ``JobQueue`` runs
+such generations in the background: ``submit`` returns a job immediately,
+clients poll ``get`` or block in ``wait``, and finished jobs are kept for
+``result_ttl`` seconds.
+
+Jobs are deduplicated per key (typically kind + session), so a job started
+ahead of time (e.g. the summary right after the answers are submitted) is
+picked up by the request that later asks for it instead of running twice.
+
+Jobs run on the shared background event loop (see
+``session_manager.get_event_loop``); state is guarded by a threading lock
+because request threads submit and read jobs from outside that loop.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import settings
+from shared.session_manager import get_event_loop
+from shared.tracing import carry_context, span
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A background generation and its outcome"""
+
+    id: str
+    kind: str
+    key: str
+    session_id: Optional[str] = None
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    # Original exception, so routes can map it to an HTTP status
+    exception: Optional[BaseException] = field(default=None, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; returns False on timeout"""
+        return self._done.wait(timeout)
+
+
+class JobQueue:
+    """Bounded-concurrency background job runner with result TTL"""
+
+    def __init__(self, max_concurrent: int, result_ttl: float):
+        self.max_concurrent = max_concurrent
+        self.result_ttl = result_ttl
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        # Dedup key -> id of the latest job for that key
+        self._by_key: Dict[str, str] = {}
+        # Created on the job loop by the first job
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.submitted = 0
+        self.reused = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    def submit(
+        self,
+        kind: str,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        session_id: Optional[str] = None,
+        replace: bool = False
+    ) -> Job:
+        """
+        Start a background job unless an equivalent one exists
+
+        Args:
+            kind: Job type, e.g. "results" or "timeline"
+            key: Dedup key; a queued, running or unexpired finished job with
+                the same key is returned instead of starting a new one
+            fn: Zero-argument coroutine factory doing the work
+            session_id: Owning session
+            replace: Always start a new job (the inputs changed); an older
+                job for the key keeps running but is no longer returned
+
+        Returns:
+            The new or existing job
+        """
+        with self._lock:
+            self._purge_expired()
+            existing = self._jobs.get(self._by_key.get(key, ""))
+            if existing is not None and not replace and existing.status != JOB_FAILED:
+                self.reused += 1
+                return existing
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=key, session_id=session_id)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            self.submitted += 1
+
+        asyncio.run_coroutine_threadsafe(carry_context(self._run(job, fn)), get_event_loop())
+        logger.info(f"Job {job.id} ({kind}) submitted for session {session_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by id, or None if unknown or expired"""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def find(self, key: str) -> Optional[Job]:
+        """Latest job for a dedup key, or None"""
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(self._by_key.get(key, ""))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "stored": len(statuses),
+            "queued": statuses.count(JOB_QUEUED),
+            "running": statuses.count(JOB_RUNNING),
+            "submitted": self.submitted,
+            "reused": self.reused,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    async def _run(self, job: Job, fn: Callable[[], Awaitable[Any]]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async with self._semaphore:
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            try:
+                with span(f"job.{job.kind}", **{"job.id": job.id}):
+                    job.result = await fn()
+                job.status = JOB_SUCCEEDED
+                self.succeeded += 1
+            except Exception as e:
+                job.error = str(e)
+                job.exception = e
+                job.status = JOB_FAILED
+                self.failed += 1
+                logger.error(f"Job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+            finally:
+                job.finished_at = time.time()
+                job._done.set()
+
+        logger.info(f"Job {job.id} ({job.kind}) {job.status} in {job.finished_at - job.started_at:.2f}s")
+
+    def _purge_expired(self) -> None:
+        # Caller holds the lock; unfinished jobs never expire
+        cutoff = time.time() - self.result_ttl
+        expired = [job for job in self._jobs.values() if job.done and job.finished_at < cutoff]
+        for job in expired:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+
+
+job_queue = JobQueue(
+    max_concurrent=settings.JOB_MAX_CONCURRENT,
+    result_ttl=settings.JOB_RESULT_TTL_SECONDS
+)
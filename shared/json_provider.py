@@ -0,0 +1,83 @@
+# shared/json_provider.py
+"""
+Fast JSON serialization for Flask responses
+
+orjson is used when it is installed; without it every path falls back to
+Flask's stdlib-based provider so the app keeps working unchanged.
+"""
+from typing import Any
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    # Key sorting is pure overhead for API clients
+    sort_keys = False
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """Serialize types that neither orjson nor the stdlib handle natively"""
+        if isinstance(o, BaseModel):
+            return o.model_dump(mode="json")
+        return DefaultJSONProvider.default(o)
+
+    def _options(self, pretty: bool = False) -> int:
+        # Datetimes go through ``default`` so the output matches Flask (HTTP dates)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def json_response(model: BaseModel, status: int = 200, **dump_kwargs: Any) -> Response:
+    """
+    Serialize a pydantic model straight to a JSON response
+
+    Skips the intermediate ``model_dump()`` dict and the second encoding
+    pass done by ``jsonify``; pydantic-core writes the bytes directly.
+
+    Args:
+        model: Response model (usually a ``BaseResponse``)
+        status: HTTP status code
+        **dump_kwargs: Forwarded to ``model_dump_json`` (e.g. exclude_none)
+
+    Returns:
+        Flask response with an ``application/json`` body
+    """
+    body = model.model_dump_json(**dump_kwargs)
+    return Response(body, status=status, mimetype="application/json")
+
+
+def init_json_provider(app: Flask) -> None:
+    """Install the fast JSON provider on the Flask app"""
+    app.json = FastJSONProvider(app)
@@ -0,0 +1,263 @@
+# shared/json_repair.py
+"""
+Tolerant repair of almost-JSON LLM output
+
+``repair_json`` fixes the usual ways a model breaks JSON in one linear pass:
+markdown code fences and preamble text, single-quoted strings, raw newlines
+inside strings, trailing commas, and output cut off mid-document (the
+dangling fragment is dropped and open strings/brackets are closed).
+
+When the output was truncated, ``complete_truncated`` asks the model for
+just the missing tail instead of regenerating the whole answer.
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = " \t\r\n"
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_FIRST_KEY = re.compile(r'\s*\{\s*"([^"\\]+)"\s*:')
+# Overlap lengths checked when the continuation repeats the partial tail
+# (shorter matches are likely coincidence, e.g. a single quote character)
+_MIN_OVERLAP, _MAX_OVERLAP = 8, 200
+
+CONTINUATION_PROMPT = (
+    "Output JSON sebelumnya terpotong. Lanjutkan TEPAT dari karakter terakhir "
+    "tanpa mengulang teks sebelumnya. HANYA output sisa JSON, tanpa penjelasan "
+    "atau markdown code block."
+)
+
+
+@dataclass
+class RepairResult:
+    """Repaired JSON text and what was wrong with the input"""
+
+    text: str
+    # Input ended inside a string or with unclosed brackets
+    truncated: bool = False
+    fixes: List[str] = field(default_factory=list)
+
+
+def repair_json(text: str) -> RepairResult:
+    """
+    Turn almost-JSON into parseable JSON text
+
+    Args:
+        text: Raw LLM output
+
+    Returns:
+        RepairResult; ``text`` parses with ``json.loads`` unless the input
+        was malformed beyond the cases handled here
+
+    Raises:
+        ValueError: No JSON object or array in the input
+    """
+    start = _find_root(text)
+    if start < 0:
+        raise ValueError("No JSON object or array found in LLM response")
+
+    fixes: List[str] = []
+    if start > 0:
+        fixes.append("stripped leading text")
+
+    out: List[str] = []
+    # Closing bracket per open container; objects also track key/value state
+    closers: List[str] = []
+    expect_key: List[bool] = []
+    in_string = False
+    quote = '"'
+    escape = False
+    string_is_key = False
+    # Output length and depth at the last point where closing all open
+    # containers yields valid JSON
+    safe_len, safe_depth = 0, 0
+    finished = False
+
+    for ch in text[start:]:
+        if in_string:
+            if escape:
+                escape = False
+                if ch == "'":
+                    # \' is not a JSON escape; a quote needs none in "..."
+                    out[-1] = "'"
+                else:
+                    out.append(ch)
+            elif ch == "\\":
+                escape = True
+                out.append(ch)
+            elif ch == quote:
+                in_string = False
+                out.append('"')
+                if not string_is_key:
+                    safe_len, safe_depth = len(out), len(closers)
+            elif ch == '"':
+                # Double quote inside a single-quoted string
+                out.append('\\"')
+            elif ch in _CONTROL_ESCAPES:
+                # Raw control characters are not allowed inside JSON strings
+                out.append(_CONTROL_ESCAPES[ch])
+            else:
+                out.append(ch)
+            continue
+
+        if ch in "\"'":
+            if ch == "'":
+                fixes.append("converted single quotes")
+            in_string = True
+            quote = ch
+            string_is_key = bool(closers) and closers[-1] == "}" and expect_key[-1]
+            out.append('"')
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            expect_key.append(ch == "{")
+            out.append(ch)
+            safe_len, safe_depth = len(out), len(closers)
+        elif ch in "}]":
+            if ch not in closers:
+                fixes.append(f"dropped stray {ch!r}")
+                continue
+            _strip_trailing_comma(out, fixes)
+            # Close inner containers the model forgot before this one
+            while closers[-1] != ch:
+                out.append(closers.pop())
+                expect_key.pop()
+                fixes.append("closed unbalanced bracket")
+            out.append(closers.pop())
+            expect_key.pop()
+            safe_len, safe_depth = len(out), len(closers)
+            if not closers:
+                finished = True
+                break
+        elif ch == ",":
+            if closers:
+                safe_len, safe_depth = len(out), len(closers)
+                if closers[-1] == "}":
+                    expect_key[-1] = True
+            out.append(ch)
+        elif ch == ":":
+            if closers and closers[-1] == "}":
+                expect_key[-1] = False
+            out.append(ch)
+        elif ch == "`":
+            # Code fence glued to the JSON
+            continue
+        else:
+            out.append(ch)
+
+    truncated = not finished
+    if truncated:
+        fixes.append("closed truncated output")
+        # Drop the dangling fragment (half a string, a key without value, ...)
+        del out[safe_len:]
+        del closers[safe_depth:]
+        _strip_trailing_comma(out, fixes)
+        out.extend(reversed(closers))
+
+    return RepairResult(text="".join(out), truncated=truncated, fixes=fixes)
+
+
+def loads(text: str) -> Any:
+    """
+    Parse LLM JSON output, repairing it only if the fast path fails
+
+    Raises:
+        ValueError: The output cannot be parsed even after repair
+            (``json.JSONDecodeError`` is a ValueError)
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    repaired = repair_json(text)
+    if repaired.fixes:
+        logger.info(f"Repaired LLM JSON: {', '.join(dict.fromkeys(repaired.fixes))}")
+    return json.loads(repaired.text)
+
+
+def continuation_messages(messages: List[Dict[str, str]], partial: str) -> List[Dict[str, str]]:
+    """Messages asking the model to continue its truncated answer"""
+    return list(messages) + [
+        {"role": "assistant", "content": partial},
+        {"role": "user", "content": CONTINUATION_PROMPT}
+    ]
+
+
+def merge_continuation(partial: str, continuation: str) -> str:
+    """
+    Append a continuation to the truncated answer
+
+    Handles a continuation wrapped in a code fence, one that repeats the end
+    of the partial answer, and one that restarts the document from scratch.
+    """
+    tail = continuation.strip()
+    if tail.startswith("```"):
+        tail = tail.split("\n", 1)[1] if "\n" in tail else ""
+    tail = tail.rstrip("`").rstrip()
+
+    # The model started over (same first key as the partial answer)
+    restart = _FIRST_KEY.match(tail)
+    if restart and restart.group(1) == _first_key(partial):
+        return tail
+
+    # Drop text that repeats the end of the partial answer
+    for size in range(min(_MAX_OVERLAP, len(partial), len(tail)), _MIN_OVERLAP - 1, -1):
+        if partial.endswith(tail[:size]):
+            tail = tail[size:]
+            break
+    return partial + tail
+
+
+async def complete_truncated(
+    response: str,
+    messages: List[Dict[str, str]],
+    call: Callable[[List[Dict[str, str]]], Awaitable[str]],
+    max_rounds: int = 2
+) -> str:
+    """
+    Request the missing tail of a truncated JSON answer
+
+    Args:
+        response: LLM answer that may have been cut off
+        messages: Messages that produced ``response``
+        call: Coroutine function sending messages to the LLM
+        max_rounds: Maximum continuation requests
+
+    Returns:
+        The answer with continuations appended (unchanged if it was complete
+        or contains no JSON at all)
+    """
+    for _ in range(max_rounds):
+        try:
+            if not repair_json(response).truncated:
+                break
+        except ValueError:
+            break
+        logger.warning(f"LLM JSON output truncated after {len(response)} characters, requesting continuation")
+        continuation = await call(continuation_messages(messages, response))
+        response = merge_continuation(response, continuation)
+    return response
+
+
+def _strip_trailing_comma(out: List[str], fixes: List[str]) -> None:
+    while out and out[-1] in _WHITESPACE:
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+        fixes.append("removed trailing comma")
+
+
+def _first_key(text: str) -> str:
+    start = _find_root(text)
+    match = _FIRST_KEY.match(text, max(start, 0))
+    return match.group(1) if match else None
+
+
+def _find_root(text: str) -> int:
+    brace, bracket = text.find("{"), text.find("[")
+    if brace < 0 or bracket < 0:
+        return max(brace, bracket)
+    return min(brace, bracket)
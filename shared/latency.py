@@ -0,0 +1,68 @@
+# shared/latency.py
+"""
+Latency histogram with recent-window quantiles
+
+Cumulative bucket counts are kept for reporting, while quantiles (used e.g.
+for hedging budgets) come from a bounded window of the most recent samples
+so they follow the backend's current behaviour.
+"""
+import bisect
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+# Upper bounds in seconds; LLM completions range from sub-second to a minute
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0)
+
+
+class LatencyHistogram:
+    """Thread-safe latency histogram"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, recent_size: int = 500):
+        self.buckets: List[float] = sorted(buckets)
+        self._lock = threading.Lock()
+        # One extra slot for observations above the last bound (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._recent: Deque[float] = deque(maxlen=recent_size)
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency sample"""
+        idx = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += seconds
+            self._count += 1
+            self._recent.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Quantile of the recent samples
+
+        Args:
+            q: Quantile in [0, 1], e.g. 0.9 for p90
+            min_samples: Return None until at least this many samples exist
+
+        Returns:
+            Latency in seconds, or None if there is not enough data
+        """
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples or len(samples) < min_samples:
+            return None
+        idx = min(len(samples) - 1, max(0, int(round(q * (len(samples) - 1)))))
+        return samples[idx]
+
+    def snapshot(self) -> Dict[str, object]:
+        """Cumulative bucket counts, sum and count"""
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets + [float("inf")], counts):
+            running += n
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "sum": total, "count": count}
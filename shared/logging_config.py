@@ -0,0 +1,200 @@
+# shared/logging_config.py
+"""
+Structured, non-blocking logging
+
+``setup_logging()`` replaces the old ``basicConfig(level=DEBUG)``:
+
+- Request threads only put records on a queue; a listener thread formats
+  them as one JSON object per line and writes them out, so slow stdout or
+  log shippers never stall a request.
+- Levels come from ``Settings.LOG_LEVEL``: a root level optionally followed
+  by per-logger overrides, e.g. ``INFO,services.llm_service=DEBUG,werkzeug=WARNING``.
+- Messages longer than ``LOG_MAX_MESSAGE_CHARS`` are truncated; use
+  ``truncated()`` for large payloads so they are only stringified when the
+  record is actually emitted.
+- Hot paths can log a sample: ``logger.info(msg, extra=sampled(0.01))``
+  keeps about 1% of those records and drops the rest before they are queued.
+
+The listener thread does not survive ``fork()``: a pre-fork server's
+workers (gunicorn ``--preload``) get their own queue and listener right
+after the fork, so their records are still written.
+
+Each line carries the session id and, when tracing is on, the trace and
+span ids, so logs can be joined with traces.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from shared.tracing import current_session_id, current_trace_ids
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sample_rate"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def parse_log_levels(spec: str) -> Tuple[str, Dict[str, str]]:
+    """``"INFO,a.b=DEBUG"`` -> ("INFO", {"a.b": "DEBUG"})"""
+    root = "INFO"
+    overrides = {}
+    for part in (p.strip() for p in spec.split(",")):
+        if not part:
+            continue
+        if "=" in part:
+            name, level = part.split("=", 1)
+            overrides[name.strip()] = level.strip().upper()
+        else:
+            root = part.upper()
+    return root, overrides
+
+
+def truncate(text: str, limit: Optional[int] = None) -> str:
+    limit = limit if limit is not None else settings.LOG_MAX_MESSAGE_CHARS
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+
+class truncated:
+    """Lazy log argument: ``logger.debug("ctx: %s", truncated(ctx, 500))``"""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = 500):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return truncate(str(self.value), self.limit)
+
+
+def sampled(rate: float) -> Dict[str, float]:
+    """``extra`` for a record that should be kept with probability ``rate``"""
+    return {"sample_rate": rate}
+
+
+class SamplingFilter(logging.Filter):
+    """Drop records logged with ``extra=sampled(rate)`` at that rate"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = getattr(record, "sample_rate", None)
+        return rate is None or rate >= 1 or random.random() < rate
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that does the minimum in the calling thread
+
+    The message is merged and truncated here (its arguments may change after
+    the call returns) and the request's context is captured, since the
+    listener thread has no access to it; JSON encoding happens later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = truncate(record.getMessage())
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.session_id = current_session_id()
+        trace_ids = current_trace_ids()
+        if trace_ids:
+            record.trace_id, record.span_id = trace_ids
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode()
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def setup_logging() -> None:
+    """Configure the root logger once (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    root_level, overrides = parse_log_levels(settings.LOG_LEVEL)
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT.lower() == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+
+    # Unbounded: a full queue would block callers, which is what this avoids
+    handler = ContextQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(root_level)
+    for name, level in overrides.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """Give a forked child its own queue and listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    # Only the forking thread exists in the child, so the parent's listener
+    # is gone; records it had not written yet are the parent's to write
+    fresh = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, ContextQueueHandler):
+            handler.queue = fresh
+    _listener = logging.handlers.QueueListener(fresh, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,325 @@
+# shared/metrics.py
+"""
+Prometheus-style metrics
+
+Counters and histograms record into per-thread shards: the hot path only
+touches its own thread's dict (no lock, no contention between request
+threads and the event loop), and a scrape sums the shards. Stats already
+kept elsewhere (job queue, outbox, admission controllers...) are exported
+through collectors registered with ``registry.collector``, which are called
+at scrape time.
+
+``registry.render()`` produces the Prometheus text exposition format.
+"""
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from flask import Flask, g, request
+
+# HTTP handlers range from a few ms (cached reads) to minutes (LLM-backed)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# (labels, value) pairs of one metric family
+Samples = List[Tuple[Dict[str, Any], float]]
+
+
+class _ThreadShards:
+    """
+    One dict per thread; only the owning thread writes to it
+
+    The threaded server starts a thread per request, so the shard of a
+    finished thread is folded into a shared base dict (with ``merge``)
+    the next time a shard is created or the metric is scraped: the number
+    of shards stays bounded by the live threads and totals never go back.
+    """
+
+    def __init__(self, merge: Callable[[dict, Any, Any], None]):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._base: dict = {}
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._fold_finished()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+        return shard
+
+    def _fold_finished(self) -> None:
+        # Caller holds the lock; a finished thread no longer writes its shard
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for key, value in shard.items():
+                    self._merge(self._base, key, value)
+        self._shards = live
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            self._fold_finished()
+            return [self._base.copy()] + [shard.copy() for _, shard in self._shards]
+
+
+def _add_value(base: dict, key: tuple, value: float) -> None:
+    base[key] = base.get(key, 0.0) + value
+
+
+def _add_buckets(base: dict, key: tuple, state: list) -> None:
+    current = base.get(key)
+    base[key] = list(state) if current is None else [a + b for a, b in zip(current, state)]
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_add_value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        return sum(shard.get(key, 0.0) for shard in self._shards.snapshot())
+
+    def collect(self) -> Iterable[str]:
+        totals: Dict[tuple, float] = {}
+        for shard in self._shards.snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0.0) + value
+        for key, value in sorted(totals.items()):
+            yield _sample(self.name, dict(zip(self.labelnames, key)), value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = sorted(buckets)
+        self._shards = _ThreadShards(_add_buckets)
+
+    def observe(self, seconds: float, **labels) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        shard = self._shards.mine()
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket counts, one +Inf slot, then sum
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        idx = 0
+        while idx < len(self.buckets) and seconds > self.buckets[idx]:
+            idx += 1
+        state[idx] += 1
+        state[-1] += seconds
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> Iterable[str]:
+        totals: Dict[tuple, list] = {}
+        for shard in self._shards.snapshot():
+            for key, state in shard.items():
+                state = list(state)
+                if key in totals:
+                    totals[key] = [a + b for a, b in zip(totals[key], state)]
+                else:
+                    totals[key] = state
+        for key, state in sorted(totals.items()):
+            labels = dict(zip(self.labelnames, key))
+            yield from _histogram_samples(self.name, labels, self.buckets, state[:-1], state[-1])
+
+
+class MetricsRegistry:
+    """Owns every metric family and renders them for scraping"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, fn: Callable[[], Iterable[str]]) -> Callable[[], Iterable[str]]:
+        """Register a scrape-time collector (usable as a decorator)"""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Re-imported module: keep recording into the same family
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.collect())
+        for fn in collectors:
+            lines.extend(fn())
+        return "\n".join(lines) + "\n"
+
+
+# ---- exposition helpers for collectors ----
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _sample(name: str, labels: Dict[str, Any], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _histogram_samples(name: str, labels: Dict[str, Any], buckets: Sequence[float], counts: Sequence[int], total: float) -> Iterable[str]:
+    running = 0
+    for bound, n in zip(list(buckets) + [float("inf")], counts):
+        running += n
+        yield _sample(f"{name}_bucket", dict(labels, le=_format_value(bound)), running)
+    yield _sample(f"{name}_sum", labels, total)
+    yield _sample(f"{name}_count", labels, running)
+
+
+def family(name: str, metric_type: str, documentation: str, samples: Samples) -> List[str]:
+    """Render one gauge/counter family from (labels, value) pairs"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    lines.extend(_sample(name, labels, value) for labels, value in samples if value is not None)
+    return lines
+
+
+def histogram_family(name: str, documentation: str, snapshots: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[str]:
+    """Render shared.latency.LatencyHistogram snapshots as one histogram family"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} histogram"]
+    for labels, snapshot in snapshots:
+        for bound, cumulative in snapshot["buckets"]:
+            lines.append(_sample(f"{name}_bucket", dict(labels, le=_format_value(bound)), cumulative))
+        lines.append(_sample(f"{name}_sum", labels, snapshot["sum"]))
+        lines.append(_sample(f"{name}_count", labels, snapshot["count"]))
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+# ---- HTTP request metrics ----
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to produce the response, per blueprint and route",
+    ("blueprint", "route", "method")
+)
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total",
+    "Responses per blueprint, route and status code",
+    ("blueprint", "route", "method", "status")
+)
+
+
+def init_request_metrics(app: Flask) -> None:
+    """
+    Time every request; call before registering other before_request hooks
+
+    Routes are labelled with their URL rule (``/<job_id>``), not the raw
+    path, so label cardinality stays bounded.
+    """
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            labels = {
+                "blueprint": request.blueprint or "app",
+                "route": request.url_rule.rule if request.url_rule else "unmatched",
+                "method": request.method
+            }
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, **labels)
+            HTTP_REQUESTS.inc(status=response.status_code, **labels)
+        return response
+
+
+def timed(histogram: Histogram, **labels) -> Callable:
+    """Decorator: observe the duration of every call (sync functions)"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---- caches ----
+
+_cache_sources: Dict[str, Callable[[], Tuple[float, float]]] = {}
+
+
+def register_cache(name: str, stats: Callable[[], Tuple[float, float]]) -> None:
+    """Export a cache's hit/miss counts; ``stats`` returns (hits, misses)"""
+    _cache_sources[name] = stats
+
+
+@registry.collector
+def _collect_caches() -> Iterable[str]:
+    lookups: Samples = []
+    ratios: Samples = []
+    for name, stats in sorted(_cache_sources.items()):
+        hits, misses = stats()
+        lookups.append(({"cache": name, "result": "hit"}, hits))
+        lookups.append(({"cache": name, "result": "miss"}, misses))
+        if hits + misses:
+            ratios.append(({"cache": name}, hits / (hits + misses)))
+    yield from family("cache_lookups_total", "counter", "Cache lookups per cache and result", lookups)
+    yield from family("cache_hit_ratio", "gauge", "Hits / lookups since start per cache", ratios)
@@ -0,0 +1,342 @@
+# shared/profiling.py
+"""
+Per-request sampling profiler
+
+Two ways to profile a request in production without redeploying:
+
+- On demand: a user listed in ``PROFILING_ADMINS`` sends ``X-Profile: 1``
+  (or ``?profile=1``). The profile is stored in PROFILING_DIR and its file
+  name returned in ``X-Profile-Id``. ``X-Profile: return`` answers with the
+  flame graph itself instead of the normal response.
+- Always on: ``PROFILING_SAMPLE_RATE`` of all requests are profiled and the
+  slowest ``PROFILING_KEEP_SLOWEST`` profiles are kept on disk.
+
+A sampler thread records the stacks of the request thread and of the shared
+event loop every ``PROFILING_INTERVAL_MS``. Async handlers and background
+jobs run on that loop, so its samples may include other requests' work; they
+appear under their own root frame, without the time the loop sits idle
+waiting for I/O. Profiles are speedscope JSON (open in
+https://www.speedscope.app) or folded stacks for flamegraph.pl
+(``X-Profile-Format: folded``). Streamed responses are profiled until the
+response object is returned, not while the body is streamed.
+"""
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, Response, g, request
+
+from config import settings
+from shared.session_manager import event_loop_thread_id
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+FORMAT_HEADER = "X-Profile-Format"
+
+# One frame: (function, file, first line)
+Frame = Tuple[str, str, int]
+
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Longest first, so site-packages inside the stdlib dir wins over the stdlib
+_path_roots = sorted(
+    {_project_root, *(sysconfig.get_paths()[key] for key in ("purelib", "platlib", "stdlib"))},
+    key=len,
+    reverse=True
+)
+
+
+def _short_path(filename: str) -> str:
+    for root in _path_roots:
+        if filename.startswith(root + os.sep):
+            return filename[len(root) + 1:]
+    return filename
+
+
+def _is_idle(frame) -> bool:
+    """Event loop parked in select() waiting for I/O"""
+    return frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py")
+
+
+class StackSampler:
+    """Samples the stacks of a few threads from a background thread"""
+
+    def __init__(self, threads: Dict[int, str], interval: float):
+        self.threads = threads
+        self.interval = interval
+        # stack -> sampled milliseconds
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        code_frames: Dict[object, Frame] = {}
+        last = self._started
+        while not self._stop.wait(self.interval):
+            # The GIL stretches intervals under load: weight by time elapsed
+            now = time.perf_counter()
+            elapsed_ms = (now - last) * 1000
+            last = now
+            current = sys._current_frames()
+            for ident, label in self.threads.items():
+                frame = current.get(ident)
+                if frame is None or _is_idle(frame):
+                    continue
+                stack: List[Frame] = []
+                while frame is not None:
+                    code = frame.f_code
+                    entry = code_frames.get(code)
+                    if entry is None:
+                        entry = code_frames[code] = (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+                    stack.append(entry)
+                    frame = frame.f_back
+                stack.append((label, "", 0))
+                self.samples[tuple(reversed(stack))] += elapsed_ms
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded stack format (flamegraph.pl, speedscope); counts are ms"""
+        return "\n".join(
+            ";".join(f"{name} ({path}:{line})" if path else name for name, path, line in stack) + f" {round(ms)}"
+            for stack, ms in self.samples.most_common()
+        ) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """Speedscope file with one sampled profile, weights in milliseconds"""
+        frames: List[dict] = []
+        index: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, ms in self.samples.items():
+            row = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    fn, path, line = frame
+                    frames.append({"name": fn, "file": path, "line": line} if path else {"name": fn})
+                row.append(index[frame])
+            samples.append(row)
+            weights.append(round(ms, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "df-readiness shared/profiling.py",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+
+class ProfileStore:
+    """
+    Profiles on disk: the latest on-demand ones and the slowest sampled ones
+
+    Both sets are capped at ``keep`` files; the file name carries the
+    duration so the slowest set survives restarts.
+    """
+
+    NAME = re.compile(r"^(?P<kind>slow|ondemand)-.*-(?P<ms>\d+)ms\.speedscope\.json$")
+
+    def __init__(self, directory: str, keep: int):
+        if not os.path.isabs(directory):
+            directory = os.path.join(_project_root, directory)
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._slowest: List[Tuple[int, str]] = []  # min-heap of (ms, name)
+        self._on_demand: List[str] = []
+        self._scan()
+
+    def _scan(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            match = self.NAME.match(name)
+            if match is None:
+                continue
+            if match["kind"] == "slow":
+                heapq.heappush(self._slowest, (int(match["ms"]), name))
+            else:
+                self._on_demand.append(name)
+
+    def would_keep(self, duration_ms: int) -> bool:
+        """A sampled profile this slow makes it into the slowest set"""
+        with self._lock:
+            return len(self._slowest) < self.keep or duration_ms > self._slowest[0][0]
+
+    def save(self, kind: str, label: str, duration_ms: int, profile: dict) -> Optional[str]:
+        """Write a profile; returns its file name, or None if not slow enough or not written"""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:80]
+        name = f"{kind}-{stamp}-{slug}-{duration_ms}ms.speedscope.json"
+
+        with self._lock:
+            evicted = None
+            if kind == "slow":
+                if len(self._slowest) >= self.keep:
+                    if duration_ms <= self._slowest[0][0]:
+                        return None
+                    evicted = heapq.heapreplace(self._slowest, (duration_ms, name))[1]
+                else:
+                    heapq.heappush(self._slowest, (duration_ms, name))
+            else:
+                self._on_demand.append(name)
+                if len(self._on_demand) > self.keep:
+                    evicted = self._on_demand.pop(0)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                json.dump(profile, f, separators=(",", ":"))
+        except OSError as e:
+            logger.warning(f"Could not write profile {name}: {e}")
+            return None
+        if evicted:
+            try:
+                os.remove(os.path.join(self.directory, evicted))
+            except OSError:
+                pass
+        return name
+
+    def list(self) -> Dict[str, List[dict]]:
+        with self._lock:
+            slowest = sorted(self._slowest, reverse=True)
+            on_demand = list(reversed(self._on_demand))
+        return {
+            "slowest": [{"name": name, "duration_ms": ms} for ms, name in slowest],
+            "on_demand": [{"name": name} for name in on_demand]
+        }
+
+    def path(self, name: str) -> Optional[str]:
+        """Absolute path of a stored profile; None for unknown names"""
+        if self.NAME.match(name) is None:
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_KEEP_SLOWEST)
+
+
+def admin_usernames() -> set:
+    return {name.strip().lower() for name in settings.PROFILING_ADMINS.split(",") if name.strip()}
+
+
+def is_profiling_admin() -> bool:
+    """Current JWT user may request profiles"""
+    user = getattr(request, "current_user", None)
+    if user is None:
+        return False
+    admins = admin_usernames()
+    return bool(admins) and (
+        (user.username or "").lower() in admins or (user.email or "").lower() in admins
+    )
+
+
+def _requested_mode() -> Optional[str]:
+    value = (request.headers.get(PROFILE_HEADER) or request.args.get("profile") or "").strip().lower()
+    if value in ("1", "true", "yes", "store"):
+        return "store"
+    if value == "return":
+        return "return"
+    return None
+
+
+def init_profiling(app: Flask) -> None:
+    """
+    Register the profiling hooks
+
+    Call after ``jwt_protect_routes`` is registered: on-demand profiling
+    checks ``request.current_user``, which that hook sets.
+    """
+    interval = settings.PROFILING_INTERVAL_MS / 1000
+
+    @app.before_request
+    def _start_profiler():
+        mode = _requested_mode()
+        if mode is not None and not is_profiling_admin():
+            mode = None
+        if mode is None and settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            mode = "sampled"
+        if mode is None:
+            return
+
+        threads = {threading.get_ident(): "request"}
+        loop_ident = event_loop_thread_id()
+        if loop_ident is not None:
+            threads[loop_ident] = "event-loop"
+        g._profiler = StackSampler(threads, interval).start()
+        g._profile_mode = mode
+
+    @app.after_request
+    def _finish_profiler(response: Response):
+        sampler = g.pop("_profiler", None)
+        if sampler is None:
+            return response
+        sampler.stop()
+        mode = g.pop("_profile_mode")
+        route = request.url_rule.rule if request.url_rule else request.path
+        label = f"{request.method} {route}"
+        duration_ms = int(sampler.duration * 1000)
+
+        if mode == "return":
+            folded = request.headers.get(FORMAT_HEADER, request.args.get("profile_format", "")).lower() == "folded"
+            profiled = response
+            if folded:
+                response = Response(sampler.folded(), mimetype="text/plain")
+            else:
+                response = Response(json.dumps(sampler.speedscope(label)), mimetype="application/json")
+                response.headers["Content-Disposition"] = 'attachment; filename="profile.speedscope.json"'
+            response.headers["X-Profiled-Status"] = str(profiled.status_code)
+            response.headers["X-Profile-Duration-Ms"] = str(duration_ms)
+            profiled.close()
+            return response
+
+        if mode == "store":
+            name = profile_store.save("ondemand", label, duration_ms, sampler.speedscope(label))
+            if name:
+                response.headers["X-Profile-Id"] = name
+            response.headers["X-Profile-Duration-Ms"] = str(duration_ms)
+            return response
+
+        # Sampled: serialize and write after the response has been sent
+        if profile_store.would_keep(duration_ms):
+            response.call_on_close(
+                lambda: profile_store.save("slow", label, duration_ms, sampler.speedscope(label))
+            )
+        return response
+
+    @app.teardown_request
+    def _stop_profiler(exc):
+        # after_request did not run (the request failed before a response)
+        sampler = g.pop("_profiler", None)
+        if sampler is not None:
+            sampler.stop()
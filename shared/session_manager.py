@@ -3,10 +3,14 @@ from flask import Flask, request, jsonify, session
 from datetime import datetime
 import uuid
 import threading
+import logging
 
 from functools import wraps
 
 from lib.profiling_question import PROFILING_QUESTIONS
+from shared.tracing import carry_context, set_session_id
+
+logger = logging.getLogger(__name__)
 
 _loop = None
 _loop_thread = None
@@ -65,11 +69,13 @@ def get_or_create_session():
         manager = SessionManager()
         session['session_id'] = manager.session_id
         session_managers[manager.session_id] = manager
+        set_session_id(manager.session_id)
         return manager
     
     if session_id != session.get('session_id'):
         session['session_id'] = session_id
     
+    set_session_id(session_id)
     return session_managers[session_id]
 
 def async_route(f):
@@ -78,7 +84,8 @@ def async_route(f):
     def wrapper(*args, **kwargs):
         
         loop = get_event_loop()
-        future = asyncio.run_coroutine_threadsafe(f(*args, **kwargs), loop)
+        # Keep the handler's spans in the request's trace
+        future = asyncio.run_coroutine_threadsafe(carry_context(f(*args, **kwargs)), loop)
         
         try:
             # 2 minutes timeout for LLM operations
@@ -89,9 +96,7 @@ def async_route(f):
                 "message": "The analysis is taking longer than expected. Please try again."
             }), 504
         except Exception as e:
-            print(f"Async route error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"Async route error: {e}", exc_info=True)
             return jsonify({"error": str(e)}), 500
     
     return wrapper
@@ -114,4 +119,8 @@ def get_event_loop():
         while _loop is None:
             threading.Event().wait(0.01)
     
-    return _loop
\ No newline at end of file
+    return _loop
+
+def event_loop_thread_id():
+    """Ident of the shared event loop thread, or None if it was never started"""
+    return _loop_thread.ident if _loop_thread is not None else None
@@ -0,0 +1,103 @@
+# shared/singleflight.py
+"""
+Single-flight request coalescing
+
+Concurrent callers asking for the same key share one in-flight call instead
+of each issuing their own. Flask handlers run coroutines on different event
+loops (``run_async`` per request thread, ``async_route`` on the shared loop),
+so the shared result lives in a thread-safe ``concurrent.futures.Future``
+that any loop can await.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar('T')
+
+
+def canonical_key(*parts: Any) -> str:
+    """
+    Build a stable hash key from JSON-serializable request parts
+
+    Dict ordering and whitespace do not affect the key.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """The leading call was cancelled before it produced a result"""
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls that share a key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` unless a call with the same key is already in flight
+
+        Args:
+            key: Canonical request key (see ``canonical_key``)
+            fn: Zero-argument coroutine factory performing the real call
+
+        Returns:
+            Result of the (possibly shared) call. Exceptions raised by the
+            leader are re-raised in every follower; if the leader is
+            cancelled, a waiting follower makes the call itself.
+        """
+        while True:
+            with self._lock:
+                shared = self._calls.get(key)
+                if shared is None:
+                    shared = Future()
+                    self._calls[key] = shared
+                    self.leaders += 1
+                    is_leader = True
+                else:
+                    self.followers += 1
+                    is_leader = False
+
+            if is_leader:
+                break
+            try:
+                # shield: a follower being cancelled must not cancel the leader's call
+                return await asyncio.shield(asyncio.wrap_future(shared))
+            except _LeaderCancelled:
+                # Not the followers' failure: try again, possibly as the leader
+                continue
+
+        try:
+            result = await fn()
+        except Exception as e:
+            self._forget(key)
+            shared.set_exception(e)
+            raise
+        except BaseException:
+            # Cancellation is the leader's own: followers retry instead of
+            # receiving a CancelledError their handlers do not expect
+            self._forget(key)
+            shared.set_exception(_LeaderCancelled())
+            raise
+
+        self._forget(key)
+        shared.set_result(result)
+        return result
+
+    def _forget(self, key: str) -> None:
+        # Drop the key before publishing so later callers start a fresh call
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently in flight"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,292 @@
+# shared/structured_output.py
+"""
+Structured (schema-constrained) LLM output
+
+``StructuredOutput`` carries a JSON schema and renders it in the request
+format each backend understands, so backends that support guided decoding
+(vLLM, OpenAI, Gemini) can only emit JSON matching the schema.
+
+``IncrementalJSONParser`` checks a streamed JSON answer as it arrives: it
+rejects output that is clearly not JSON after the first few characters
+(instead of after the whole completion) and emits array items as soon as
+they are complete.
+"""
+import copy
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from shared.json_repair import repair_json
+
+_WHITESPACE = set(" \t\r\n")
+# Characters of numbers and true/false/null
+_SCALAR = set("0123456789+-.eE") | set("truefalsn")
+# A markdown code fence is tolerated around the JSON document
+_FENCE = set("`json") | _WHITESPACE
+
+
+class JSONStreamError(ValueError):
+    """Streamed output is not (or no longer) valid JSON"""
+
+
+class JSONTruncatedError(JSONStreamError):
+    """Output stopped before the JSON document was complete"""
+
+
+def json_schema_for(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    JSON schema of a pydantic model in the strict form guided decoding expects
+
+    ``$ref``s are inlined, every property is required and no additional
+    properties are allowed (required by OpenAI strict mode and understood by
+    vLLM and Gemini alike).
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(copy.deepcopy(defs[node["$ref"].split("/")[-1]]))
+            # Drop schema titles (string-valued), not properties named "title"
+            node = {
+                key: resolve(value) for key, value in node.items()
+                if not (key == "title" and isinstance(value, str))
+            }
+            if node.get("type") == "object" and "properties" in node:
+                node["required"] = list(node["properties"])
+                node["additionalProperties"] = False
+            return node
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+
+    return resolve(schema)
+
+
+@dataclass(frozen=True)
+class StructuredOutput:
+    """A named JSON schema the LLM answer must follow"""
+
+    name: str
+    schema: Dict[str, Any]
+
+    @classmethod
+    def from_model(cls, name: str, model: Type[BaseModel]) -> "StructuredOutput":
+        return cls(name=name, schema=json_schema_for(model))
+
+    def openai_response_format(self) -> Dict[str, Any]:
+        """``response_format`` for OpenAI-compatible APIs (OpenAI, vLLM)"""
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": self.name, "schema": self.schema, "strict": True}
+        }
+
+    def gemini_config(self) -> Dict[str, Any]:
+        """``GenerateContentConfig`` fields for Gemini"""
+        return {"response_mime_type": "application/json", "response_json_schema": self.schema}
+
+    def parse(self, text: str) -> Any:
+        """
+        Parse a complete answer
+
+        Answers that are almost JSON (code fence, trailing commas, single
+        quotes, ...) are repaired.
+
+        Raises:
+            JSONTruncatedError: The answer was cut off; see
+                ``json_repair.complete_truncated``
+            JSONStreamError: The answer is not valid JSON
+        """
+        try:
+            parser = IncrementalJSONParser()
+            parser.feed(text)
+            return parser.close()
+        except JSONTruncatedError:
+            raise
+        except JSONStreamError:
+            pass
+
+        try:
+            repaired = repair_json(text)
+            if repaired.truncated:
+                raise JSONTruncatedError("JSON output is incomplete")
+            return json.loads(repaired.text)
+        except JSONStreamError:
+            raise
+        except ValueError as e:
+            raise JSONStreamError(str(e)) from e
+
+
+class IncrementalJSONParser:
+    """
+    Streaming JSON checker/parser
+
+    Call ``feed`` with each chunk and ``close`` at the end. Each character is
+    scanned once, so the total cost is linear in the answer length.
+
+    ``feed`` returns the array items completed by that chunk as
+    ``(key, value)`` pairs, for arrays that are the root (key ``None``) or a
+    direct member of the root object (key = member name). Only object, array
+    and string items are reported.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        # Frames: [type, expect_key, key]; type is "{" or "["
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._done = False
+        self._root_start: Optional[Tuple[int, int]] = None
+        self._item_start: Optional[Tuple[int, int]] = None
+        self._key_chars: Optional[List[str]] = None
+        self.items = 0
+
+    @property
+    def complete(self) -> bool:
+        """The root value has been closed"""
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[Optional[str], Any]]:
+        """
+        Consume the next chunk of output
+
+        Raises:
+            JSONStreamError: The output cannot be valid JSON
+        """
+        events: List[Tuple[Optional[str], Any]] = []
+        ci = len(self._chunks)
+        self._chunks.append(chunk)
+
+        for i, ch in enumerate(chunk):
+            if self._done:
+                if ch not in _FENCE:
+                    raise JSONStreamError(f"Unexpected text after JSON document: {ch!r}")
+                continue
+
+            if self._in_string:
+                if self._key_chars is not None:
+                    self._key_chars.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._end_string(ci, i, events)
+                continue
+
+            if not self._started:
+                if ch in "{[":
+                    self._started = True
+                    self._root_start = (ci, i)
+                elif ch in _FENCE:
+                    continue
+                else:
+                    raise JSONStreamError(f"Output does not start with JSON: {ch!r}")
+
+            if ch in _WHITESPACE:
+                continue
+            if ch == '"':
+                self._start_string(ci, i)
+            elif ch in "{[":
+                if self._is_item_position():
+                    self._item_start = (ci, i)
+                self._mark_value()
+                self._stack.append([ch, ch == "{", None])
+            elif ch in "}]":
+                if not self._stack or self._stack[-1][0] != ("{" if ch == "}" else "["):
+                    raise JSONStreamError(f"Mismatched {ch!r}")
+                self._stack.pop()
+                if self._item_start is not None and self._is_item_position():
+                    events.append(self._emit(ci, i))
+                if not self._stack:
+                    self._done = True
+            elif ch == ",":
+                if not self._stack:
+                    raise JSONStreamError("Unexpected ','")
+                if self._stack[-1][0] == "{":
+                    self._stack[-1][1] = True
+            elif ch == ":":
+                if not self._stack or self._stack[-1][0] != "{":
+                    raise JSONStreamError("Unexpected ':'")
+            elif ch in _SCALAR:
+                self._mark_value()
+            else:
+                raise JSONStreamError(f"Unexpected character {ch!r}")
+
+        return events
+
+    def close(self) -> Any:
+        """
+        Finish the stream and return the parsed root value
+
+        Raises:
+            JSONTruncatedError: The output ended before the JSON was complete
+            JSONStreamError: The JSON text is invalid
+        """
+        if not self._done:
+            raise JSONTruncatedError("JSON output is incomplete")
+        ci, i = self._root_start
+        text = self._chunks[ci][i:] + "".join(self._chunks[ci + 1:])
+        text = text.rstrip().rstrip("`").rstrip()
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise JSONStreamError(str(e)) from e
+
+    # ---- internals ----
+
+    def _is_item_position(self) -> bool:
+        # Inside an array that is the root or a member of the root object
+        stack = self._stack
+        if not stack or stack[-1][0] != "[":
+            return False
+        return len(stack) == 1 or (len(stack) == 2 and stack[0][0] == "{")
+
+    def _mark_value(self) -> None:
+        # A value (not a key) is being written in the current object
+        if self._stack and self._stack[-1][0] == "{":
+            if self._stack[-1][1]:
+                raise JSONStreamError("Object key must be a string")
+
+    def _start_string(self, ci: int, i: int) -> None:
+        self._in_string = True
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame[0] == "{" and frame[1]:
+            # Only keys of the root object are needed (to label items)
+            self._key_chars = [] if len(self._stack) == 1 else None
+        elif self._is_item_position():
+            self._item_start = (ci, i)
+
+    def _end_string(self, ci: int, i: int, events: List[Tuple[Optional[str], Any]]) -> None:
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame[0] == "{" and frame[1]:
+            frame[1] = False
+            if self._key_chars is not None:
+                frame[2] = json.loads('"' + "".join(self._key_chars[:-1]) + '"')
+                self._key_chars = None
+        elif self._item_start is not None and self._is_item_position():
+            events.append(self._emit(ci, i))
+
+    def _emit(self, ci: int, i: int) -> Tuple[Optional[str], Any]:
+        start_ci, start_i = self._item_start
+        self._item_start = None
+        if start_ci == ci:
+            text = self._chunks[ci][start_i:i + 1]
+        else:
+            text = (
+                self._chunks[start_ci][start_i:]
+                + "".join(self._chunks[start_ci + 1:ci])
+                + self._chunks[ci][:i + 1]
+            )
+        key = self._stack[0][2] if len(self._stack) == 2 else None
+        self.items += 1
+        try:
+            return key, json.loads(text)
+        except json.JSONDecodeError as e:
+            raise JSONStreamError(str(e)) from e
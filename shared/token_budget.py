@@ -0,0 +1,209 @@
+# shared/token_budget.py
+"""
+Token budgeting for LLM prompts
+
+Estimates how many tokens a prompt will use, trims the lowest-value prompt
+sections until it fits the endpoint's budget, and derives ``max_tokens``
+from the shape of the expected output instead of a one-size-fits-all 2000.
+
+tiktoken is used when it is installed; otherwise token counts come from a
+conservative characters-per-token heuristic, which over-estimates slightly
+so trimmed prompts still fit the backend's context window.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from config import settings
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Heuristic when no tokenizer is available (mixed Indonesian/English prose)
+CHARS_PER_TOKEN = 3.0
+# Chat-format overhead: role markers per message plus reply priming
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+TRUNCATION_MARKER = "\n[...]"
+
+_encoder = None
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None and tiktoken is not None:
+        try:
+            _encoder = tiktoken.get_encoding(settings.LLM_TOKENIZER_ENCODING)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding unavailable, using heuristic: {e}")
+            _encoder = False
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    """Estimate the number of tokens in ``text``"""
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+def count_message_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate prompt tokens for a list of chat messages"""
+    total = REPLY_PRIMING_TOKENS
+    for message in messages:
+        total += MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get("content", ""))
+    return total
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut ``text`` down to at most ``max_tokens`` tokens
+
+    The cut prefers a paragraph or line boundary near the limit and is
+    marked with ``TRUNCATION_MARKER`` so the model knows text is missing.
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    keep = max(0, max_tokens - count_tokens(TRUNCATION_MARKER))
+    encoder = _get_encoder()
+    if encoder is not None:
+        head = encoder.decode(encoder.encode(text, disallowed_special=())[:keep])
+    else:
+        head = text[:int(keep * CHARS_PER_TOKEN)]
+
+    # Back off to a natural boundary if one is close to the cut
+    for boundary in ("\n\n", "\n", ". "):
+        idx = head.rfind(boundary)
+        if idx >= len(head) * 0.9:
+            head = head[:idx + (1 if boundary == ". " else 0)]
+            break
+    return head.rstrip() + TRUNCATION_MARKER
+
+
+def schema_output_tokens(schema: Any) -> int:
+    """
+    Estimate the tokens needed to emit an output of the given shape
+
+    Args:
+        schema: Output shape where
+            - an int is a token allowance for a free-text value
+            - a dict maps field names to nested shapes (JSON object)
+            - a ``[item_shape, max_items]`` list is a JSON array
+
+    Returns:
+        Token estimate including JSON punctuation
+    """
+    if isinstance(schema, int):
+        return schema
+    if isinstance(schema, dict):
+        # Braces plus, per field, the quoted key, colon, quotes and comma
+        return 2 + sum(count_tokens(key) + 4 + schema_output_tokens(value) for key, value in schema.items())
+    if isinstance(schema, list) and len(schema) == 2:
+        item, max_items = schema
+        return 2 + max_items * (schema_output_tokens(item) + 1)
+    raise ValueError(f"Unsupported output schema: {schema!r}")
+
+
+@dataclass(frozen=True)
+class EndpointBudget:
+    """Prompt/output token budget for one LLM endpoint"""
+
+    name: str
+    # Upper bound for prompt tokens (cost/latency cap)
+    max_prompt_tokens: int
+    # Shape of the expected output, see ``schema_output_tokens``
+    output_schema: Any
+    # Extra room on top of the schema estimate
+    output_headroom: float = 1.25
+
+    @property
+    def max_tokens(self) -> int:
+        """``max_tokens`` to request from the backend"""
+        return int(schema_output_tokens(self.output_schema) * self.output_headroom)
+
+    @property
+    def prompt_budget(self) -> int:
+        """Prompt tokens that fit both the cap and the context window"""
+        window = settings.LLM_CONTEXT_WINDOW - self.max_tokens - settings.LLM_TOKEN_SAFETY_MARGIN
+        return max(0, min(self.max_prompt_tokens, window))
+
+
+@dataclass
+class PromptSection:
+    """A template field that may be trimmed to fit the budget"""
+
+    name: str
+    text: str
+    # Higher value is kept longer; the lowest-value section is trimmed first
+    value: int
+    # Floor for the trim target (boundary snapping may cut slightly more)
+    min_tokens: int = 0
+
+
+def fit_sections(
+    budget: EndpointBudget,
+    system_prompt: str,
+    user_template: str,
+    sections: List[PromptSection],
+    **fixed: Any
+) -> Dict[str, Any]:
+    """
+    Trim prompt sections so the rendered messages fit the endpoint budget
+
+    Args:
+        budget: Endpoint budget
+        system_prompt: System message content
+        user_template: ``str.format`` template of the user message
+        sections: Trimmable template fields
+        **fixed: Template fields that are never trimmed
+
+    Returns:
+        Keyword arguments for ``user_template.format`` (fixed and trimmed fields)
+    """
+    fields: Dict[str, Any] = dict(fixed)
+    if not settings.LLM_TOKEN_BUDGET_ENABLED:
+        fields.update({section.name: section.text for section in sections})
+        return fields
+
+    # Everything except the trimmable sections
+    skeleton = user_template.format(**fixed, **{section.name: "" for section in sections})
+    fixed_tokens = count_message_tokens([
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": skeleton}
+    ])
+
+    sizes = {section.name: count_tokens(section.text) for section in sections}
+    overflow = fixed_tokens + sum(sizes.values()) - budget.prompt_budget
+    texts = {section.name: section.text for section in sections}
+
+    for section in sorted(sections, key=lambda s: s.value):
+        if overflow <= 0:
+            break
+        target = max(section.min_tokens, sizes[section.name] - overflow)
+        if target >= sizes[section.name]:
+            continue
+        texts[section.name] = truncate_to_tokens(section.text, target)
+        trimmed = count_tokens(texts[section.name])
+        overflow -= sizes[section.name] - trimmed
+        logger.info(
+            f"[{budget.name}] trimmed '{section.name}' from {sizes[section.name]} to {trimmed} tokens "
+            f"(prompt budget {budget.prompt_budget})"
+        )
+
+    if overflow > 0:
+        logger.warning(f"[{budget.name}] prompt exceeds budget by ~{overflow} tokens after trimming")
+
+    fields.update(texts)
+    return fields
+
@@ -0,0 +1,237 @@
+# shared/tracing.py
+"""
+OpenTelemetry tracing
+
+Spans cover each request (continuing an incoming ``traceparent``), the JWT
+middleware, the collection services in services/database, every LLM
+attempt (so fallback hops show up as sibling spans under one ``llm.call``)
+and email enqueue/delivery. The session id is attached to every span as
+``session.id`` once a handler resolves the session.
+
+Exporters (``TRACING_EXPORTER``):
+    none    - tracing disabled (default)
+    otlp    - OTLP/HTTP to a collector; endpoint from OTEL_EXPORTER_OTLP_ENDPOINT
+              (needs opentelemetry-exporter-otlp-proto-http)
+    file    - one JSON span per line in TRACING_FILE_PATH
+    console - JSON spans on stdout
+
+Needs opentelemetry-sdk; without it every helper here is a no-op, so
+instrumented code costs a function call and nothing else.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from flask import Flask, g, request
+
+from config import settings
+
+try:
+    from opentelemetry import context as otel_context, trace
+    from opentelemetry.propagate import extract
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBasedTraceIdRatio
+except ImportError:  # optional dependency
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+SESSION_ATTRIBUTE = "session.id"
+
+_tracer = None
+_session_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_session_id", default=None)
+
+
+def _exporter(kind: str):
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if kind == "file":
+        path = settings.TRACING_FILE_PATH
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")), path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return ConsoleSpanExporter(
+            out=open(path, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    if kind == "console":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER '{kind}'")
+
+
+def setup_tracing() -> bool:
+    """Install the tracer provider from settings; returns whether tracing is on"""
+    global _tracer
+    kind = settings.TRACING_EXPORTER.lower()
+    if kind == "none" or _tracer is not None:
+        return _tracer is not None
+    if trace is None:
+        logger.warning("TRACING_EXPORTER is set but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    try:
+        exporter = _exporter(kind)
+    except Exception as e:
+        logger.error(f"Tracing disabled, exporter '{kind}' unavailable: {e}")
+        return False
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBasedTraceIdRatio(settings.TRACING_SAMPLE_RATIO)
+    )
+    # Spans are exported from a background thread, never on the request path
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer(__name__)
+    logger.info(f"Tracing enabled ({kind} exporter)")
+    return True
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Child span of the current one; yields None when tracing is off"""
+    if _tracer is None:
+        yield None
+        return
+    session_id = _session_id.get()
+    if session_id:
+        attributes[SESSION_ATTRIBUTE] = session_id
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def set_attributes(**attributes) -> None:
+    """Add attributes to the current span"""
+    if _tracer is None:
+        return
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes({k: v for k, v in attributes.items() if v is not None})
+
+
+def set_session_id(session_id: Optional[str]) -> None:
+    """Tag the current span and every later span in this context with the session"""
+    _session_id.set(session_id)
+    if session_id:
+        set_attributes(**{SESSION_ATTRIBUTE: session_id})
+
+
+def current_session_id() -> Optional[str]:
+    """Session id of the current request or job, if resolved"""
+    return _session_id.get()
+
+
+def current_trace_ids() -> Optional[Tuple[str, str]]:
+    """(trace_id, span_id) hex of the current span, for log correlation"""
+    if _tracer is None:
+        return None
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid:
+        return None
+    return f"{span_context.trace_id:032x}", f"{span_context.span_id:016x}"
+
+
+def traced(name: Optional[str] = None, **attributes) -> Callable:
+    """Decorator: run the function (sync or async) inside a span"""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def carry_context(coro: Awaitable[Any]) -> Awaitable[Any]:
+    """
+    Run ``coro`` with the caller's trace context and session id
+
+    Coroutines handed to the shared event loop (async routes, background
+    jobs) start with an empty context; wrap them to keep their spans in the
+    request's trace.
+    """
+    if _tracer is None:
+        return coro
+    parent = otel_context.get_current()
+    session_id = _session_id.get()
+
+    async def runner():
+        # The task has its own context copy, so nothing leaks to other tasks
+        token = otel_context.attach(parent)
+        _session_id.set(session_id)
+        try:
+            return await coro
+        finally:
+            otel_context.detach(token)
+
+    return runner()
+
+
+def init_tracing(app: Flask) -> None:
+    """
+    Server span per request; call before registering other before_request hooks
+
+    An incoming W3C ``traceparent`` header is continued, so a trace started
+    by the frontend or a load balancer spans the whole call.
+    """
+    @app.before_request
+    def _reset_session_id():
+        # Worker threads are reused; the session is set again once resolved
+        _session_id.set(None)
+
+    if not setup_tracing():
+        return
+
+    @app.before_request
+    def _start_request_span():
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        current = _tracer.start_span(
+            f"{request.method} {route}",
+            context=extract(request.headers),
+            kind=trace.SpanKind.SERVER,
+            attributes={
+                "http.method": request.method,
+                "http.route": route,
+                "http.target": request.path,
+                "flask.blueprint": request.blueprint or "app"
+            }
+        )
+        g._trace_span = current
+        g._trace_token = otel_context.attach(trace.set_span_in_context(current))
+
+    @app.after_request
+    def _tag_response(response):
+        current = g.get("_trace_span")
+        if current is not None:
+            current.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                current.set_status(trace.Status(trace.StatusCode.ERROR))
+        return response
+
+    @app.teardown_request
+    def _end_request_span(exc):
+        current = g.pop("_trace_span", None)
+        token = g.pop("_trace_token", None)
+        if current is not None:
+            if exc is not None:
+                current.record_exception(exc)
+                current.set_status(trace.Status(trace.StatusCode.ERROR, str(exc)))
+            current.end()
+        if token is not None:
+            otel_context.detach(token)
@@ -0,0 +1,147 @@
+import sqlite3
+import time
+
+import pytest
+
+from services.email_outbox import DeliveryError, EmailOutbox, OutboxStore
+
+
+class FakeTransport:
+    """Records every batch; fails as told"""
+
+    name = "fake"
+
+    def __init__(self, rejected=(), reject_whole_batch=False):
+        self.batches = []
+        # Raised by the next send calls, in order
+        self.errors = []
+        self.rejected = set(rejected)
+        # Like Resend's batch API: one bad address fails the whole request
+        self.reject_whole_batch = reject_whole_batch
+
+    def send(self, batch):
+        self.batches.append([(m.recipient, m.batch_key) for m in batch])
+        if self.errors:
+            raise self.errors.pop(0)
+        bad = [m for m in batch if m.recipient in self.rejected]
+        if bad and self.reject_whole_batch and len(batch) > 1:
+            raise DeliveryError(f"invalid recipient {bad[0].recipient}", permanent=True)
+        return [
+            DeliveryError("recipient refused", permanent=True) if m in bad else f"id-{m.id}"
+            for m in batch
+        ]
+
+
+@pytest.fixture
+def make_outbox(tmp_path, monkeypatch):
+    # Full backoff instead of a random share of it
+    monkeypatch.setattr("services.email_outbox.random.uniform", lambda low, high: high)
+
+    def make(transport, **kwargs):
+        outbox = EmailOutbox(store=OutboxStore(str(tmp_path / "outbox.db")), transport=transport,
+                             sender="noreply@example.com", **kwargs)
+        # Tests drive delivery with deliver_once instead of the sender thread
+        monkeypatch.setattr(outbox, "start", lambda: None)
+        return outbox
+
+    return make
+
+
+def rows(outbox):
+    conn = sqlite3.connect(outbox.store.path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return {r["recipient"]: r for r in conn.execute("SELECT * FROM outbox")}
+    finally:
+        conn.close()
+
+
+def test_messages_are_sent_in_batches(make_outbox):
+    transport = FakeTransport()
+    outbox = make_outbox(transport, batch_size=2)
+    outbox.enqueue_many([(f"user{i}@example.com", "Hasil", "<p>hi</p>") for i in range(5)])
+
+    assert [outbox.deliver_once() for _ in range(4)] == [2, 2, 1, 0]
+    assert [len(batch) for batch in transport.batches] == [2, 2, 1]
+    assert outbox.store.counts() == {"sent": 5}
+
+
+def test_duplicate_idempotency_keys_are_queued_once(make_outbox):
+    transport = FakeTransport()
+    outbox = make_outbox(transport)
+    outbox.enqueue("a@example.com", "Hasil", "<p>1</p>", idempotency_key="session-1:result")
+    outbox.enqueue("a@example.com", "Hasil", "<p>1</p>", idempotency_key="session-1:result")
+    outbox.enqueue_many([
+        ("a@example.com", "Hasil", "<p>1</p>", "session-1:result"),
+        ("b@example.com", "Hasil", "<p>2</p>", "session-2:result"),
+    ])
+
+    assert outbox.duplicates == 2
+    outbox.deliver_once()
+    assert [[recipient for recipient, _ in batch] for batch in transport.batches] == [
+        ["a@example.com", "b@example.com"]
+    ]
+    assert outbox.store.counts() == {"sent": 2}
+
+
+def test_transient_failure_backs_off_and_retries_the_same_batch(make_outbox):
+    transport = FakeTransport()
+    transport.errors.append(DeliveryError("connection reset"))
+    outbox = make_outbox(transport, base_backoff=0.05)
+    outbox.enqueue_many([("a@example.com", "Hasil", "<p>1</p>"), ("b@example.com", "Hasil", "<p>2</p>")])
+
+    assert outbox.deliver_once() == 2
+    row = rows(outbox)["a@example.com"]
+    assert (row["status"], row["attempts"], row["last_error"]) == ("pending", 1, "connection reset")
+    assert row["next_attempt_at"] > time.time()
+
+    # Not due before its backoff has passed
+    assert outbox.deliver_once() == 0
+    time.sleep(0.1)
+    assert outbox.deliver_once() == 2
+
+    # Same messages under the same batch key, so the provider can drop a duplicate
+    assert transport.batches[0] == transport.batches[1]
+    assert outbox.store.counts() == {"sent": 2}
+
+
+def test_gives_up_after_max_attempts(make_outbox):
+    transport = FakeTransport()
+    transport.errors.extend([DeliveryError("timeout"), DeliveryError("timeout")])
+    outbox = make_outbox(transport, max_attempts=2, base_backoff=0)
+    outbox.enqueue("a@example.com", "Hasil", "<p>1</p>")
+
+    outbox.deliver_once()
+    outbox.deliver_once()
+    assert outbox.deliver_once() == 0
+    assert rows(outbox)["a@example.com"]["status"] == "dead"
+    assert outbox.dead == 1
+
+
+@pytest.mark.parametrize("reject_whole_batch", [False, True])
+def test_permanent_failure_dead_letters_only_the_rejected_message(make_outbox, reject_whole_batch):
+    transport = FakeTransport(rejected={"bad@example.com"}, reject_whole_batch=reject_whole_batch)
+    outbox = make_outbox(transport)
+    outbox.enqueue_many([
+        ("a@example.com", "Hasil", "<p>1</p>"),
+        ("bad@example.com", "Hasil", "<p>2</p>"),
+        ("c@example.com", "Hasil", "<p>3</p>"),
+    ])
+
+    assert outbox.deliver_once() == 3
+    statuses = {recipient: row["status"] for recipient, row in rows(outbox).items()}
+    assert statuses == {"a@example.com": "sent", "bad@example.com": "dead", "c@example.com": "sent"}
+    assert outbox.dead == 1
+
+
+def test_recover_takes_back_only_expired_claims(tmp_path):
+    store = OutboxStore(str(tmp_path / "outbox.db"))
+    store.add("k1", "noreply@example.com", "a@example.com", "Hasil", "<p>1</p>")
+    batch = store.claim_batch(10, time.time())
+
+    # Possibly still being sent by its owner
+    assert store.recover(lease_seconds=900) == 0
+    assert store.recover(lease_seconds=0) == 1
+
+    # Retried as the same batch
+    assert [m.batch_key for m in store.claim_batch(10, time.time())] == [batch[0].batch_key]
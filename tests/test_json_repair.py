@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from shared.json_repair import loads, merge_continuation, repair_json
+
+
+def repaired(text):
+    result = repair_json(text)
+    return json.loads(result.text), result
+
+
+def test_valid_json_is_unchanged():
+    text = '{"a": [1, 2, {"b": "c"}], "d": null}'
+    result = repair_json(text)
+    assert result.text == text
+    assert not result.truncated
+    assert result.fixes == []
+
+
+def test_code_fence_and_leading_text():
+    value, result = repaired('Berikut timeline:\n```json\n{"a": 1}\n```\nSemoga membantu')
+    assert value == {"a": 1}
+    assert not result.truncated
+    assert "stripped leading text" in result.fixes
+
+
+def test_trailing_commas():
+    value, result = repaired('{"a": [1, 2, ], "b": {"c": 3,},\n}')
+    assert value == {"a": [1, 2], "b": {"c": 3}}
+    assert "removed trailing comma" in result.fixes
+
+
+def test_single_quotes():
+    value, result = repaired("{'task': 'Audit \"SOP\" forensik', 'n': 2}")
+    assert value == {"task": 'Audit "SOP" forensik', "n": 2}
+    assert "converted single quotes" in result.fixes
+
+
+def test_escaped_quote_in_single_quoted_string():
+    value, _ = repaired("{'a': 'it\\'s', 'b': 'back\\\\slash'}")
+    assert value == {"a": "it's", "b": "back\\slash"}
+
+
+def test_escaped_single_quote_in_double_quoted_string():
+    value, _ = repaired('{"a": "it\\\'s"}')
+    assert value == {"a": "it's"}
+
+
+def test_raw_newline_inside_string():
+    value, _ = repaired('{"a": "baris 1\nbaris 2"}')
+    assert value == {"a": "baris 1\nbaris 2"}
+
+
+def test_truncated_inside_string():
+    value, result = repaired('{"timeline": [{"task": "Susun kebijakan"}, {"task": "Latih tim')
+    # The half-written string is dropped; its object is closed empty
+    assert value == {"timeline": [{"task": "Susun kebijakan"}, {}]}
+    assert result.truncated
+    assert "closed truncated output" in result.fixes
+
+
+def test_truncated_after_key():
+    value, result = repaired('{"total_duration": "12 bulan", "risks":')
+    assert value == {"total_duration": "12 bulan"}
+    assert result.truncated
+
+
+def test_unbalanced_brackets_are_closed():
+    value, result = repaired('{"a": [1, 2}')
+    assert value == {"a": [1, 2]}
+    assert "closed unbalanced bracket" in result.fixes
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        repair_json("Maaf, sistem AI sedang tidak tersedia.")
+
+
+def test_loads_repairs_only_when_needed():
+    assert loads('{"a": 1}') == {"a": 1}
+    assert loads("```json\n{'a': 1,}\n```") == {"a": 1}
+
+
+def test_merge_continuation_drops_repeated_overlap():
+    partial = '{"timeline": [{"task": "Susun kebijakan forensik'
+    continuation = 'kebijakan forensik"}]}'
+    assert json.loads(merge_continuation(partial, continuation)) == {
+        "timeline": [{"task": "Susun kebijakan forensik"}]
+    }